@@ -0,0 +1,529 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from modules import equity_calculations, option_pricer, portfolio_risk, xva
+from modules.bulk_pricer import price_chunk, read_chunks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTRACT_CSV = os.path.join(ROOT, "input", "black_scholes.csv")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+# Relative slowdown (or memory growth) over the baseline treated as a regression.
+DEFAULT_THRESHOLD = 0.25
+MONTE_CARLO_PATHS = (10000, 100000)
+MONTE_CARLO_STEPS = (1, 52, 252)
+CHAIN_SIZE = 1000
+# Heavy modules that importing the service must not load; see
+# RequestHandler.warm_up for preloading them before traffic arrives.
+DEFERRED_IMPORTS = ("matplotlib", "scipy", "finnhub", "requests", "dotenv")
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", 1.0))
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(",".join(m for m in {deferred!r} if m in sys.modules))
+"""
+
+
+def chain(size=CHAIN_SIZE, seed=0):
+    """
+    Reproducible option chain around S = 100 as a tuple of arrays
+    (S, K, T, r, q, sigma).
+    """
+    rng = np.random.default_rng(seed)
+    return (
+        np.full(size, 100.0),
+        rng.uniform(60, 140, size),
+        rng.uniform(0.05, 2, size),
+        np.full(size, 0.03),
+        np.full(size, 0.01),
+        rng.uniform(0.1, 0.6, size),
+    )
+
+
+def black_scholes_single():
+    return lambda: option_pricer.BlackScholes.price_option(
+        100, 105, 0.5, 0.03, 0.01, 0.25, 1
+    ), 1
+
+
+def black_scholes_chain():
+    contracts = chain()
+    return (
+        lambda: option_pricer.BlackScholes.price_option_batch(
+            *contracts, include_greeks=1
+        ),
+        CHAIN_SIZE,
+    )
+
+
+def black_scholes_csv():
+    rows = sum(len(c) for c in read_chunks(CONTRACT_CSV))
+    return lambda: [price_chunk(c) for c in read_chunks(CONTRACT_CSV)], rows
+
+
+def monte_carlo_grid(paths, steps):
+    def workload():
+        return (
+            lambda: option_pricer.MonteCarlo.monte_carlo(
+                100, 105, 0.5, 0.03, 0.01, 0.25, 0, paths, steps
+            ),
+            paths,
+        )
+
+    return workload
+
+
+def monte_carlo_greeks():
+    rng = np.random.default_rng(0)
+    return (
+        lambda: option_pricer.MonteCarlo.monte_carlo_greeks(
+            100, 105, 0.5, 0.03, 0.01, 0.25, 0, 100000, rng=rng
+        ),
+        100000,
+    )
+
+
+def monte_carlo_path_dependent(payoff, barrier=None):
+    def workload():
+        rng = np.random.default_rng(0)
+        return (
+            lambda: option_pricer.MonteCarlo.monte_carlo_path_dependent(
+                100,
+                105,
+                0.5,
+                0.03,
+                0.01,
+                0.25,
+                0,
+                payoff,
+                barrier,
+                num_simulations=10000,
+                num_steps=252,
+                rng=rng,
+            ),
+            10000,
+        )
+
+    return workload
+
+
+def longstaff_schwartz():
+    rng = np.random.default_rng(0)
+    return (
+        lambda: option_pricer.MonteCarlo.longstaff_schwartz(
+            100, 105, 0.5, 0.03, 0.01, 0.25, 1, num_simulations=50000, rng=rng
+        ),
+        50000,
+    )
+
+
+def binomial_tree_single():
+    option = option_pricer.BinomialLROption(
+        S=100,
+        K=105,
+        T=0.5,
+        N=1000,
+        r=0.03,
+        sigma=0.25,
+        option_type=option_pricer.OptionType.PUT,
+    )
+    return option.price, 1
+
+
+def binomial_tree_chain():
+    S, K, T, r, q, sigma = chain(100)
+    return (
+        lambda: option_pricer.BinomialTreeBatch.price_lr(
+            S, K, T, 500, r, q, sigma, option_pricer.OptionType.PUT, False
+        ),
+        100,
+    )
+
+
+def finite_difference_ladder():
+    # One American solve values the whole spot ladder, Greeks included.
+    return (
+        lambda: option_pricer.FiniteDifference.price_grid(
+            100, 105, 0.5, 0.03, 0.01, 0.25, option_pricer.OptionType.PUT, num_spots=400
+        ),
+        401,
+    )
+
+
+def implied_volatility_chain():
+    model = option_pricer.ImpliedVolatilityModel(
+        S=100, r=0.03, T=0.5, N=200, option_type=option_pricer.OptionType.PUT
+    )
+    strikes = np.linspace(80, 120, 100)
+    prices = model.option_valuation_batch(strikes, np.full(100, 0.3))
+    return lambda: model.implied_volatilities(strikes, prices), 100
+
+
+def equity_portfolio():
+    rng = np.random.default_rng(0)
+    cashflows = rng.uniform(0, 10, (CHAIN_SIZE, 40))
+    cashflows[:, 0] = -100
+    rates = rng.uniform(0.01, 0.1, CHAIN_SIZE)
+
+    def run():
+        equity_calculations.netPresentValBatch(rates, cashflows)
+        equity_calculations.internalRateOfReturn(cashflows)
+
+    return run, CHAIN_SIZE
+
+
+def portfolio_var():
+    rng = np.random.default_rng(0)
+    underlyings = 20
+    spots = rng.uniform(50, 150, underlyings)
+    underlying = rng.integers(0, underlyings, CHAIN_SIZE)
+    positions = portfolio_risk.make_positions(
+        rng.integers(-10, 11, CHAIN_SIZE),
+        underlying,
+        spots[underlying] * rng.uniform(0.8, 1.2, CHAIN_SIZE),
+        rng.uniform(0.05, 2, CHAIN_SIZE),
+        rng.uniform(0.1, 0.5, CHAIN_SIZE),
+        rng.integers(0, 2, CHAIN_SIZE),
+    )
+    scenarios = portfolio_risk.simulated_scenarios(
+        np.full(underlyings, 0.3), CHAIN_SIZE, vol_of_vol=0.5, rng=rng
+    )
+    return (
+        lambda: portfolio_risk.risk_report(positions, spots, 0.03, scenarios),
+        CHAIN_SIZE * CHAIN_SIZE,
+    )
+
+
+def xva_exposure():
+    rng = np.random.default_rng(0)
+    swaps = xva.make_swaps(
+        rng.uniform(1e5, 1e7, CHAIN_SIZE),
+        rng.uniform(0.02, 0.05, CHAIN_SIZE),
+        0,
+        rng.integers(1, 31, CHAIN_SIZE),
+        4,
+        rng.integers(0, 2, CHAIN_SIZE),
+        rng.integers(0, 10, CHAIN_SIZE),
+    )
+    model = xva.HullWhite(0.03, 0.01, 0.03)
+    return (
+        lambda: xva.cva_report(
+            swaps, model, xva.survival_curve(0.02), num_paths=2000, rng=rng
+        ),
+        CHAIN_SIZE,
+    )
+
+
+# Each factory prepares its inputs outside the timed region and returns
+# (callable, items priced per call).
+WORKLOADS = {
+    "black_scholes_single": black_scholes_single,
+    "black_scholes_chain": black_scholes_chain,
+    "black_scholes_csv": black_scholes_csv,
+    **{
+        f"monte_carlo[paths={paths},steps={steps}]": monte_carlo_grid(paths, steps)
+        for paths in MONTE_CARLO_PATHS
+        for steps in MONTE_CARLO_STEPS
+    },
+    "monte_carlo_greeks": monte_carlo_greeks,
+    "monte_carlo_asian": monte_carlo_path_dependent("asian_arithmetic"),
+    "monte_carlo_barrier": monte_carlo_path_dependent("barrier", 120),
+    "longstaff_schwartz": longstaff_schwartz,
+    "binomial_tree_single": binomial_tree_single,
+    "binomial_tree_chain": binomial_tree_chain,
+    "finite_difference_ladder": finite_difference_ladder,
+    "implied_volatility_chain": implied_volatility_chain,
+    "equity_portfolio": equity_portfolio,
+    "portfolio_var": portfolio_var,
+    "xva_exposure": xva_exposure,
+}
+
+
+def summarize(latencies, items, peak_memory=None):
+    latencies = np.asarray(latencies)
+    summary = {
+        "Calls": len(latencies),
+        "Seconds": float(latencies.sum()),
+        "P50": float(np.percentile(latencies, 50)),
+        "P99": float(np.percentile(latencies, 99)),
+        "Throughput": items * len(latencies) / float(latencies.sum()),
+    }
+    if peak_memory is not None:
+        summary["PeakMemory"] = peak_memory
+    return summary
+
+
+def measure(func, items=1, repeats=10, warmup=1):
+    """
+    Time repeats calls of func after warmup untimed calls, then trace one
+    more call to record its peak Python/numpy allocation in bytes.
+
+    :param items: contracts, rows or paths per call, for Throughput
+    :return: dict of Calls, Seconds, P50, P99, Throughput and PeakMemory
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return summarize(latencies, items, peak_memory)
+
+
+def run(names=None, repeats=10, warmup=1):
+    results = {}
+    for name in names or WORKLOADS:
+        if name not in WORKLOADS:
+            raise Exception(f"Unknown Workload: Must be one of {list(WORKLOADS)}")
+
+        func, items = WORKLOADS[name]()
+        results[name] = measure(func, items, repeats, warmup)
+
+    return results
+
+
+def is_error_response(response):
+    """
+    The handlers report failures as a plain-text message, usually with status
+    200, and results as JSON; both count as errors here.
+    """
+    return not 200 <= response.status_code < 300 or not response.is_json
+
+
+def http_load(client, requests, concurrency=4):
+    """
+    Drive a Flask test client from concurrency threads.
+
+    :param client: app.test_client()
+    :param requests: iterable of (method, path, kwargs) passed to client.open
+    :return: latency summary plus Errors, the number of non-2xx or error
+        message responses. Throughput is requests per second of wall time.
+    """
+    lock = threading.Lock()
+    errors = 0
+
+    def send(request):
+        nonlocal errors
+        method, path, kwargs = request
+        start = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        if is_error_response(response):
+            with lock:
+                errors += 1
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(send, requests))
+    wall = time.perf_counter() - start
+
+    summary = summarize(latencies, 1)
+    summary["Throughput"] = len(latencies) / wall
+    return dict(summary, Errors=errors)
+
+
+def pricing_requests(count, seed=0):
+    """
+    Mixed single and batch Black-Scholes requests with distinct contracts, so
+    the load measures pricing rather than the pricing cache.
+    """
+    S, K, T, r, q, sigma = chain(count, seed)
+    requests = []
+    for i in range(count):
+        contract = {
+            "stock_price": S[i],
+            "strike_price": K[i],
+            "time_to_expiration": T[i],
+            "risk_free_rate": r[i],
+            "dividend_yield": q[i],
+            "volatility": sigma[i],
+            "option_type": i % 2,
+        }
+        if i % 10:
+            params = dict(contract, include_greeks=1)
+            requests.append(("GET", "/blackScholesPricing", {"query_string": params}))
+        else:
+            body = {"contracts": [contract] * 100, "include_greeks": 1}
+            requests.append(("POST", "/blackScholesPricing/batch", {"json": body}))
+
+    return requests
+
+
+def run_http(count=500, concurrency=4):
+    from winfin import app, limiter
+
+    limiter.enabled = False
+    try:
+        return http_load(app.test_client(), pricing_requests(count), concurrency)
+    finally:
+        limiter.enabled = True
+
+
+def measure_import(module="winfin", repeats=5):
+    """
+    Time importing module in fresh interpreters.
+
+    :return: latency summary plus DeferredLoaded, the DEFERRED_IMPORTS that
+        the import pulled in
+    """
+    probe = IMPORT_PROBE.format(module=module, deferred=DEFERRED_IMPORTS)
+    latencies = []
+    loaded = set()
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        latencies.append(float(output[0]))
+        loaded.update(m for m in output[1].split(",") if m)
+
+    return dict(summarize(latencies, 1), DeferredLoaded=sorted(loaded))
+
+
+def check_startup(result, budget=STARTUP_BUDGET_SECONDS):
+    """
+    :return: list of messages describing how result breaks the start-up
+        budget, empty when it does not
+    """
+    problems = []
+    if result["P50"] > budget:
+        problems.append(f"import took {result['P50']:.3f}s, budget {budget:.3f}s")
+    if result["DeferredLoaded"]:
+        problems.append(f"import loaded {', '.join(result['DeferredLoaded'])}")
+    return problems
+
+
+def environment():
+    return {
+        "Python": platform.python_version(),
+        "Numpy": np.__version__,
+        "Machine": platform.machine(),
+        "Processors": os.cpu_count(),
+    }
+
+
+def save_baseline(results, path=DEFAULT_BASELINE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"Environment": environment(), "Results": results}, f, indent=2)
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    with open(path) as f:
+        return json.load(f)["Results"]
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions of results against baseline: workloads whose median latency
+    or peak memory grew by more than threshold. Workloads missing from either
+    side are ignored.
+
+    :return: list of (workload, metric, baseline value, new value)
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ("P50", "PeakMemory"):
+            old = baseline[name].get(metric)
+            new = result.get(metric)
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append((name, metric, old, new))
+
+    return regressions
+
+
+def report(results):
+    print(
+        f"{'workload':40} {'p50 ms':>10} {'p99 ms':>10} "
+        f"{'items/sec':>12} {'peak MiB':>9}"
+    )
+    for name, result in results.items():
+        peak = result.get("PeakMemory")
+        print(
+            f"{name:40} {result['P50'] * 1e3:10.3f} {result['P99'] * 1e3:10.3f} "
+            f"{result['Throughput']:12,.0f} "
+            f"{'-' if peak is None else f'{peak / 2**20:.1f}':>9}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pricing engine benchmarks")
+    parser.add_argument("workloads", nargs="*", help=f"subset of {list(WORKLOADS)}")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--http", action="store_true", help="also run HTTP load")
+    parser.add_argument("--http-requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--startup", action="store_true", help="also check service import time"
+    )
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET_SECONDS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="overwrite the baseline file"
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run(args.workloads, args.repeats, args.warmup)
+    if args.http:
+        results["http_pricing"] = run_http(args.http_requests, args.concurrency)
+    problems = []
+    if args.startup:
+        results["import_winfin"] = measure_import("winfin", args.repeats)
+        problems = check_startup(results["import_winfin"], args.startup_budget)
+    report(results)
+    for problem in problems:
+        print(f"STARTUP {problem}")
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 1 if problems else 0
+
+    if not os.path.exists(args.baseline):
+        # Without a baseline nothing was checked, so the gate must not pass.
+        print(
+            f"NO BASELINE at {args.baseline}, regressions were not checked; "
+            "run with --save-baseline first",
+            file=sys.stderr,
+        )
+        return 1
+
+    regressions = compare(results, load_baseline(args.baseline), args.threshold)
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION {name} {metric}: {old:.6g} -> {new:.6g}")
+
+    return 1 if regressions or problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from modules.option_pricer import BlackScholes
+
+INPUT_COLUMNS = ("S", "K", "T", "r", "sigma", "include_greeks", "type")
+RESULT_COLUMNS = ("Price", "Delta", "Gamma", "Theta", "Vega", "Rho")
+OUTPUT_COLUMNS = INPUT_COLUMNS + RESULT_COLUMNS
+
+
+def parse_contract_row(line):
+    """
+    :return: the line's fields as floats, or None unless it holds exactly one
+        number per input column
+    """
+    fields = line.split(",")
+    if len(fields) != len(INPUT_COLUMNS):
+        return None
+    try:
+        return [float(field) for field in fields]
+    except ValueError:
+        return None
+
+
+def parse_contract_rows(lines):
+    """
+    (rows, 7) float array of the contract rows among lines. np.loadtxt parses
+    the common all-numeric chunk; a chunk it rejects is parsed line by line.
+    """
+    lines = [line for line in lines if line.count(",") == len(INPUT_COLUMNS) - 1]
+    if not lines:
+        return np.empty((0, len(INPUT_COLUMNS)))
+    try:
+        return np.loadtxt(lines, delimiter=",", ndmin=2)
+    except ValueError:
+        rows = [row for row in map(parse_contract_row, lines) if row is not None]
+        return np.array(rows, dtype=float).reshape(-1, len(INPUT_COLUMNS))
+
+
+def read_chunks(path, chunk_size=100000, stats=None):
+    """
+    Yield (rows, 7) float arrays of contracts laid out like
+    input/black_scholes.csv, reading at most chunk_size lines at a time.
+    Malformed lines, including headers, are skipped and counted in
+    stats["Skipped"].
+    """
+    with open(path) as f:
+        while True:
+            lines = [line for line in islice(f, chunk_size) if line.strip()]
+            if not lines:
+                return
+
+            rows = parse_contract_rows(lines)
+            if stats is not None:
+                stats["Skipped"] = stats.get("Skipped", 0) + len(lines) - len(rows)
+            if len(rows):
+                yield rows
+
+
+def count_rows(path, chunk_size=100000):
+    return sum(len(rows) for rows in read_chunks(path, chunk_size))
+
+
+def price_chunk(chunk, dividend_yield=0.0):
+    S, K, T, r, sigma, include_greeks, option_type = chunk.T
+    result = BlackScholes.price_option_batch(
+        S, K, T, r, dividend_yield, sigma, 1, option_type.astype(int)
+    )
+
+    greeks = np.column_stack([result[key] for key in RESULT_COLUMNS[1:]])
+    greeks[include_greeks == 0] = np.nan
+
+    return np.column_stack((chunk, result["Price"], greeks))
+
+
+def _priced_chunks(chunks, dividend_yield, workers):
+    if workers <= 1:
+        for chunk in chunks:
+            yield price_chunk(chunk, dividend_yield)
+        return
+
+    # Bound the number of in-flight chunks so memory stays flat no matter
+    # how large the input file is.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(price_chunk, chunk, dividend_yield))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def price_file(
+    input_path, output_path, chunk_size=100000, dividend_yield=0.0, workers=1
+):
+    """
+    Price every contract in input_path and stream the results to output_path.
+    A .npy output is written through a memory-mapped array, anything else is
+    written as CSV.
+
+    :return: dict with the priced and skipped row counts, elapsed seconds and
+        rows/sec throughput
+    """
+    start = time.perf_counter()
+    stats = {"Skipped": 0}
+    chunks = read_chunks(input_path, chunk_size, stats)
+    rows = 0
+
+    if str(output_path).endswith(".npy"):
+        out = np.lib.format.open_memmap(
+            output_path,
+            mode="w+",
+            dtype=np.float64,
+            shape=(count_rows(input_path, chunk_size), len(OUTPUT_COLUMNS)),
+        )
+        for priced in _priced_chunks(chunks, dividend_yield, workers):
+            out[rows : rows + len(priced)] = priced
+            rows += len(priced)
+        out.flush()
+        del out
+    else:
+        with open(output_path, "w") as f:
+            f.write(",".join(OUTPUT_COLUMNS) + "\n")
+            for priced in _priced_chunks(chunks, dividend_yield, workers):
+                np.savetxt(f, priced, delimiter=",", fmt="%.10g")
+                rows += len(priced)
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        "Rows": rows,
+        "Skipped": stats["Skipped"],
+        "Seconds": elapsed,
+        "RowsPerSecond": rows / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bulk Black-Scholes pricing of a contract CSV file"
+    )
+    parser.add_argument("input", help="CSV of S, K, T, r, sigma, include_greeks, type")
+    parser.add_argument("output", help="output .csv or .npy path")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--dividend-yield", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    stats = price_file(
+        args.input, args.output, args.chunk_size, args.dividend_yield, args.workers
+    )
+    print(
+        f"Priced {stats['Rows']} rows in {stats['Seconds']:.3f}s "
+        f"({stats['RowsPerSecond']:,.0f} rows/sec), "
+        f"skipped {stats['Skipped']} malformed rows"
+    )
+
+
+if __name__ == "__main__":
+    main()
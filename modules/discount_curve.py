@@ -0,0 +1,111 @@
+import numpy as np
+
+
+class DiscountCurve:
+    INTERPOLATIONS = ("log_linear", "linear_zero")
+
+    def __init__(self, times, zero_rates, interpolation="log_linear"):
+        """
+        Continuously compounded term structure built once per market snapshot
+        and shared by the equity and option engines in place of a flat rate.
+
+        :param times: increasing knot times (years, or periods for the equity
+            functions)
+        :param zero_rates: zero rate at each knot
+        :param interpolation: "log_linear" interpolates log discount factors,
+            i.e. piecewise-flat forward rates; "linear_zero" interpolates zero
+            rates linearly. Beyond the last knot the last forward (or zero)
+            rate is held flat.
+        """
+        if interpolation not in DiscountCurve.INTERPOLATIONS:
+            raise Exception(
+                f"Invalid Interpolation: Must be one of {DiscountCurve.INTERPOLATIONS}"
+            )
+
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        zero_rates = np.broadcast_to(
+            np.asarray(zero_rates, dtype=float), times.shape
+        ).copy()
+        if times[0] > 0:
+            times = np.concatenate(([0.0], times))
+            zero_rates = np.concatenate((zero_rates[:1], zero_rates))
+
+        self.times = times
+        self.zero_rates = zero_rates
+        self.log_dfs = -zero_rates * times
+        self.interpolation = interpolation
+        self.grids = {}
+
+        if len(times) > 1:
+            self.last_forward = (self.log_dfs[-2] - self.log_dfs[-1]) / (
+                times[-1] - times[-2]
+            )
+        else:
+            self.last_forward = zero_rates[-1]
+
+    @classmethod
+    def flat(cls, rate):
+        return cls([1.0], [rate])
+
+    @classmethod
+    def piecewise(cls, times, forward_rates):
+        """
+        Curve with forward_rates[i] applying from times[i - 1] (or 0) to
+        times[i].
+        """
+        times = np.asarray(times, dtype=float)
+        log_dfs = -np.cumsum(np.asarray(forward_rates) * np.diff(times, prepend=0.0))
+        return cls(times, -log_dfs / times)
+
+    @staticmethod
+    def as_rate(r, T):
+        """
+        Zero rate to maturity T when r is a curve, r itself otherwise.
+        """
+        if not isinstance(r, DiscountCurve):
+            return r
+
+        rate = r.zero_rate(T)
+        return float(rate) if rate.ndim == 0 else rate
+
+    def log_discount_factor(self, t):
+        t = np.asarray(t, dtype=float)
+        last = self.times[-1]
+
+        if self.interpolation == "log_linear":
+            inside = np.interp(t, self.times, self.log_dfs)
+            beyond = self.log_dfs[-1] - self.last_forward * (t - last)
+        else:
+            inside = -np.interp(t, self.times, self.zero_rates) * t
+            beyond = -self.zero_rates[-1] * t
+
+        return np.where(t > last, beyond, inside)
+
+    def discount_factor(self, t):
+        return np.exp(self.log_discount_factor(t))
+
+    def zero_rate(self, t):
+        t = np.asarray(t, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = -self.log_discount_factor(t) / t
+
+        return np.where(t > 0, rates, self.zero_rates[0])
+
+    def forward_rate(self, t1, t2):
+        return (self.log_discount_factor(t1) - self.log_discount_factor(t2)) / (
+            np.asarray(t2) - np.asarray(t1)
+        )
+
+    def discount_factors_on_grid(self, dt, steps):
+        """
+        Discount factors at 0, dt, ..., steps * dt. Grids are computed once
+        and memoized, so repricing a book on a shared grid costs no further
+        exponentials.
+        """
+        key = (float(dt), int(steps))
+        if key not in self.grids:
+            grid = self.discount_factor(np.arange(steps + 1) * dt)
+            grid.setflags(write=False)
+            self.grids[key] = grid
+
+        return self.grids[key]
@@ -1,122 +1,336 @@
-def presentVal(futureVal, discountRate, periods):
-    return futureVal / (1 + discountRate) ** periods
-
-
-def futureVal(presentVal, discountRate, periods):
-    return presentVal * (1 + discountRate) ** periods
-
-
-def netPresentVal(discountRate, cashflows):
-    totalVal = 0.0
-
-    for index, cashflow in enumerate(cashflows):
-        totalVal += cashflow / (1 + discountRate) ** index
-
-    return totalVal
-
-
-def presentValPerpetuity(cashflow, discountRate):
-    return cashflow / discountRate
-
-
-def presentValPerpetuityDue(cashflow, discountRate):
-    return cashflow / discountRate * (1 + discountRate)
-
-
-def presentValAnnuity(cashflow, discountRate, periods):
-    return cashflow / discountRate * (1 - 1 / (1 + discountRate) ** periods)
-
-
-def presentValAnnuityDue(cashflow, discountRate, periods):
-    return (
-        cashflow
-        / discountRate
-        * (1 - 1 / (1 + discountRate) ** periods)
-        * (1 + discountRate)
-    )
-
-
-def presentValGrowingAnnuity(cashflow, discountRate, periods, growthRate):
-    return (
-        cashflow
-        / discountRate
-        * (1 - (1 + growthRate) ** periods / (1 + discountRate) ** periods)
-    )
-
-
-def futureValAnnuity(cashflow, discountRate, periods):
-    return cashflow / discountRate * ((1 + discountRate) ** periods - 1)
-
-
-def futureValAnnuityDue(cashflow, discountRate, periods):
-    return (
-        cashflow
-        / discountRate
-        * ((1 + discountRate) ** periods - 1)
-        * (1 + discountRate)
-    )
-
-
-def effectiveAnnualRate(apr, frequency):
-    return (1 + apr / frequency) ** frequency - 1
-
-
-def stockEvaluation(discountRate, ltGrowthRate, dividends):
-    divArray = dividends[:-1]
-    divLast = dividends[-1]
-
-    numPeriods = len(dividends) - 1
-
-    presVal = netPresentVal(discountRate, divArray) * (1 + discountRate)
-
-    lastDiv = divLast / (discountRate - ltGrowthRate)
-
-    totalVal = presVal + presentVal(lastDiv, discountRate, numPeriods)
-
-    return totalVal
-
-
-def dividendDiscountModel(discountRate, dividends, growthRate, stockPrice, periods):
-    totalCashflows = 0
-
-    for period in range(1, periods + 1):
-        growthFactor = 1 + growthRate
-        discountFactor = (1 + discountRate) ** period
-
-        cashflow = (dividends * growthFactor) ** period / discountFactor
-
-        totalCashflows = totalCashflows + cashflow
-
-    terminalVal = stockPrice / (1 + discountRate) ** periods
-
-    return totalCashflows + terminalVal
-
-
-def gordonGrowthModel(dividend, dividendGrowthRate, requiredRateOfReturn):
-    dividendPeriodOne = dividend * (1 + dividendGrowthRate)
-
-    return dividendPeriodOne / (requiredRateOfReturn - dividendGrowthRate)
-
-
-def multistageGrowthModel(
-    dividend, discountRate, growthRate, constantGrowthRate, periods
-):
-    totalVal = 0
-
-    for period in range(1, periods + 1):
-        if period == periods:
-            terminalDividend = dividend * (1 + growthRate) ** period
-            terminalVal = terminalDividend / (discountRate - constantGrowthRate)
-            terminalValDiscount = terminalVal / (1 + discountRate) ** (period - 1)
-            totalVal += terminalValDiscount
-        else:
-            cashflow = (dividend * (1 + growthRate) ** period) / (
-                1 + discountRate
-            ) ** period
-            totalVal += cashflow
-
-    return totalVal
-
-
-def preferredStockValuation(dividend, requiredRateOfReturn):
-    return dividend / requiredRateOfReturn
+import numpy as np
+
+from modules.discount_curve import DiscountCurve
+
+
+def presentVal(futureVal, discountRate, periods):
+    if isinstance(discountRate, DiscountCurve):
+        return futureVal * discountRate.discount_factor(periods)
+    return futureVal / (1 + discountRate) ** periods
+
+
+def futureVal(presentVal, discountRate, periods):
+    if isinstance(discountRate, DiscountCurve):
+        return presentVal / discountRate.discount_factor(periods)
+    return presentVal * (1 + discountRate) ** periods
+
+
+def periodRate(discountRate, periods):
+    """
+    Per-period rate that discounts like discountRate over periods: for a
+    DiscountCurve its zero rate to periods, compounded once per period, so
+    that (1 + r)^-periods is the curve's discount factor. Any other rate is
+    returned as given.
+    """
+    if isinstance(discountRate, DiscountCurve):
+        return np.expm1(DiscountCurve.as_rate(discountRate, periods))
+    return discountRate
+
+
+def flatRate(discountRate):
+    """
+    discountRate, rejecting a DiscountCurve in the models that have no horizon
+    to read a curve at.
+    """
+    if isinstance(discountRate, DiscountCurve):
+        raise Exception(
+            "Invalid Discount Rate: Must be a flat rate for perpetuities and "
+            "constant-growth models"
+        )
+    return discountRate
+
+
+def curveFactors(curve, periods):
+    """
+    Discount factors of curve at 0, 1, ..., periods.
+    """
+    return curve.discount_factors_on_grid(1, int(periods))
+
+
+def discountFactors(discountRate, periods):
+    """
+    Discount factors (1 + r)^-t for t = 0..periods - 1. A vector of rates
+    gives one row of factors per rate; a DiscountCurve gives its memoized
+    factors on the period grid.
+    """
+    if isinstance(discountRate, DiscountCurve):
+        return discountRate.discount_factors_on_grid(1, periods - 1)
+
+    discountRate = np.asarray(discountRate, dtype=float)
+    return np.exp(-np.multiply.outer(np.log1p(discountRate), np.arange(periods)))
+
+
+def netPresentVal(discountRate, cashflows):
+    cashflows = np.asarray(cashflows, dtype=float)
+
+    return float(cashflows @ discountFactors(discountRate, len(cashflows)))
+
+
+def netPresentValBatch(discountRates, cashflows):
+    """
+    NPV of every row of a (schedules, periods) cashflow array, discounted at
+    one rate or at one rate per schedule.
+    """
+    cashflows = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    factors = discountFactors(discountRates, cashflows.shape[1])
+
+    if factors.ndim == 1:
+        return cashflows @ factors
+    return np.einsum("ij,ij->i", cashflows, factors)
+
+
+def internalRateOfReturn(cashflows, tol=1e-10, maxIter=100, lower=-0.99, upper=10.0):
+    """
+    IRR of every row of a (schedules, periods) cashflow array, solved for all
+    schedules at once with Newton steps kept inside a bisection bracket.
+    Schedules whose NPV does not change sign on [lower, upper], or that do
+    not converge within maxIter steps, give NaN.
+    """
+    cashflows = np.asarray(cashflows, dtype=float)
+    single = cashflows.ndim == 1
+    cashflows = np.atleast_2d(cashflows)
+    periods = np.arange(cashflows.shape[1])
+
+    def npvAndSlope(rate):
+        # Scaled by each row's largest factor, which keeps the sign and the
+        # Newton step and cannot overflow on long schedules at rates near -1.
+        exponents = -np.log1p(rate)[:, None] * periods
+        factors = np.exp(exponents - exponents.max(axis=1, keepdims=True))
+        npv = np.einsum("ij,ij->i", cashflows, factors)
+        slope = -np.einsum("ij,ij->i", cashflows * periods, factors) / (1 + rate)
+        return npv, slope
+
+    lo = np.full(len(cashflows), lower)
+    hi = np.full(len(cashflows), upper)
+    npvLo = npvAndSlope(lo)[0]
+    bracketed = np.sign(npvLo) != np.sign(npvAndSlope(hi)[0])
+
+    rate = np.full(len(cashflows), 0.1)
+    step = hi - lo
+    for _ in range(maxIter):
+        npv, slope = npvAndSlope(rate)
+        converged = np.abs(npv) <= tol * np.maximum(np.abs(cashflows).max(axis=1), 1)
+        if (converged | ~bracketed).all():
+            break
+
+        sameSide = np.sign(npv) == np.sign(npvLo)
+        lo = np.where(sameSide, rate, lo)
+        hi = np.where(sameSide, hi, rate)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            candidate = rate - npv / slope
+        outside = ~((candidate > lo) & (candidate < hi))
+        # Bisect too when a Newton step would not halve the previous step,
+        # which keeps long schedules, whose NPV is far from linear, converging.
+        slow = np.abs(candidate - rate) > 0.5 * step
+        candidate = np.where(outside | slow, 0.5 * (lo + hi), candidate)
+        step = np.abs(candidate - rate)
+        rate = np.where(converged, rate, candidate)
+
+    npv = npvAndSlope(rate)[0]
+    converged = np.abs(npv) <= tol * np.maximum(np.abs(cashflows).max(axis=1), 1)
+    rate = np.where(bracketed & converged, rate, np.nan)
+    return rate[0] if single else rate
+
+
+def yieldToMaturity(price, couponPayment, faceValue, periods):
+    """
+    Per-period yield of bonds paying couponPayment each period and faceValue
+    at maturity. Arguments may be arrays, one entry per bond.
+    """
+    price, couponPayment, faceValue, periods = np.broadcast_arrays(
+        *(
+            np.atleast_1d(np.asarray(x, dtype=float))
+            for x in (price, couponPayment, faceValue, periods)
+        )
+    )
+    periods = periods.astype(int)
+    t = np.arange(periods.max() + 1)
+
+    cashflows = np.where(t <= periods[:, None], couponPayment[:, None], 0.0)
+    cashflows[:, 0] = -price
+    cashflows[np.arange(len(price)), periods] += faceValue
+
+    yields = internalRateOfReturn(cashflows)
+    return yields[0] if yields.size == 1 else yields
+
+
+def presentValPerpetuity(cashflow, discountRate):
+    return cashflow / flatRate(discountRate)
+
+
+def presentValPerpetuityDue(cashflow, discountRate):
+    return cashflow / flatRate(discountRate) * (1 + discountRate)
+
+
+def presentValAnnuity(cashflow, discountRate, periods):
+    if isinstance(discountRate, DiscountCurve):
+        return cashflow * curveFactors(discountRate, periods)[1:].sum()
+    return cashflow / discountRate * (1 - 1 / (1 + discountRate) ** periods)
+
+
+def presentValAnnuityDue(cashflow, discountRate, periods):
+    if isinstance(discountRate, DiscountCurve):
+        return cashflow * curveFactors(discountRate, periods)[:-1].sum()
+    return (
+        cashflow
+        / discountRate
+        * (1 - 1 / (1 + discountRate) ** periods)
+        * (1 + discountRate)
+    )
+
+
+def presentValGrowingAnnuity(cashflow, discountRate, periods, growthRate):
+    if isinstance(discountRate, DiscountCurve):
+        factors = curveFactors(discountRate, periods)[1:]
+        return cashflow * factors @ (1 + growthRate) ** np.arange(len(factors))
+    return (
+        cashflow
+        / (discountRate - growthRate)
+        * (1 - (1 + growthRate) ** periods / (1 + discountRate) ** periods)
+    )
+
+
+def futureValAnnuity(cashflow, discountRate, periods):
+    if isinstance(discountRate, DiscountCurve):
+        factors = curveFactors(discountRate, periods)
+        return cashflow * factors[1:].sum() / factors[-1]
+    return cashflow / discountRate * ((1 + discountRate) ** periods - 1)
+
+
+def futureValAnnuityDue(cashflow, discountRate, periods):
+    if isinstance(discountRate, DiscountCurve):
+        factors = curveFactors(discountRate, periods)
+        return cashflow * factors[:-1].sum() / factors[-1]
+    return (
+        cashflow
+        / discountRate
+        * ((1 + discountRate) ** periods - 1)
+        * (1 + discountRate)
+    )
+
+
+def effectiveAnnualRate(apr, frequency):
+    return (1 + apr / frequency) ** frequency - 1
+
+
+def geometricSeriesSum(ratio, periods):
+    """
+    Closed-form sum of ratio^p for p = 1..periods, written with expm1 so it
+    stays accurate for ratios close to 1. Both arguments may be arrays.
+    """
+    ratio = np.asarray(ratio, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logRatio = np.log(ratio)
+        series = ratio * np.expm1(periods * logRatio) / np.expm1(logRatio)
+
+    return np.where(logRatio == 0, periods, series)
+
+
+def stockEvaluation(discountRate, ltGrowthRate, dividends):
+    """
+    :param dividends: dividend schedule, or a (securities, periods) array of
+        schedules with one discount and growth rate (or vector of them) per row
+    :param discountRate: rate, or DiscountCurve discounting each dividend on
+        its own date; the terminal value grows against the curve's rate to
+        the last period
+    """
+    dividends = np.asarray(dividends, dtype=float)
+    divArray = dividends[..., :-1]
+    divLast = dividends[..., -1]
+
+    numPeriods = dividends.shape[-1] - 1
+
+    if dividends.ndim == 1:
+        presVal = netPresentVal(discountRate, divArray)
+    else:
+        presVal = netPresentValBatch(discountRate, divArray)
+    presVal = presVal * (1 + periodRate(discountRate, 1))
+
+    lastDiv = divLast / (
+        np.asarray(periodRate(discountRate, numPeriods)) - ltGrowthRate
+    )
+
+    totalVal = presVal + presentVal(lastDiv, discountRate, numPeriods)
+
+    return totalVal
+
+
+def dividendDiscountModel(discountRate, dividends, growthRate, stockPrice, periods):
+    """
+    :param discountRate: rate, or DiscountCurve applied at its rate to periods
+    """
+    discountRate = periodRate(discountRate, periods)
+    growthFactor = 1 + growthRate
+    ratio = np.multiply(dividends, growthFactor) / (1 + np.asarray(discountRate))
+
+    totalCashflows = geometricSeriesSum(ratio, periods)
+
+    terminalVal = stockPrice / (1 + np.asarray(discountRate)) ** periods
+
+    return totalCashflows + terminalVal
+
+
+def gordonGrowthModel(dividend, dividendGrowthRate, requiredRateOfReturn):
+    dividendPeriodOne = np.multiply(dividend, 1 + dividendGrowthRate)
+    requiredRateOfReturn = flatRate(requiredRateOfReturn)
+
+    return dividendPeriodOne / (np.asarray(requiredRateOfReturn) - dividendGrowthRate)
+
+
+def multistageGrowthModel(
+    dividend, discountRate, growthRate, constantGrowthRate, periods
+):
+    """
+    :param discountRate: rate, or DiscountCurve applied at its rate to the
+        terminal value date, periods - 1
+    """
+    discountRate = periodRate(discountRate, np.subtract(periods, 1))
+    ratio = (1 + np.asarray(growthRate)) / (1 + np.asarray(discountRate))
+    highGrowthVal = np.multiply(
+        dividend, geometricSeriesSum(ratio, np.subtract(periods, 1))
+    )
+
+    terminalDividend = np.multiply(dividend, (1 + np.asarray(growthRate)) ** periods)
+    terminalVal = terminalDividend / (np.asarray(discountRate) - constantGrowthRate)
+    terminalValDiscount = terminalVal / (1 + np.asarray(discountRate)) ** np.subtract(
+        periods, 1
+    )
+
+    return highGrowthVal + terminalValDiscount
+
+
+def preferredStockValuation(dividend, requiredRateOfReturn):
+    return np.divide(dividend, flatRate(requiredRateOfReturn))
+
+
+VALUATION_MODELS = {
+    "dividendDiscount": dividendDiscountModel,
+    "gordonGrowth": gordonGrowthModel,
+    "multistageGrowth": multistageGrowthModel,
+    "preferredStock": preferredStockValuation,
+}
+
+
+def valueSecurities(model, **inputs):
+    """
+    Value a whole universe in one call. inputs are the keyword arguments of
+    the chosen model, each a scalar or one array entry per security, e.g.
+    valueSecurities("gordonGrowth", dividend=d, dividendGrowthRate=g,
+    requiredRateOfReturn=k).
+    """
+    if model not in VALUATION_MODELS:
+        raise Exception(
+            f"Invalid Valuation Model: Must be one of {list(VALUATION_MODELS)}"
+        )
+
+    inputs = {
+        name: value
+        if isinstance(value, DiscountCurve)
+        else np.asarray(value, dtype=float)
+        for name, value in inputs.items()
+    }
+    if "periods" in inputs:
+        inputs["periods"] = inputs["periods"].astype(int)
+
+    return np.atleast_1d(VALUATION_MODELS[model](**inputs))
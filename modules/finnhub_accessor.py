@@ -1,20 +1,207 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-import finnhub
-from dotenv import load_dotenv
+from modules import metrics
+from modules.pricing_cache import PricingCache
 
-load_dotenv()
+MAX_WORKERS = int(os.environ.get("FINNHUB_MAX_WORKERS", 8))
+# Finnhub's free tier allows 60 calls per minute and at most 30 per second.
+CALLS_PER_MINUTE = float(os.environ.get("FINNHUB_CALLS_PER_MINUTE", 60))
+BURST = int(os.environ.get("FINNHUB_BURST", 30))
+QUOTE_TTL = float(os.environ.get("FINNHUB_QUOTE_TTL", 5))
+# Calls background refreshes leave in the bucket for first-time fetches.
+REFRESH_RESERVE = int(os.environ.get("FINNHUB_REFRESH_RESERVE", 5))
 
-client = finnhub.Client(api_key=os.environ.get("FINNHUB_API_KEY"))
 
+def create_client():
+    """
+    finnhub.Client configured from the environment and .env file. Built on
+    first use rather than at import, which keeps requests/finnhub and the
+    .env lookup off the start-up path.
+    """
+    import finnhub
+    from dotenv import load_dotenv
 
-def fetch_stock_data_bulk(tickers: list[str]):
-    data = []
+    load_dotenv()
+    client = finnhub.Client(api_key=os.environ.get("FINNHUB_API_KEY"))
+    client.API_URL = os.environ.get("FINNHUB_API_URL", client.API_URL)
+    return client
+
+
+def normalize_symbols(tickers):
+    """
+    Upper-cased, stripped, unique symbols in order of first appearance.
+    """
+    return list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+
+
+class RateLimiter:
+    def __init__(
+        self, calls_per_minute, burst=1, clock=time.monotonic, sleep=time.sleep
+    ):
+        """
+        Token bucket refilled at calls_per_minute and holding at most burst
+        tokens. acquire() blocks until a token is available.
+        """
+        self.rate = calls_per_minute / 60
+        self.burst = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, reserve=0):
+        """
+        Take a token without waiting, only if reserve tokens would remain.
+
+        :return: whether a token was taken
+        """
+        with self.lock:
+            self.refill()
+            if self.tokens >= 1 + reserve:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                self.refill()
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            metrics.increment("finnhub_rate_limit_wait_seconds_total", wait)
+            self.sleep(wait)
+
+
+class QuoteFetcher:
+    def __init__(
+        self,
+        client=None,
+        max_workers=MAX_WORKERS,
+        calls_per_minute=CALLS_PER_MINUTE,
+        burst=BURST,
+        ttl=QUOTE_TTL,
+    ):
+        """
+        :param client: finnhub.Client whose HTTP session is shared by all
+            workers, created with create_client() on first use when None
+        :param max_workers: maximum number of concurrent upstream requests
+        :param calls_per_minute: client-side limit matching the upstream quota
+        :param burst: maximum number of calls made back to back
+        :param ttl: seconds a quote is served from cache
+        """
+        self.configured_client = client
+        self.connected_client = None
+        self.client_lock = threading.Lock()
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.rate_limiter = RateLimiter(calls_per_minute, burst)
+        # Quote cache; simultaneous requests for one symbol share one call.
+        self.cache = PricingCache(max_entries=10000, ttl=ttl)
+
+    @property
+    def client(self):
+        if self.connected_client is None:
+            with self.client_lock:
+                if self.connected_client is None:
+                    self.connected_client = self.connect(
+                        self.configured_client or create_client()
+                    )
+
+        return self.connected_client
+
+    def connect(self, client):
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        client._session.mount("https://", adapter)
+        client._session.mount("http://", adapter)
+        return client
 
-    for ticker in tickers:
-        equity_data = client.quote(ticker)
-        equity_data["symbol"] = ticker
+    def fetch_quote(self, ticker):
+        return self.cache.get_or_compute(ticker, lambda: self.request_quote(ticker))
+
+    def request_quote(self, ticker):
+        self.rate_limiter.acquire()
+        return self.call_quote(ticker)
+
+    def call_quote(self, ticker):
+        """
+        Upstream call, after a rate limiter token has been taken.
+
+        :return: quote dict stamped with the time it was "fetched", which stays
+            with it while it is served from cache
+        """
+        try:
+            with metrics.timer("finnhub_request_seconds", endpoint="quote"):
+                quote = self.client.quote(ticker)
+                fetched = time.time()
+        except Exception:
+            metrics.increment(
+                "finnhub_requests_total", endpoint="quote", status="error"
+            )
+            raise
+
+        metrics.increment("finnhub_requests_total", endpoint="quote", status="ok")
+        return dict(quote, fetched=fetched)
+
+    def fetch_quotes(self, tickers):
+        """
+        Fetch quotes for the unique symbols in tickers concurrently, in order
+        of first appearance.
+        """
+        symbols = normalize_symbols(tickers)
+        quotes = self.executor.map(self.fetch_quote, symbols)
+
+        return [dict(quote, symbol=symbol) for symbol, quote in zip(symbols, quotes)]
+
+    def refresh_quotes(self, tickers, reserve=REFRESH_RESERVE):
+        """
+        Background refresh: fetch fresh quotes, bypassing the cache, for as
+        many of tickers as the rate limiter allows right now while leaving
+        reserve calls for foreground fetches. Never waits for a token, so
+        tickers should be ordered most stale first; the rest wait for the
+        next refresh. The fetched quotes replace the cached ones.
+        """
+        symbols = []
+        for symbol in normalize_symbols(tickers):
+            if not self.rate_limiter.try_acquire(reserve):
+                break
+            symbols.append(symbol)
+
+        quotes = list(self.executor.map(self.call_quote, symbols))
+        with self.cache.lock:
+            for symbol, quote in zip(symbols, quotes):
+                self.cache.store(symbol, quote)
+
+        return [dict(quote, symbol=symbol) for symbol, quote in zip(symbols, quotes)]
+
+
+quote_fetcher = QuoteFetcher()
+
+
+def __getattr__(name):
+    # The shared client used to be built at import as finnhub_accessor.client.
+    if name == "client":
+        return quote_fetcher.client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def fetch_stock_data_bulk(tickers: list[str]):
+    return quote_fetcher.fetch_quotes(tickers)
 
-        data.append(equity_data)
 
-    return data
+def refresh_stock_data_bulk(tickers: list[str]):
+    return quote_fetcher.refresh_quotes(tickers)
@@ -0,0 +1,39 @@
+import importlib
+import threading
+
+
+class LazyImport:
+    def __init__(self, module, attribute=None):
+        """
+        Stand-in for a module, or an attribute of one, that is only imported
+        on first attribute access, e.g. norm = LazyImport("scipy.stats", "norm")
+        then norm.cdf(x). Keeps heavy optional imports off the start-up path.
+        """
+        self.module = module
+        self.attribute = attribute
+        self.target = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.target is None:
+            with self.lock:
+                if self.target is None:
+                    target = importlib.import_module(self.module)
+                    if self.attribute is not None:
+                        target = getattr(target, self.attribute)
+                    self.target = target
+
+        return self.target
+
+    @property
+    def loaded(self):
+        return self.target is not None
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        name = (
+            self.module if self.attribute is None else f"{self.module}.{self.attribute}"
+        )
+        return f"LazyImport({name}, loaded={self.loaded})"
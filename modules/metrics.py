@@ -0,0 +1,288 @@
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+NULL_TIMER = nullcontext()
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    __slots__ = ("labels", "name", "registry", "start")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(
+            self.name, time.perf_counter() - self.start, **self.labels
+        )
+
+
+class Metrics:
+    def __init__(self, enabled=True, buckets=LATENCY_BUCKETS):
+        """
+        In-process counters, gauges and latency histograms rendered in the
+        Prometheus text format. When disabled every recording call returns
+        after a single attribute check.
+
+        :param buckets: histogram upper bounds in seconds
+        """
+        self.enabled = enabled
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+
+    @staticmethod
+    def series_key(labels):
+        return tuple(sorted(labels.items()))
+
+    def increment(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+
+        key = self.series_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+
+        key = self.series_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = [[0] * len(self.buckets), 0.0, 0]
+
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+                    break
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def timer(self, name, **labels):
+        """
+        Context manager observing the elapsed time of its block into the
+        histogram name.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name, labels)
+
+    def timed(self, name, **labels):
+        """
+        Decorator form of timer.
+        """
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Timer(self, name, labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def gauge(self, name, callback):
+        """
+        Register a gauge whose value, or dict of {label value tuple: value},
+        is read from callback() at render time.
+        """
+        self.gauges[name] = callback
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    @staticmethod
+    def format_labels(key, extra=()):
+        pairs = [*key, *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{self.format_labels(key)} {value}")
+
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, (counts, total, count) in series.items():
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        cumulative += bucket_count
+                        labels = self.format_labels(key, [("le", bound)])
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = self.format_labels(key, [("le", "+Inf")])
+                    lines.append(f"{name}_bucket{labels} {count}")
+                    lines.append(f"{name}_sum{self.format_labels(key)} {total}")
+                    lines.append(f"{name}_count{self.format_labels(key)} {count}")
+
+        for name, callback in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {name} gauge")
+            value = callback()
+            if isinstance(value, dict):
+                for key, v in value.items():
+                    lines.append(f"{name}{self.format_labels(key)} {v}")
+            else:
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005, max_depth=40):
+        """
+        Statistical profiler for selected threads. A single background thread
+        samples the stacks of every watched thread each interval seconds, so
+        watched code runs unmodified.
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.thread = None
+
+    def watch(self, thread_id):
+        with self.lock:
+            self.samples[thread_id] = Counter()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def unwatch(self, thread_id):
+        """
+        :return: Counter of collapsed stacks ("file:function;..." from the
+            outermost frame) sampled while the thread was watched
+        """
+        with self.lock:
+            return self.samples.pop(thread_id, Counter())
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, counter in self.samples.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counter[self.collapse(frame)] += 1
+
+    def collapse(self, frame):
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+
+class RequestMonitor:
+    def __init__(self, metrics, slow_request_seconds=None, profiler=None):
+        """
+        Times requests into the http_request_duration_seconds histogram. With
+        slow_request_seconds set, each request is sampled by profiler and the
+        profile of any request slower than that is logged and kept in
+        slow_profiles.
+        """
+        self.metrics = metrics
+        self.slow_request_seconds = slow_request_seconds
+        self.profiler = profiler
+        if slow_request_seconds is not None and profiler is None:
+            self.profiler = SamplingProfiler()
+        self.slow_profiles = deque(maxlen=20)
+
+    def start(self):
+        if not self.metrics.enabled and self.profiler is None:
+            return None
+
+        if self.profiler is not None:
+            self.profiler.watch(threading.get_ident())
+        return time.perf_counter()
+
+    def finish(self, started, endpoint, method, status):
+        if started is None:
+            return
+
+        elapsed = time.perf_counter() - started
+        self.metrics.observe(
+            "http_request_duration_seconds", elapsed, endpoint=endpoint, method=method
+        )
+        self.metrics.increment(
+            "http_requests_total", endpoint=endpoint, method=method, status=status
+        )
+
+        if self.profiler is None:
+            return
+        samples = self.profiler.unwatch(threading.get_ident())
+        if elapsed >= self.slow_request_seconds:
+            profile = {
+                "Endpoint": endpoint,
+                "Seconds": elapsed,
+                "Stacks": samples.most_common(10),
+            }
+            self.slow_profiles.append(profile)
+            logger.warning(
+                "Slow request %s took %.3fs, top stacks: %s",
+                endpoint,
+                elapsed,
+                profile["Stacks"],
+            )
+
+
+def slow_request_seconds():
+    value = os.environ.get("PROFILE_SLOW_REQUESTS")
+    return None if not value else float(value)
+
+
+registry = Metrics(enabled=os.environ.get("METRICS_ENABLED", "1") != "0")
+request_monitor = RequestMonitor(registry, slow_request_seconds())
+
+increment = registry.increment
+observe = registry.observe
+timer = registry.timer
+timed = registry.timed
@@ -0,0 +1,210 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from modules.discount_curve import DiscountCurve
+from modules.option_pricer import MonteCarlo
+
+MAX_WORKERS = int(os.environ.get("MONTE_CARLO_JOB_WORKERS", MonteCarlo.DEFAULT_WORKERS))
+MAX_ACTIVE_JOBS = int(os.environ.get("MONTE_CARLO_MAX_JOBS", 16))
+MAX_FINISHED_JOBS = 1000
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class MonteCarloJobs:
+    def __init__(
+        self,
+        max_workers=MAX_WORKERS,
+        max_active_jobs=MAX_ACTIVE_JOBS,
+        max_finished_jobs=MAX_FINISHED_JOBS,
+        chunk_size=MonteCarlo.PARALLEL_CHUNK_SIZE,
+        use_processes=True,
+    ):
+        """
+        Runs Monte Carlo pricing jobs in the background. A job is split into
+        seeded chunks (see MonteCarlo.monte_carlo_parallel); each job keeps at
+        most max_workers chunks on the pool, and the coordinator submits the
+        next chunk as one completes. Running estimates are therefore available
+        while the job runs, and cancelling simply stops submitting chunks.
+        Chunk seeds are derived from the job's entropy as chunks are submitted,
+        so a job holds a chunk counter rather than one task per chunk.
+
+        :param max_active_jobs: submissions beyond this raise JobQueueFull
+        :param max_finished_jobs: finished jobs kept for status queries
+        """
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.executor = pool(max_workers=max_workers)
+        self.chunks_in_flight = max_workers
+        self.max_active_jobs = max_active_jobs
+        self.max_finished_jobs = max_finished_jobs
+        self.chunk_size = chunk_size
+
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+
+    def submit(
+        self,
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        include_greeks=0,
+        type=0,
+        num_simulations=100000,
+        seed=None,
+    ):
+        """
+        :return: id of the new job
+        """
+        if num_simulations < 1:
+            raise Exception("num_simulations must be positive")
+
+        r = DiscountCurve.as_rate(r, T)
+        seed_sequence = np.random.SeedSequence(seed)
+
+        with self.lock:
+            active = sum(job["Status"] == "running" for job in self.jobs.values())
+            if active >= self.max_active_jobs:
+                raise JobQueueFull(
+                    f"Too many Monte Carlo jobs running ({active}), retry later"
+                )
+
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                "JobId": job_id,
+                "Status": "running",
+                "Arguments": (S, K, T, r, sigma),
+                "Contract": (S, K, T, r, q, sigma, type),
+                "IncludeGreeks": bool(include_greeks),
+                "NumSimulations": num_simulations,
+                "Chunks": -(-num_simulations // self.chunk_size),
+                "NextChunk": 0,
+                "ChunksDone": 0,
+                "Simulations": 0,
+                "Seed": seed_sequence.entropy,
+                "Sums": dict.fromkeys(MonteCarlo.GREEK_SUMS, 0.0),
+                "InFlight": 0,
+            }
+            self.evict_finished()
+
+        for _ in range(self.chunks_in_flight):
+            self.submit_next_chunk(job_id)
+
+        return job_id
+
+    def submit_next_chunk(self, job_id):
+        with self.lock:
+            job = self.jobs[job_id]
+            if job["Status"] != "running" or job["NextChunk"] == job["Chunks"]:
+                return
+            i = job["NextChunk"]
+            job["NextChunk"] += 1
+            job["InFlight"] += 1
+
+        # Same child as SeedSequence(seed).spawn(...)[i], without spawning the
+        # whole list up front.
+        n = min(self.chunk_size, job["NumSimulations"] - i * self.chunk_size)
+        child = np.random.SeedSequence(job["Seed"], spawn_key=(i,))
+        task = (*job["Contract"], n, child)
+
+        future = self.executor.submit(MonteCarlo.simulate_greeks_chunk, task)
+        future.add_done_callback(
+            lambda future: self.chunk_done(job_id, task[7], future)
+        )
+
+    def chunk_done(self, job_id, simulations, future):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+
+            job["InFlight"] -= 1
+            if job["Status"] != "running":
+                return
+
+            if future.exception() is not None:
+                job["Status"] = "failed"
+                job["Error"] = str(future.exception())
+                return
+
+            for key, value in future.result().items():
+                job["Sums"][key] += value
+            job["ChunksDone"] += 1
+            job["Simulations"] += simulations
+
+            if job["ChunksDone"] == job["Chunks"]:
+                job["Status"] = "completed"
+
+        self.submit_next_chunk(job_id)
+
+    def cancel(self, job_id):
+        """
+        :return: False when the job does not exist or has already finished
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["Status"] != "running":
+                return False
+
+            job["Status"] = "cancelled"
+            return True
+
+    def status(self, job_id):
+        """
+        Status, progress and the estimate from the chunks completed so far.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+
+            status = {
+                "JobId": job_id,
+                "Status": job["Status"],
+                "Progress": job["ChunksDone"] / job["Chunks"],
+                "Simulations": job["Simulations"],
+                "Seed": job["Seed"],
+            }
+            if "Error" in job:
+                status["Error"] = job["Error"]
+
+            n = job["Simulations"]
+            if n == 0:
+                return status
+
+            sums = dict(job["Sums"])
+            S, K, T, r, sigma = job["Arguments"]
+            include_greeks = job["IncludeGreeks"]
+
+        estimates = MonteCarlo.greek_estimates(S, K, T, r, sigma, sums, n)
+        discount = np.exp(-r * T)
+        mean = sums["Price"] / n
+        variance = max(sums["PriceSquared"] / n - mean**2, 0)
+
+        status["Price"] = estimates["Price"]
+        status["StdError"] = discount * np.sqrt(variance / max(n - 1, 1))
+        if include_greeks:
+            status.update(estimates)
+
+        return status
+
+    def evict_finished(self):
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job["Status"] != "running" and job["InFlight"] == 0
+        ]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
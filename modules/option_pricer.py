@@ -1,9 +1,22 @@
 import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
+from typing import ClassVar
 
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.stats import norm
+
+from modules import metrics
+from modules import normal_distribution as norm
+from modules.discount_curve import DiscountCurve
+from modules.lazy import LazyImport
+
+# scipy.stats takes most of a second to import and is only needed for Sobol
+# sequences; load it on first use. The banded solver of the finite difference
+# engine is loaded the same way.
+qmc = LazyImport("scipy.stats", "qmc")
+linalg = LazyImport("scipy.linalg")
 
 
 class OptionType(Enum):
@@ -48,7 +61,7 @@ class StockOption:
         :param K: strike price
         :param T: time to maturity
         :param N: number of time steps
-        :param r: risk-free rate
+        :param r: risk-free rate, or a DiscountCurve
         :param q: dividend yield
         :param pu: probability at up state
         :param pd: probability at down state
@@ -60,7 +73,7 @@ class StockOption:
         self.K = K
         self.T = T
         self.N = N
-        self.r = r
+        self.r = DiscountCurve.as_rate(r, T)
         self.q = q
         self.pu = pu
         self.pd = pd
@@ -74,49 +87,74 @@ class StockOption:
 
     @property
     def df(self):
-        return math.exp(-(self.r - self.q) * self.dt)
+        return math.exp(-self.r * self.dt)
+
+    @property
+    def growth(self):
+        return math.exp((self.r - self.q) * self.dt)
 
 
 class BinomialTreeOption(StockOption):
     def init_params(self):
         self.u = 1 + self.pu
         self.d = 1 - self.pd
-        self.qu = (math.exp((self.r - self.q) * self.dt) - self.d) / (self.u - self.d)
+        self.qu = (self.growth - self.d) / (self.u - self.d)
         self.qd = 1 - self.qu
 
-    def init_stock_price_tree(self):
-        self.STs = [np.array([self.S])]
-
-        for _ in range(self.N):
-            prev_branches = self.STs[-1]
-            st = np.concatenate((prev_branches * self.u, [prev_branches[-1] * self.d]))
-            self.STs.append(st)
+    def init_stock_price_tree(self, prices):
+        """
+        Fill prices with the terminal layer S * u^(N - j) * d^j, built from
+        u/d powers. Earlier layers are recovered on the fly, since layer i is
+        layer i + 1 divided by u, so the full tree is never stored.
+        """
+        j = np.arange(self.N + 1)
+        np.multiply(j, math.log(self.d) - math.log(self.u), out=prices)
+        np.add(prices, math.log(self.S) + self.N * math.log(self.u), out=prices)
+        return np.exp(prices, out=prices)
 
-    def init_payoffs_tree(self):
+    def init_payoffs_tree(self, payoffs, prices):
         if self.option_type is OptionType.CALL:
-            return np.maximum(0, self.STs[self.N] - self.K)
+            np.subtract(prices, self.K, out=payoffs)
         else:
-            return np.maximum(0, self.K - self.STs[self.N])
+            np.subtract(self.K, prices, out=payoffs)
+        return np.maximum(payoffs, 0, out=payoffs)
 
-    def check_early_exercise(self, payoffs, node):
+    def check_early_exercise(self, payoffs, prices, scratch):
         if self.option_type is OptionType.CALL:
-            return np.maximum(payoffs, self.STs[node] - self.K)
+            exercise = np.subtract(prices, self.K, out=scratch)
         else:
-            return np.maximum(payoffs, self.K - self.STs[node])
+            exercise = np.subtract(self.K, prices, out=scratch)
+        return np.maximum(payoffs, exercise, out=payoffs)
+
+    def traverse_tree(self, payoffs, prices):
+        """
+        Backward induction in place on the N + 1 element payoffs buffer. Apart
+        from the node prices, only one scratch buffer of the same size is
+        used, so memory is O(N).
+        """
+        scratch = np.empty_like(payoffs)
+        up_df = self.qu * self.df
+        down_df = self.qd * self.df
+        inv_u = 1 / self.u
 
-    def traverse_tree(self, payoffs):
         for i in reversed(range(self.N)):
-            payoffs = (payoffs[:-1] * self.qu + payoffs[1:] * self.qd) * self.df
+            down = np.multiply(payoffs[1 : i + 2], down_df, out=scratch[: i + 1])
+            up = np.multiply(payoffs[: i + 1], up_df, out=payoffs[: i + 1])
+            np.add(up, down, out=up)
 
             if not self.is_european:
-                payoffs = self.check_early_exercise(payoffs, i)
+                layer = np.multiply(prices[: i + 1], inv_u, out=prices[: i + 1])
+                self.check_early_exercise(up, layer, scratch[: i + 1])
 
         return payoffs
 
+    @metrics.timed("pricing_seconds", engine="binomial_tree")
     def price(self):
         self.init_params()
-        self.init_stock_price_tree()
-        payoffs = self.traverse_tree(self.init_payoffs_tree())
+
+        prices = self.init_stock_price_tree(np.empty(self.N + 1))
+        payoffs = self.init_payoffs_tree(np.empty(self.N + 1), prices)
+        payoffs = self.traverse_tree(payoffs, prices)
         return payoffs[0]
 
 
@@ -134,8 +172,8 @@ class BinomialLROption(BinomialTreeOption):
 
         pbar = self.pp_2_inversion(d1, odd_N)
         self.p = self.pp_2_inversion(d2, odd_N)
-        self.u = 1 / self.df * pbar / self.p
-        self.d = (1 / self.df - self.p * self.u) / (1 - self.p)
+        self.u = self.growth * pbar / self.p
+        self.d = (self.growth - self.p * self.u) / (1 - self.p)
         self.qu = self.p
         self.qd = 1 - self.p
 
@@ -149,10 +187,309 @@ class BinomialLROption(BinomialTreeOption):
         )
 
 
+class BinomialTreeBatch:
+    """
+    Backward induction of many binomial trees at once on a 2D array of
+    contracts and nodes, with per-contract u, d, qu, df and early exercise
+    flags. All contracts share the number of steps N.
+    """
+
+    @staticmethod
+    def is_call(option_type):
+        """
+        Option types must be OptionType members: bare ints are rejected since
+        OptionType.PUT is 0 while type=0 means a call in BlackScholes and
+        MonteCarlo.
+        """
+        option_type = np.atleast_1d(np.asarray(option_type, dtype=object))
+        if not all(isinstance(t, OptionType) for t in option_type):
+            raise Exception("Invalid Option Type: Must be OptionType.CALL or .PUT")
+        return np.asarray([t is OptionType.CALL for t in option_type])
+
+    @staticmethod
+    def lr_params(S, K, T, N, r, q, sigma):
+        """
+        Vectorized BinomialLROption.init_params.
+
+        :return: u, d, qu, df arrays
+        """
+        odd_N = N if (N % 2 == 0) else (N + 1)
+        # Discount at r per step; r - q only sets the drift of the tree.
+        df = np.exp(-r * T / N)
+        growth = np.exp((r - q) * T / N)
+        log_moneyness = np.log(S / K)
+        sigma_sqrt_T = sigma * np.sqrt(T)
+        d1 = (log_moneyness + ((r - q) + sigma**2 / 2) * T) / sigma_sqrt_T
+        d2 = (log_moneyness + ((r - q) - sigma**2 / 2) * T) / sigma_sqrt_T
+
+        pbar = BinomialTreeBatch.pp_2_inversion(d1, odd_N)
+        p = BinomialTreeBatch.pp_2_inversion(d2, odd_N)
+        u = growth * pbar / p
+        d = (growth - p * u) / (1 - p)
+
+        return u, d, p, df
+
+    @staticmethod
+    def pp_2_inversion(z, n):
+        return 0.5 + np.copysign(1, z) * np.sqrt(
+            0.25
+            - 0.25
+            * np.exp(
+                -((z / (n + 1.0 / 3.0 + 0.1 / (n + 1.0))) ** 2.0) * (n + 1.0 / 6.0)
+            )
+        )
+
+    @staticmethod
+    @metrics.timed("pricing_seconds", engine="binomial_tree_batch")
+    def price(S, K, N, u, d, qu, df, option_type=OptionType.CALL, is_european=False):
+        """
+        :return: array of prices, one per contract
+        """
+        # Trees are stored node-major, (N + 1, contracts), so that each layer
+        # of every tree is one contiguous block.
+        S, K, u, d, qu, df, is_call, is_european = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (S, K, u, d, qu, df)),
+            BinomialTreeBatch.is_call(option_type),
+            np.atleast_1d(np.asarray(is_european, dtype=bool)),
+        )
+        # Calls and puts share one pass: exercise value is sign * (S - K).
+        sign = np.where(is_call, 1.0, -1.0)
+        american = ~is_european
+
+        prices = np.multiply.outer(np.arange(N + 1), np.log(d) - np.log(u))
+        prices += np.log(S) + N * np.log(u)
+        np.exp(prices, out=prices)
+
+        payoffs = np.maximum(sign * (prices - K), 0)
+        scratch = np.empty_like(payoffs)
+        up_df = qu * df
+        down_df = (1 - qu) * df
+        inv_u = 1 / u
+        sign_K = sign * K
+
+        for i in reversed(range(N)):
+            down = np.multiply(payoffs[1 : i + 2], down_df, out=scratch[: i + 1])
+            up = np.multiply(payoffs[: i + 1], up_df, out=payoffs[: i + 1])
+            np.add(up, down, out=up)
+
+            if american.any():
+                layer = np.multiply(prices[: i + 1], inv_u, out=prices[: i + 1])
+                exercise = np.multiply(layer, sign, out=scratch[: i + 1])
+                np.subtract(exercise, sign_K, out=exercise)
+                np.maximum(up, exercise, out=up, where=american)
+
+        return payoffs[0]
+
+    @staticmethod
+    def price_lr(
+        S,
+        K,
+        T=1,
+        N=2,
+        r=0.05,
+        q=0.0,
+        sigma=0.0,
+        option_type=OptionType.CALL,
+        is_european=False,
+    ):
+        """
+        Leisen-Reimer prices of a whole chain, matching BinomialLROption
+        contract by contract.
+
+        :param option_type: OptionType, or a sequence of them, one per contract
+        """
+        r = DiscountCurve.as_rate(r, T)
+        S, K, T, r, q, sigma = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (S, K, T, r, q, sigma))
+        )
+        u, d, qu, df = BinomialTreeBatch.lr_params(S, K, T, N, r, q, sigma)
+
+        return BinomialTreeBatch.price(S, K, N, u, d, qu, df, option_type, is_european)
+
+
+class FiniteDifference:
+    """
+    Crank-Nicolson solution of the Black-Scholes PDE on a uniform spot grid,
+    with Rannacher smoothing (the first steps are taken fully implicit in
+    half steps) so that gamma stays clean near the strike. Each time step is
+    a single tridiagonal solve; early exercise is enforced with the penalty
+    method, which only re-solves the same banded system. One solve values
+    the option at every spot on the grid.
+    """
+
+    RANNACHER_STEPS = 2
+    PENALTY = 1e8
+    MAX_PENALTY_ITERATIONS = 20
+    WIDTH = 5
+
+    @staticmethod
+    def spot_grid(S, K, T, sigma, num_spots, s_max=None):
+        """
+        Uniform grid from 0 to about s_max, defaulting to WIDTH standard
+        deviations above max(S, K), spaced so that S is a node.
+        """
+        if s_max is None:
+            s_max = max(S, K) * math.exp(FiniteDifference.WIDTH * sigma * math.sqrt(T))
+        s_max = max(s_max, S, K)
+        node = max(1, round(S / s_max * num_spots))
+        dS = S / node
+        return dS * np.arange(num_spots + 1)
+
+    @staticmethod
+    def operator(num_spots, r, q, sigma):
+        """
+        Coefficients of V_i-1, V_i and V_i+1 in the Black-Scholes operator at
+        S_i = i dS; at i = 0 it reduces to -r V.
+        """
+        i = np.arange(num_spots, dtype=float)
+        diffusion = 0.5 * sigma**2 * i**2
+        drift = 0.5 * (r - q) * i
+        return diffusion - drift, -2 * diffusion - r, diffusion + drift
+
+    @staticmethod
+    def upper_boundary(s_max, K, tau, r, q, is_call, is_european):
+        if not is_call:
+            return 0.0
+        forward_value = s_max * math.exp(-q * tau) - K * math.exp(-r * tau)
+        return forward_value if is_european else max(forward_value, s_max - K)
+
+    @staticmethod
+    def solve_step(lower, diagonal, upper, rhs, payoff, is_european):
+        banded = np.zeros((3, len(diagonal)))
+        banded[0, 1:] = upper[:-1]
+        banded[2, :-1] = lower[1:]
+        banded[1] = diagonal
+        values = linalg.solve_banded((1, 1), banded, rhs)
+        if is_european:
+            return values
+
+        # Penalty iteration: nodes below the payoff get a stiff pull towards
+        # it until the exercise region stops changing.
+        exercised = np.zeros(len(values), dtype=bool)
+        for _ in range(FiniteDifference.MAX_PENALTY_ITERATIONS):
+            below = values < payoff
+            if np.array_equal(below, exercised):
+                break
+            exercised = below
+            penalty = np.where(exercised, FiniteDifference.PENALTY, 0.0)
+            banded[1] = diagonal + penalty
+            values = linalg.solve_banded((1, 1), banded, rhs + penalty * payoff)
+
+        return values
+
+    @staticmethod
+    @metrics.timed("pricing_seconds", engine="finite_difference")
+    def price_grid(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        option_type=OptionType.CALL,
+        is_european=False,
+        num_spots=400,
+        num_steps=400,
+        s_max=None,
+    ):
+        """
+        :param S: spot the grid is built around; any spot on the grid can be
+            read off the result
+        :param option_type: OptionType.CALL or OptionType.PUT
+        :return: dict of arrays over the spot grid: "Spot", "Price", "Delta",
+            "Gamma" and "Theta" (per year, as in BlackScholes)
+        """
+        r = DiscountCurve.as_rate(r, T)
+        is_call = bool(BinomialTreeBatch.is_call(option_type)[0])
+        sign = 1.0 if is_call else -1.0
+
+        spots = FiniteDifference.spot_grid(S, K, T, sigma, num_spots, s_max)
+        payoff = np.maximum(sign * (spots - K), 0.0)
+        lower, middle, upper = FiniteDifference.operator(num_spots, r, q, sigma)
+
+        values = payoff[:-1].copy()
+        dt = T / num_steps
+        smoothing = min(FiniteDifference.RANNACHER_STEPS, num_steps)
+        schedule = [(0.5 * dt, 1.0)] * (2 * smoothing)
+        schedule += [(dt, 0.5)] * (num_steps - smoothing)
+
+        tau = 0.0
+        boundary = FiniteDifference.upper_boundary(
+            spots[-1], K, tau, r, q, is_call, is_european
+        )
+        for step, theta in schedule:
+            # theta-scheme: (I - theta dt L) V_new = (I + (1 - theta) dt L) V.
+            explicit = (1 - theta) * step
+            rhs = values + explicit * (middle * values)
+            rhs[1:] += explicit * lower[1:] * values[:-1]
+            rhs[:-1] += explicit * upper[:-1] * values[1:]
+            rhs[-1] += explicit * upper[-1] * boundary
+
+            tau += step
+            boundary = FiniteDifference.upper_boundary(
+                spots[-1], K, tau, r, q, is_call, is_european
+            )
+            rhs[-1] += theta * step * upper[-1] * boundary
+
+            values = FiniteDifference.solve_step(
+                -theta * step * lower,
+                1 - theta * step * middle,
+                -theta * step * upper,
+                rhs,
+                payoff[:-1],
+                is_european,
+            )
+
+        prices = np.append(values, boundary)
+        dS = spots[1]
+        delta = np.gradient(prices, dS, edge_order=2)
+        gamma = np.zeros_like(prices)
+        gamma[1:-1] = (prices[2:] - 2 * prices[1:-1] + prices[:-2]) / dS**2
+        gamma[0], gamma[-1] = gamma[1], gamma[-2]
+
+        # The PDE gives theta wherever the option is held; where it is
+        # exercised the value is the payoff, which does not decay.
+        theta = r * prices - (r - q) * spots * delta - 0.5 * sigma**2 * spots**2 * gamma
+        if not is_european:
+            theta = np.where(prices <= payoff + 1e-12, 0.0, theta)
+
+        return {
+            "Spot": spots,
+            "Price": prices,
+            "Delta": delta,
+            "Gamma": gamma,
+            "Theta": theta,
+        }
+
+    @staticmethod
+    def price(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        option_type=OptionType.CALL,
+        is_european=False,
+        num_spots=400,
+        num_steps=400,
+    ):
+        """
+        :return: dict with Price, Delta, Gamma and Theta at S
+        """
+        grid = FiniteDifference.price_grid(
+            S, K, T, r, q, sigma, option_type, is_european, num_spots, num_steps
+        )
+        node = int(np.argmin(np.abs(grid["Spot"] - S)))
+        return {
+            key: float(grid[key][node]) for key in ("Price", "Delta", "Gamma", "Theta")
+        }
+
+
 class ImpliedVolatilityModel:
     def __init__(self, S, r=0.05, T=1, q=0, N=1, option_type=OptionType.CALL):
         self.S = S
-        self.r = r
+        self.r = DiscountCurve.as_rate(r, T)
         self.T = T
         self.q = q
         self.N = N
@@ -170,24 +507,155 @@ class ImpliedVolatilityModel:
         )
         return lr_option.price()
 
-    def get_implied_volatilities(self, strikes, opt_price):
-        imp_vols = []
+    def option_valuation_batch(self, strikes, sigmas, is_european=False):
+        return BinomialTreeBatch.price_lr(
+            S=self.S,
+            K=strikes,
+            T=self.T,
+            N=self.N,
+            r=self.r,
+            q=self.q,
+            sigma=sigmas,
+            option_type=self.option_type,
+            is_european=is_european,
+        )
+
+    def get_implied_volatilities(self, strikes, opt_price, is_european=False):
+        return self.implied_volatilities(strikes, opt_price, is_european).tolist()
+
+    def implied_volatilities(
+        self, strikes, opt_prices, is_european=False, tol=1e-10, max_iter=50
+    ):
+        """
+        Solve a whole chain at once. European options are inverted in closed
+        form against BlackScholes; American options start from that solution
+        and take safeguarded Newton steps on the binomial tree price, with
+        vega from a bumped copy of the chain priced in the same tree sweep.
+        Prices outside the no-arbitrage bounds give NaN.
+        """
+        K, price = np.broadcast_arrays(
+            np.asarray(strikes, dtype=float), np.asarray(opt_prices, dtype=float)
+        )
+        bs_type = 0 if self.option_type is OptionType.CALL else 1
+        sigma = ImpliedVolatilityModel.black_scholes_implied_volatility(
+            price, self.S, K, self.T, self.r, self.q, bs_type, tol, max_iter
+        )
+        if is_european:
+            return sigma
+
+        invalid = np.isnan(sigma)
+        sigma = np.where(invalid, 0.3, sigma)
+        bump = 1e-4
+
+        def tree_price_and_vega(sigma):
+            prices = self.option_valuation_batch(
+                np.concatenate((K, K)), np.concatenate((sigma, sigma + bump))
+            )
+            return prices[: len(K)], (prices[len(K) :] - prices[: len(K)]) / bump
+
+        return np.where(
+            invalid,
+            np.nan,
+            ImpliedVolatilityModel.newton_solve(
+                tree_price_and_vega, price, sigma, 1e-4, 10.0, tol, max_iter
+            ),
+        )
+
+    @staticmethod
+    def black_scholes_implied_volatility(
+        price, S, K, T, r, q, type=0, tol=1e-10, max_iter=50
+    ):
+        """
+        Vectorized Black-Scholes implied volatility: a rational-approximation
+        initial guess followed by safeguarded Halley steps using vega and
+        vomma. type follows BlackScholes.price_option (0 call, 1 put).
+        """
+        price, S, K, T, r, q, type = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (price, S, K, T, r, q)),
+            np.asarray(type),
+        )
+        spot = S * np.exp(-q * T)
+        strike = K * np.exp(-r * T)
+        sign = np.where(type == 0, 1.0, -1.0)
+        lower = np.maximum(sign * (spot - strike), 0)
+        upper = np.where(type == 0, spot, strike)
+        invalid = (price <= lower) | (price >= upper)
+
+        sigma = ImpliedVolatilityModel.implied_volatility_guess(
+            price, spot, strike, T, sign
+        )
+
+        def price_and_derivatives(sigma):
+            result = BlackScholes.price_option_batch(S, K, T, r, q, sigma, 1, type)
+            sigma_sqrt_T = sigma * np.sqrt(T)
+            d1 = (np.log(spot / strike) + 0.5 * sigma_sqrt_T**2) / sigma_sqrt_T
+            vomma = result["Vega"] * d1 * (d1 - sigma_sqrt_T) / sigma
+            return result["Price"], result["Vega"], vomma
+
+        sigma = ImpliedVolatilityModel.newton_solve(
+            price_and_derivatives, price, sigma, 1e-6, 10.0, tol, max_iter
+        )
 
-        for i, strike in enumerate(strikes):
-            f = lambda sigma: self.option_valuation(strike, sigma) - opt_price[i]
-            imp_vol = bisection(f, 0.01, 0.99, 0.0001, 100)[0]
-            imp_vols.append(imp_vol)
+        return np.where(invalid, np.nan, sigma)
 
-        return imp_vols
+    @staticmethod
+    def implied_volatility_guess(price, spot, strike, T, sign):
+        """
+        Corrado-Miller rational approximation, applied to the call price
+        implied by put-call parity.
+        """
+        forward_gap = spot - strike
+        call = np.where(sign > 0, price, price + forward_gap)
+        centered = call - 0.5 * forward_gap
+        root = np.sqrt(np.maximum(centered**2 - forward_gap**2 / np.pi, 0))
+        sigma = np.sqrt(2 * np.pi / T) / (spot + strike) * (centered + root)
+
+        return np.clip(np.nan_to_num(sigma, nan=0.3), 1e-3, 5.0)
+
+    @staticmethod
+    def newton_solve(price_and_derivatives, target, sigma, lower, upper, tol, max_iter):
+        """
+        Element-wise Newton (or Halley, when price_and_derivatives also returns
+        the second derivative) iteration for price(sigma) = target, kept
+        inside a bisection bracket that shrinks every step.
+        """
+        lower = np.full_like(sigma, lower)
+        upper = np.full_like(sigma, upper)
+
+        for _ in range(max_iter):
+            price, vega, *vomma = price_and_derivatives(sigma)
+            diff = price - target
+            converged = np.abs(diff) <= tol
+            if converged.all():
+                break
+
+            upper = np.where(diff > 0, sigma, upper)
+            lower = np.where(diff < 0, sigma, lower)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                step = diff / vega
+                if vomma:
+                    halley = step / (1 - 0.5 * step * vomma[0] / vega)
+                    step = np.where(np.isfinite(halley), halley, step)
+
+            candidate = sigma - step
+            outside = ~((candidate > lower) & (candidate < upper))
+            candidate = np.where(outside, 0.5 * (lower + upper), candidate)
+            sigma = np.where(converged, sigma, candidate)
+
+        return sigma
 
 
 # Formulas defined here: https://www.columbia.edu/~mh2078/FoundationsFE/BlackScholes.pdf
 class BlackScholes:
     @staticmethod
+    @metrics.timed("pricing_seconds", engine="black_scholes")
     def price_option(S, K, T, r, q, sigma, include_greeks=0, type=0):
         if type not in [0, 1]:
             raise Exception("Invalid Option Type: Must be 0 (put) or 1 (call)")
 
+        r = DiscountCurve.as_rate(r, T)
+
         sqrt_T = np.sqrt(T)
         exp_neg_qT = math.exp(-q * T)
         exp_neg_rT = math.exp(-r * T)
@@ -218,6 +686,55 @@ class BlackScholes:
             "Rho": rho,
         }
 
+    @staticmethod
+    @metrics.timed("pricing_seconds", engine="black_scholes_batch")
+    def price_option_batch(S, K, T, r, q, sigma, include_greeks=0, type=0):
+        """
+        Vectorized counterpart of price_option. Every argument may be a scalar
+        or an array; they are broadcast together and d1/d2, the CDF/PDF terms
+        and all Greeks are computed once per array.
+
+        :return: dict of column arrays keyed like price_option
+        """
+        r = DiscountCurve.as_rate(r, T)
+        S, K, T, r, q, sigma, type = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, q, sigma)),
+            np.asarray(type),
+        )
+        if not np.isin(type, (0, 1)).all():
+            raise Exception("Invalid Option Type: Must be 0 (put) or 1 (call)")
+        metrics.increment("contracts_priced_total", S.size, engine="black_scholes")
+
+        sign = np.where(type == 0, 1.0, -1.0)
+        sqrt_T = np.sqrt(T)
+        sigma_sqrt_T = sigma * sqrt_T
+        exp_neg_qT = np.exp(-q * T)
+        exp_neg_rT = np.exp(-r * T)
+
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / sigma_sqrt_T
+        d2 = d1 - sigma_sqrt_T
+
+        cdf_d1, cdf_d2 = norm.cdf(np.stack((sign * d1, sign * d2)))
+        spot_term = S * exp_neg_qT
+        strike_term = K * exp_neg_rT
+
+        price = sign * (spot_term * cdf_d1 - strike_term * cdf_d2)
+
+        if not bool(include_greeks):
+            return {"Price": price}
+
+        pdf_d1 = norm.pdf(d1)
+
+        return {
+            "Price": price,
+            "Delta": sign * exp_neg_qT * cdf_d1,
+            "Gamma": pdf_d1 * exp_neg_qT / (S * sigma_sqrt_T),
+            "Theta": -(spot_term * pdf_d1 * sigma) / (2 * sqrt_T)
+            - sign * (r * strike_term * cdf_d2 - q * spot_term * cdf_d1),
+            "Vega": spot_term * pdf_d1 * sqrt_T,
+            "Rho": sign * strike_term * T * cdf_d2,
+        }
+
     @staticmethod
     def calc_delta(d1, q, T, type):
         if type == 0:
@@ -254,8 +771,55 @@ class BlackScholes:
 
 
 class MonteCarlo:
+    # Default peak memory for the low-memory engine, independent of the number
+    # of simulations.
+    MAX_MEMORY_BYTES = 32 * 2**20
+    # Paths between standard error checks when simulating to a target error.
+    CONVERGENCE_CHECK_PATHS = 2**14
+    VARIANCE_REDUCTIONS = (None, "antithetic", "control_variate", "sobol")
+    GREEK_SUMS = ("Price", "PriceSquared", "Delta", "Gamma", "Theta", "Vega", "Rho")
+    PATH_PAYOFFS = (
+        "asian_arithmetic",
+        "asian_geometric",
+        "barrier",
+        "lookback_floating",
+        "lookback_fixed",
+    )
+    BARRIER_TYPES = ("up_and_out", "up_and_in", "down_and_out", "down_and_in")
+    LSM_BASES = ("laguerre", "polynomial")
+    BASKETS = ("mean", "max", "min")
+    # Paths per independently seeded chunk of the parallel engine. Fixed so
+    # that results do not depend on the number of workers.
+    PARALLEL_CHUNK_SIZE = 2**16
+    DEFAULT_WORKERS = int(os.environ.get("MONTE_CARLO_WORKERS", os.cpu_count() or 1))
+    executors: ClassVar[dict] = {}
+    executors_lock = threading.Lock()
+
     @staticmethod
-    def price_option(S, K, T, r, q, sigma, include_greeks=0, type=0):
+    @metrics.timed("pricing_seconds", engine="monte_carlo")
+    def price_option(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        include_greeks=0,
+        type=0,
+        low_memory=False,
+        max_memory=MAX_MEMORY_BYTES,
+    ):
+        r = DiscountCurve.as_rate(r, T)
+        if low_memory:
+            if bool(include_greeks):
+                return MonteCarlo.monte_carlo_greeks(
+                    S, K, T, r, q, sigma, type, max_memory=max_memory
+                )
+            price = MonteCarlo.monte_carlo_batched(
+                S, K, T, r, q, sigma, type, max_memory=max_memory
+            )
+            return {"Price": price}
+
         price = MonteCarlo.monte_carlo(S, K, T, r, q, sigma, type)
 
         if not bool(include_greeks):
@@ -279,19 +843,772 @@ class MonteCarlo:
     def monte_carlo(
         S, K, T, r, q, sigma, type=0, num_simulations=100000, num_steps=252
     ):
+        r = DiscountCurve.as_rate(r, T)
         dt = T / num_steps
         nudt = (r - q - 0.5 * sigma**2) * dt
         sigsdt = sigma * np.sqrt(dt)
 
-        Z = np.random.normal(0, 1, (num_simulations, num_steps))
-        S_T = S * np.exp(np.cumsum(nudt + sigsdt * Z, axis=1))
+        with metrics.timer(
+            "monte_carlo_stage_seconds", stage="rng", engine="monte_carlo"
+        ):
+            Z = np.random.normal(0, 1, (num_simulations, num_steps))
+        with metrics.timer(
+            "monte_carlo_stage_seconds", stage="paths", engine="monte_carlo"
+        ):
+            S_T = S * np.exp(np.cumsum(nudt + sigsdt * Z, axis=1))
 
-        if type == 0:
-            payoffs = np.maximum(S_T[:, -1] - K, 0)
+        with metrics.timer(
+            "monte_carlo_stage_seconds", stage="payoff", engine="monte_carlo"
+        ):
+            if type == 0:
+                payoffs = np.maximum(S_T[:, -1] - K, 0)
+            else:
+                payoffs = np.maximum(K - S_T[:, -1], 0)
+            price = np.exp(-r * T) * np.mean(payoffs)
+
+        metrics.increment(
+            "monte_carlo_simulations_total", num_simulations, engine="monte_carlo"
+        )
+        metrics.increment(
+            "monte_carlo_bytes_allocated_total",
+            Z.nbytes + S_T.nbytes,
+            engine="monte_carlo",
+        )
+        return price
+
+    @staticmethod
+    def monte_carlo_batched(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        type=0,
+        num_simulations=100000,
+        num_steps=252,
+        max_memory=MAX_MEMORY_BYTES,
+        rng=None,
+    ):
+        """
+        Low-memory counterpart of monte_carlo. A European payoff only depends
+        on the terminal price, so S_T is sampled directly from the GBM
+        distribution (num_steps is accepted for signature compatibility) and
+        paths are simulated in batches sized to fit max_memory, with a running
+        payoff sum instead of a (num_simulations, num_steps) matrix.
+        """
+        r = DiscountCurve.as_rate(r, T)
+        rng = np.random.default_rng() if rng is None else rng
+        batch_size = MonteCarlo.batch_size(max_memory)
+
+        drift = (r - q - 0.5 * sigma**2) * T
+        vol = sigma * np.sqrt(T)
+
+        payoff_sum = 0.0
+        allocated = 0
+        for n in MonteCarlo.batches(num_simulations, batch_size):
+            with metrics.timer(
+                "monte_carlo_stage_seconds", stage="rng", engine="batched"
+            ):
+                Z = rng.standard_normal(n)
+            with metrics.timer(
+                "monte_carlo_stage_seconds", stage="paths", engine="batched"
+            ):
+                S_T = S * np.exp(drift + vol * Z)
+
+            with metrics.timer(
+                "monte_carlo_stage_seconds", stage="payoff", engine="batched"
+            ):
+                if type == 0:
+                    payoff_sum += np.maximum(S_T - K, 0).sum()
+                else:
+                    payoff_sum += np.maximum(K - S_T, 0).sum()
+            allocated += Z.nbytes + S_T.nbytes
+
+        metrics.increment(
+            "monte_carlo_simulations_total", num_simulations, engine="batched"
+        )
+        metrics.increment(
+            "monte_carlo_bytes_allocated_total", allocated, engine="batched"
+        )
+        return np.exp(-r * T) * payoff_sum / num_simulations
+
+    @staticmethod
+    def monte_carlo_greeks(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        type=0,
+        num_simulations=100000,
+        max_memory=MAX_MEMORY_BYTES,
+        rng=None,
+    ):
+        """
+        Price and all five Greeks from a single set of terminal draws. Delta,
+        theta, vega and rho use pathwise derivatives of the discounted payoff;
+        gamma, where the pathwise derivative of the payoff indicator vanishes,
+        uses the mixed pathwise/likelihood-ratio estimator.
+        """
+        r = DiscountCurve.as_rate(r, T)
+        rng = np.random.default_rng() if rng is None else rng
+        batch_size = MonteCarlo.batch_size(max_memory, floats_per_path=6)
+
+        sums = dict.fromkeys(MonteCarlo.GREEK_SUMS, 0.0)
+        allocated = 0
+        for n in MonteCarlo.batches(num_simulations, batch_size):
+            with metrics.timer(
+                "monte_carlo_stage_seconds", stage="rng", engine="greeks"
+            ):
+                Z = rng.standard_normal(n)
+            # Paths, payoffs and Greek sums are built together per batch.
+            with metrics.timer(
+                "monte_carlo_stage_seconds", stage="payoff", engine="greeks"
+            ):
+                batch_sums = MonteCarlo.greek_sums(S, K, T, r, q, sigma, type, Z)
+            for key, value in batch_sums.items():
+                sums[key] += value
+            # greek_sums holds about five path-sized arrays besides Z.
+            allocated += 6 * Z.nbytes
+
+        metrics.increment(
+            "monte_carlo_simulations_total", num_simulations, engine="greeks"
+        )
+        metrics.increment(
+            "monte_carlo_bytes_allocated_total", allocated, engine="greeks"
+        )
+        return MonteCarlo.greek_estimates(S, K, T, r, sigma, sums, num_simulations)
+
+    @staticmethod
+    def greek_sums(S, K, T, r, q, sigma, type, Z):
+        """
+        Running sums behind monte_carlo_greeks for one batch of terminal
+        shocks Z.
+        """
+        sqrt_T = np.sqrt(T)
+        sign = 1.0 if type == 0 else -1.0
+        S_T = S * np.exp((r - q - 0.5 * sigma**2) * T + sigma * sqrt_T * Z)
+
+        payoffs = np.maximum(sign * (S_T - K), 0)
+        # Derivative of the payoff with respect to S_T.
+        dpayoff = np.where(payoffs > 0, sign, 0.0)
+        dpayoff_S_T = dpayoff * S_T
+
+        payoff_sum = payoffs.sum()
+        dpayoff_S_T_sum = dpayoff_S_T.sum()
+
+        return {
+            "Price": payoff_sum,
+            "PriceSquared": payoffs @ payoffs,
+            "Delta": dpayoff_S_T_sum,
+            "Gamma": (dpayoff * Z).sum(),
+            "Theta": r * payoff_sum
+            - (dpayoff_S_T * (r - q - 0.5 * sigma**2 + 0.5 * sigma * Z / sqrt_T)).sum(),
+            "Vega": (dpayoff_S_T * (sqrt_T * Z - sigma * T)).sum(),
+            "Rho": T * (dpayoff_S_T_sum - payoff_sum),
+        }
+
+    @staticmethod
+    def greek_estimates(S, K, T, r, sigma, sums, num_simulations):
+        discount = np.exp(-r * T) / num_simulations
+
+        return {
+            "Price": discount * sums["Price"],
+            "Delta": discount * sums["Delta"] / S,
+            "Gamma": discount * sums["Gamma"] * K / (S**2 * sigma * np.sqrt(T)),
+            "Theta": discount * sums["Theta"],
+            "Vega": discount * sums["Vega"],
+            "Rho": discount * sums["Rho"],
+        }
+
+    @staticmethod
+    def monte_carlo_estimate(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        type=0,
+        num_simulations=100000,
+        variance_reduction=None,
+        target_stderr=None,
+        confidence=0.95,
+        num_steps=1,
+        max_memory=MAX_MEMORY_BYTES,
+        rng=None,
+        check_every=CONVERGENCE_CHECK_PATHS,
+    ):
+        """
+        Batched European Monte Carlo with a standard error and confidence
+        interval. num_simulations is an upper bound: when target_stderr is
+        given, the standard error is checked every check_every paths (or
+        memory batch, if smaller) and simulation stops once it is reached.
+
+        :param variance_reduction: None, "antithetic", "control_variate" (with
+            the discounted terminal stock price, whose mean is known in closed
+            form, as control) or "sobol" (randomized quasi-Monte Carlo blocks
+            with paths built in Brownian-bridge order over num_steps steps)
+        :return: dict with Price, StdError, ConfidenceInterval and Simulations
+        """
+        r = DiscountCurve.as_rate(r, T)
+        if variance_reduction not in MonteCarlo.VARIANCE_REDUCTIONS:
+            raise Exception(
+                f"Invalid Variance Reduction: Must be one of "
+                f"{MonteCarlo.VARIANCE_REDUCTIONS}"
+            )
+
+        rng = np.random.default_rng() if rng is None else rng
+        drift = (r - q - 0.5 * sigma**2) * T
+        vol = sigma * np.sqrt(T)
+        sign = 1.0 if type == 0 else -1.0
+        discount = np.exp(-r * T)
+        antithetic = variance_reduction == "antithetic"
+
+        if variance_reduction == "sobol":
+            batch_size = MonteCarlo.batch_size(max_memory, 2 + 2 * num_steps)
+            if target_stderr is not None:
+                batch_size = min(batch_size, check_every)
+            batch_size = MonteCarlo.sobol_block_size(num_simulations, batch_size)
+            # Only whole power-of-two blocks are simulated.
+            num_simulations = max(
+                batch_size, num_simulations - num_simulations % batch_size
+            )
+        else:
+            batch_size = MonteCarlo.batch_size(max_memory, floats_per_path=4)
+            if target_stderr is not None:
+                batch_size = min(batch_size, check_every)
+            if antithetic:
+                batch_size = max(2, batch_size - batch_size % 2)
+
+        # Running sums of the payoff Y, the control X, Y^2, X^2 and XY.
+        sums = np.zeros(5)
+        block_means = []
+        simulations = 0
+        for n in MonteCarlo.batches(num_simulations, batch_size):
+            if variance_reduction == "sobol":
+                sampler = qmc.Sobol(d=num_steps, scramble=True, seed=rng)
+                U = np.clip(sampler.random(n), 1e-16, 1 - 1e-16)
+                W_T = MonteCarlo.brownian_bridge(norm.ppf(U), T)[:, -1]
+                S_T = S * np.exp(drift + sigma * W_T)
+            elif antithetic:
+                Z = rng.standard_normal(max(1, n // 2))
+                S_T = S * np.exp(drift + vol * np.concatenate((Z, -Z)))
+            else:
+                S_T = S * np.exp(drift + vol * rng.standard_normal(n))
+
+            Y = np.maximum(sign * (S_T - K), 0)
+            X = S_T
+            if antithetic:
+                half = len(Y) // 2
+                Y = 0.5 * (Y[:half] + Y[half:])
+                X = 0.5 * (X[:half] + X[half:])
+
+            simulations += len(S_T)
+            sums += (Y.sum(), X.sum(), Y @ Y, X @ X, X @ Y)
+            block_means.append(Y.mean())
+
+            if variance_reduction == "sobol":
+                price, stderr = MonteCarlo.block_estimate(block_means)
+            else:
+                control_mean = S * np.exp((r - q) * T)
+                price, stderr = MonteCarlo.sample_estimate(
+                    sums,
+                    simulations // 2 if antithetic else simulations,
+                    control_mean if variance_reduction == "control_variate" else None,
+                )
+
+            if target_stderr is not None and discount * stderr <= target_stderr:
+                break
+
+        metrics.increment(
+            "monte_carlo_simulations_total", simulations, engine="estimate"
+        )
+        half_width = norm.ppf(0.5 + 0.5 * confidence) * discount * stderr
+
+        return {
+            "Price": discount * price,
+            "StdError": discount * stderr,
+            "ConfidenceInterval": [
+                discount * price - half_width,
+                discount * price + half_width,
+            ],
+            "Simulations": simulations,
+        }
+
+    @staticmethod
+    def monte_carlo_path_dependent(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        type=0,
+        payoff="asian_arithmetic",
+        barrier=None,
+        barrier_type="up_and_out",
+        num_simulations=100000,
+        num_steps=252,
+        max_memory=MAX_MEMORY_BYTES,
+        rng=None,
+    ):
+        """
+        Path-dependent payoffs monitored on num_steps equally spaced dates.
+        Paths are simulated in batches sized to max_memory and advanced one
+        step at a time, keeping only a running state per path (log price,
+        running sum, extremum or barrier survival probability), so memory
+        does not grow with num_steps.
+
+        :param payoff: "asian_arithmetic" or "asian_geometric" (average of the
+            monitored prices against K), "barrier" (vanilla payoff knocked in
+            or out at barrier), "lookback_floating" (S_T against the path
+            minimum for a call, maximum for a put) or "lookback_fixed" (path
+            maximum for a call, minimum for a put, against K)
+        :param barrier_type: one of MonteCarlo.BARRIER_TYPES. The barrier is
+            monitored continuously: between dates each path survives with
+            the Brownian-bridge probability of not crossing it.
+        :return: dict with Price, StdError and Simulations
+        """
+        if payoff not in MonteCarlo.PATH_PAYOFFS:
+            raise Exception(f"Invalid Payoff: Must be one of {MonteCarlo.PATH_PAYOFFS}")
+        if payoff == "barrier":
+            if barrier is None:
+                raise Exception("A barrier level must be provided")
+            if barrier_type not in MonteCarlo.BARRIER_TYPES:
+                raise Exception(
+                    f"Invalid Barrier Type: Must be one of {MonteCarlo.BARRIER_TYPES}"
+                )
+
+        r = DiscountCurve.as_rate(r, T)
+        rng = np.random.default_rng() if rng is None else rng
+        batch_size = MonteCarlo.batch_size(max_memory, floats_per_path=8)
+
+        dt = T / num_steps
+        drift = (r - q - 0.5 * sigma**2) * dt
+        vol = sigma * np.sqrt(dt)
+        sign = 1.0 if type == 0 else -1.0
+        # Lookbacks track the path maximum for fixed-strike calls and
+        # floating-strike puts, the minimum otherwise.
+        track_max = (payoff == "lookback_fixed") == (type == 0)
+        if payoff == "barrier":
+            barrier_sign = 1.0 if barrier_type.startswith("up") else -1.0
+            log_barrier = math.log(barrier)
+
+        payoff_sum = 0.0
+        payoff_sq_sum = 0.0
+        for n in MonteCarlo.batches(num_simulations, batch_size):
+            log_S = np.full(n, math.log(S))
+            state = np.zeros(n) if payoff.startswith("asian") else log_S.copy()
+            if payoff == "barrier":
+                state = np.ones(n)
+                distance = np.full(n, max(barrier_sign * (log_barrier - log_S[0]), 0))
+
+            for _ in range(num_steps):
+                log_S += drift + vol * rng.standard_normal(n)
+
+                if payoff == "asian_arithmetic":
+                    state += np.exp(log_S)
+                elif payoff == "asian_geometric":
+                    state += log_S
+                elif payoff == "barrier":
+                    # Survival probability of the bridge between the two
+                    # dates; zero once a date is on the far side.
+                    previous = distance
+                    distance = np.maximum(barrier_sign * (log_barrier - log_S), 0)
+                    state *= -np.expm1(-2 * previous * distance / (sigma**2 * dt))
+                elif track_max:
+                    np.maximum(state, log_S, out=state)
+                else:
+                    np.minimum(state, log_S, out=state)
+
+            S_T = np.exp(log_S)
+            if payoff == "asian_arithmetic":
+                payoffs = np.maximum(sign * (state / num_steps - K), 0)
+            elif payoff == "asian_geometric":
+                payoffs = np.maximum(sign * (np.exp(state / num_steps) - K), 0)
+            elif payoff == "barrier":
+                knocked_out = barrier_type.endswith("out")
+                payoffs = np.maximum(sign * (S_T - K), 0)
+                payoffs *= state if knocked_out else 1 - state
+            elif payoff == "lookback_floating":
+                payoffs = sign * (S_T - np.exp(state))
+            else:
+                payoffs = np.maximum(sign * (np.exp(state) - K), 0)
+
+            payoff_sum += payoffs.sum()
+            payoff_sq_sum += payoffs @ payoffs
+
+        metrics.increment(
+            "monte_carlo_simulations_total", num_simulations, engine="path_dependent"
+        )
+        mean = payoff_sum / num_simulations
+        variance = max(payoff_sq_sum / num_simulations - mean**2, 0)
+        discount = np.exp(-r * T)
+
+        return {
+            "Price": discount * mean,
+            "StdError": discount * np.sqrt(variance / max(num_simulations - 1, 1)),
+            "Simulations": num_simulations,
+        }
+
+    @staticmethod
+    def longstaff_schwartz(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        type=1,
+        correlation=None,
+        basket="mean",
+        num_simulations=100000,
+        num_training=50000,
+        num_steps=50,
+        basis="laguerre",
+        degree=3,
+        max_memory=MAX_MEMORY_BYTES,
+        rng=None,
+    ):
+        """
+        Least-squares Monte Carlo for options exercisable on num_steps equally
+        spaced dates in (0, T]. The exercise policy is fitted on num_training paths
+        generated backward in time: W_T is drawn first and each earlier
+        W_t from its Brownian bridge, so only the current step is ever held.
+        Continuation values are regressed on the basis over in-the-money
+        paths at each date. The price comes from num_simulations fresh paths
+        run forward in batches under that policy, which makes it an unbiased
+        estimate of a lower bound on the true price.
+
+        :param S: spot price, or one per underlying (likewise q and sigma)
+        :param correlation: positive definite correlation matrix of the
+            underlyings' Brownian motions, identity when None
+        :param basket: aggregate the payoff is written on for several
+            underlyings: "mean", "max" or "min" of the prices
+        :param basis: "laguerre" (exp(-x / 2) L_n(x) as in Longstaff and
+            Schwartz) or "polynomial" in x = S / K per underlying, up to
+            degree. Several underlyings add pairwise products and the payoff.
+        :param max_memory: caps the training set and the pricing batches
+        :return: dict with Price, StdError, Simulations, TrainingPaths and,
+            for a single underlying, the ExerciseBoundary price per date
+            (NaN where no path exercised)
+        """
+        if basis not in MonteCarlo.LSM_BASES:
+            raise Exception(f"Invalid Basis: Must be one of {MonteCarlo.LSM_BASES}")
+        if basket not in MonteCarlo.BASKETS:
+            raise Exception(f"Invalid Basket: Must be one of {MonteCarlo.BASKETS}")
+
+        r = DiscountCurve.as_rate(r, T)
+        rng = np.random.default_rng() if rng is None else rng
+        S, q, sigma = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (S, q, sigma))
+        )
+        assets = len(S)
+        try:
+            cholesky = np.linalg.cholesky(
+                np.eye(assets) if correlation is None else np.asarray(correlation)
+            )
+        except np.linalg.LinAlgError:
+            raise Exception("Invalid Correlation: Must be positive definite")
+
+        dt = T / num_steps
+        drift = r - q - 0.5 * sigma**2
+        sign = 1.0 if type == 0 else -1.0
+        step_discount = np.exp(-r * dt)
+        features = MonteCarlo.lsm_basis(np.ones((1, assets)), np.ones(1), basis, degree)
+        floats_per_path = 4 * assets + 2 * features.shape[1] + 6
+        batch_size = MonteCarlo.batch_size(max_memory, floats_per_path)
+        num_training = min(num_training, batch_size)
+
+        def payoff(S_t):
+            if assets == 1:
+                level = S_t[:, 0]
+            else:
+                level = getattr(np, basket)(S_t, axis=1)
+            return np.maximum(sign * (level - K), 0)
+
+        # Backward pass on the training paths.
+        W = np.sqrt(T) * rng.standard_normal((num_training, assets)) @ cholesky.T
+        cashflow = payoff(S * np.exp(drift * T + sigma * W))
+        coefficients = [None] * num_steps
+        boundary = np.full(num_steps, np.nan)
+        boundary[-1] = K
+
+        for k in range(num_steps - 1, 0, -1):
+            t = k * dt
+            Z = rng.standard_normal((num_training, assets)) @ cholesky.T
+            W = W * (t / (t + dt)) + np.sqrt(t * dt / (t + dt)) * Z
+            cashflow *= step_discount
+
+            S_t = S * np.exp(drift * t + sigma * W)
+            exercise_value = payoff(S_t)
+            itm = exercise_value > 0
+            X = MonteCarlo.lsm_basis(S_t[itm] / K, exercise_value[itm], basis, degree)
+            if len(X) <= X.shape[1]:
+                continue
+
+            beta = np.linalg.lstsq(X, cashflow[itm], rcond=None)[0]
+            exercise = np.zeros(num_training, dtype=bool)
+            exercise[itm] = exercise_value[itm] > X @ beta
+            cashflow[exercise] = exercise_value[exercise]
+            coefficients[k] = beta
+
+            if assets == 1 and exercise.any():
+                exercised = S_t[exercise, 0]
+                boundary[k - 1] = exercised.min() if type == 0 else exercised.max()
+
+        # Forward pass on independent pricing paths.
+        payoff_sum = 0.0
+        payoff_sq_sum = 0.0
+        for n in MonteCarlo.batches(num_simulations, batch_size):
+            W = np.zeros((n, assets))
+            values = np.zeros(n)
+            alive = np.ones(n, dtype=bool)
+
+            for k in range(1, num_steps + 1):
+                W += np.sqrt(dt) * rng.standard_normal((n, assets)) @ cholesky.T
+                S_t = S * np.exp(drift * k * dt + sigma * W)
+                exercise_value = payoff(S_t)
+
+                if k == num_steps:
+                    exercise = alive
+                elif coefficients[k] is None:
+                    continue
+                else:
+                    candidates = alive & (exercise_value > 0)
+                    X = MonteCarlo.lsm_basis(
+                        S_t[candidates] / K, exercise_value[candidates], basis, degree
+                    )
+                    exercise = np.zeros(n, dtype=bool)
+                    exercise[candidates] = (
+                        exercise_value[candidates] > X @ (coefficients[k])
+                    )
+
+                values[exercise] = exercise_value[exercise] * np.exp(-r * k * dt)
+                alive &= ~exercise
+
+            payoff_sum += values.sum()
+            payoff_sq_sum += values @ values
+
+        metrics.increment(
+            "monte_carlo_simulations_total",
+            num_simulations + num_training,
+            engine="longstaff_schwartz",
+        )
+        mean = payoff_sum / num_simulations
+        variance = max(payoff_sq_sum / num_simulations - mean**2, 0)
+
+        return {
+            "Price": mean,
+            "StdError": np.sqrt(variance / max(num_simulations - 1, 1)),
+            "Simulations": num_simulations,
+            "TrainingPaths": num_training,
+            "ExerciseBoundary": boundary if assets == 1 else None,
+        }
+
+    @staticmethod
+    def lsm_basis(x, exercise_value, basis="laguerre", degree=3):
+        """
+        Regression design matrix for Longstaff-Schwartz from prices
+        normalized by the strike, x of shape (paths, underlyings).
+        """
+        columns = [np.ones(len(x))]
+        for j in range(x.shape[1]):
+            x_j = x[:, j]
+            if basis == "laguerre":
+                weight = np.exp(-0.5 * x_j)
+                previous, current = np.ones_like(x_j), 1 - x_j
+                columns += [weight, weight * current][: degree + 1]
+                for n in range(1, degree):
+                    previous, current = (
+                        current,
+                        ((2 * n + 1 - x_j) * current - n * previous) / (n + 1),
+                    )
+                    columns.append(weight * current)
+            else:
+                columns += [x_j**n for n in range(1, degree + 1)]
+
+        if x.shape[1] > 1:
+            for i in range(x.shape[1]):
+                for j in range(i + 1, x.shape[1]):
+                    columns.append(x[:, i] * x[:, j])
+            columns.append(exercise_value)
+
+        return np.column_stack(columns)
+
+    @staticmethod
+    def sample_estimate(sums, count, control_mean=None):
+        Y_sum, X_sum, YY_sum, XX_sum, XY_sum = sums
+        if count < 2:
+            return Y_sum / count, np.inf
+
+        Y_mean = Y_sum / count
+        X_mean = X_sum / count
+        Y_var = (YY_sum - count * Y_mean**2) / (count - 1)
+
+        if control_mean is None:
+            return Y_mean, np.sqrt(max(Y_var, 0) / count)
+
+        X_var = (XX_sum - count * X_mean**2) / (count - 1)
+        XY_cov = (XY_sum - count * X_mean * Y_mean) / (count - 1)
+        beta = XY_cov / X_var if X_var > 0 else 0.0
+        residual_var = Y_var - beta * XY_cov
+
+        return (
+            Y_mean - beta * (X_mean - control_mean),
+            np.sqrt(max(residual_var, 0) / count),
+        )
+
+    @staticmethod
+    def block_estimate(block_means):
+        if len(block_means) < 2:
+            return block_means[0], np.inf
+
+        return np.mean(block_means), np.std(block_means, ddof=1) / np.sqrt(
+            len(block_means)
+        )
+
+    @staticmethod
+    def sobol_block_size(num_simulations, batch_size, min_blocks=16):
+        # Sobol points keep their balance properties in power-of-two blocks;
+        # at least min_blocks independent scrambles give the error estimate.
+        block = min(batch_size, max(2, num_simulations // min_blocks))
+        return 2 ** int(np.log2(block))
+
+    @staticmethod
+    def brownian_bridge(Z, T):
+        """
+        Build Brownian motion on num_steps equally spaced times in (0, T] from
+        normals Z of shape (paths, num_steps). Z[:, 0] fixes W_T and later
+        columns fill successive midpoints, so the leading (best distributed)
+        quasi-random dimensions drive the largest-scale path features.
+        """
+        num_paths, num_steps = Z.shape
+        t = np.linspace(0, T, num_steps + 1)
+        W = np.zeros((num_paths, num_steps + 1))
+        W[:, num_steps] = np.sqrt(T) * Z[:, 0]
+
+        column = 1
+        intervals = [(0, num_steps)]
+        while intervals:
+            next_intervals = []
+            for left, right in intervals:
+                if right - left < 2:
+                    continue
+
+                mid = (left + right) // 2
+                a, b = t[mid] - t[left], t[right] - t[mid]
+                W[:, mid] = (b * W[:, left] + a * W[:, right]) / (a + b) + np.sqrt(
+                    a * b / (a + b)
+                ) * Z[:, column]
+
+                column += 1
+                next_intervals += [(left, mid), (mid, right)]
+            intervals = next_intervals
+
+        return W[:, 1:]
+
+    @staticmethod
+    def monte_carlo_parallel(
+        S,
+        K,
+        T,
+        r,
+        q,
+        sigma,
+        type=0,
+        num_simulations=100000,
+        seed=None,
+        workers=None,
+        use_processes=False,
+        chunk_size=PARALLEL_CHUNK_SIZE,
+    ):
+        """
+        European Monte Carlo split into fixed-size chunks, each drawn from its
+        own generator spawned from np.random.SeedSequence(seed). Chunk results
+        are merged in chunk order, so for a given seed the result is
+        bit-identical for any number of workers.
+
+        :param workers: pool size, defaults to MonteCarlo.DEFAULT_WORKERS
+            (MONTE_CARLO_WORKERS environment variable)
+        :param use_processes: run chunks on a process pool instead of threads
+        :return: dict with Price, StdError, Simulations and the Seed used
+        """
+        r = DiscountCurve.as_rate(r, T)
+        seed_sequence = np.random.SeedSequence(seed)
+        sizes = list(MonteCarlo.batches(num_simulations, chunk_size))
+        tasks = [
+            (S, K, T, r, q, sigma, type, n, child)
+            for n, child in zip(sizes, seed_sequence.spawn(len(sizes)))
+        ]
+
+        workers = workers or MonteCarlo.DEFAULT_WORKERS
+        if workers <= 1:
+            results = [MonteCarlo.simulate_chunk(task) for task in tasks]
         else:
-            payoffs = np.maximum(K - S_T[:, -1], 0)
+            executor = MonteCarlo.executor(workers, use_processes)
+            results = list(executor.map(MonteCarlo.simulate_chunk, tasks))
 
-        return np.exp(-r * T) * np.mean(payoffs)
+        metrics.increment(
+            "monte_carlo_simulations_total", num_simulations, engine="parallel"
+        )
+        payoff_sum = sum(result[0] for result in results)
+        payoff_sq_sum = sum(result[1] for result in results)
+        mean = payoff_sum / num_simulations
+        variance = max(payoff_sq_sum / num_simulations - mean**2, 0)
+        discount = np.exp(-r * T)
+
+        return {
+            "Price": discount * mean,
+            "StdError": discount * np.sqrt(variance / max(num_simulations - 1, 1)),
+            "Simulations": num_simulations,
+            "Seed": seed_sequence.entropy,
+        }
+
+    @staticmethod
+    def simulate_chunk(task):
+        S, K, T, r, q, sigma, type, n, seed_sequence = task
+        rng = np.random.default_rng(seed_sequence)
+
+        S_T = S * np.exp(
+            (r - q - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * rng.standard_normal(n)
+        )
+        payoffs = np.maximum(S_T - K, 0) if type == 0 else np.maximum(K - S_T, 0)
+
+        return payoffs.sum(), payoffs @ payoffs
+
+    @staticmethod
+    def simulate_greeks_chunk(task):
+        S, K, T, r, q, sigma, type, n, seed_sequence = task
+        rng = np.random.default_rng(seed_sequence)
+
+        return MonteCarlo.greek_sums(S, K, T, r, q, sigma, type, rng.standard_normal(n))
+
+    @staticmethod
+    def executor(workers, use_processes=False):
+        """
+        Shared pools, created on first use and reused across calls.
+        """
+        key = (workers, use_processes)
+        # Request threads race to create a pool; only one may build it.
+        with MonteCarlo.executors_lock:
+            if key not in MonteCarlo.executors:
+                pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+                MonteCarlo.executors[key] = pool(max_workers=workers)
+
+            return MonteCarlo.executors[key]
+
+    @staticmethod
+    def batch_size(max_memory, floats_per_path=3):
+        return max(1, int(max_memory // (floats_per_path * 8)))
+
+    @staticmethod
+    def batches(num_simulations, batch_size):
+        for start in range(0, num_simulations, batch_size):
+            yield min(batch_size, num_simulations - start)
 
     @staticmethod
     def calc_delta_gamma(S, K, T, r, q, sigma, price, type):
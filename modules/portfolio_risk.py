@@ -0,0 +1,333 @@
+"""
+Full-revaluation market risk for books of Black-Scholes options.
+
+A book is a dict of equally long position arrays and a scenario set is a dict
+of shock arrays over the book's underlyings. Scenarios are revalued in chunks
+as one (scenarios, positions) array computation through
+BlackScholes.price_option_batch, so memory is bounded by the chunk size rather
+than by the size of the run.
+"""
+
+import numpy as np
+
+from modules import metrics
+from modules.option_pricer import BlackScholes
+
+POSITION_FIELDS = ("quantity", "underlying", "strike", "expiry", "sigma", "type")
+SCENARIO_FIELDS = ("spot_return", "vol_shift", "rate_shift")
+# Memory per scenario-position cell across the temporaries of a batch pricing.
+BYTES_PER_CELL = 8 * 24
+DEFAULT_MAX_MEMORY = 256 * 1024**2
+
+
+def make_positions(
+    quantity, underlying, strike, expiry, sigma, type=0, dividend_yield=0.0
+):
+    """
+    :param quantity: signed number of contracts held
+    :param underlying: index of each position's underlying into the spot array
+    :param strike: strike of each option
+    :param expiry: years to expiry
+    :param sigma: implied volatility of each option
+    :param type: 0 for calls, 1 for puts
+    :param dividend_yield: continuous dividend yield of each option's underlying
+    :return: dict of position arrays
+    """
+    positions = dict(
+        zip(
+            POSITION_FIELDS + ("dividend_yield",),
+            np.broadcast_arrays(
+                *(
+                    np.atleast_1d(np.asarray(x, dtype=float))
+                    for x in (quantity, underlying, strike, expiry, sigma)
+                ),
+                np.atleast_1d(np.asarray(type)),
+                np.atleast_1d(np.asarray(dividend_yield, dtype=float)),
+            ),
+        )
+    )
+    positions["underlying"] = positions["underlying"].astype(int)
+
+    if not np.isin(positions["type"], (0, 1)).all():
+        raise Exception("Invalid Option Type: Must be 0 (call) or 1 (put)")
+    if (positions["underlying"] < 0).any():
+        raise Exception("Invalid Underlying: Must be a non-negative index")
+
+    return positions
+
+
+def historical_scenarios(prices, horizon=1):
+    """
+    Scenarios from a price history: each overlapping horizon-day relative
+    move of every underlying is replayed against today's book.
+
+    :param prices: (days, underlyings) array of closing prices, oldest first
+    :return: scenario dict with no vol or rate shifts
+    """
+    prices = np.asarray(prices, dtype=float)
+    if prices.ndim == 1:
+        prices = prices[:, None]
+    if len(prices) <= horizon:
+        raise Exception("Invalid Prices: Must cover more days than the horizon")
+
+    return make_scenarios(prices[horizon:] / prices[:-horizon] - 1)
+
+
+def simulated_scenarios(
+    volatility,
+    num_scenarios=10000,
+    horizon=1 / 252,
+    correlation=None,
+    vol_of_vol=0.0,
+    rate_volatility=0.0,
+    rng=None,
+):
+    """
+    Correlated lognormal spot moves over horizon years, with optional normal
+    implied vol and parallel rate shifts.
+
+    :param volatility: annual volatility of each underlying
+    :param correlation: correlation matrix of the underlyings, independent
+        when None
+    :param vol_of_vol: annual standard deviation of the implied vol shift
+    :param rate_volatility: annual standard deviation of the rate shift
+    """
+    rng = np.random.default_rng(rng)
+    volatility = np.atleast_1d(np.asarray(volatility, dtype=float))
+    n = len(volatility)
+
+    z = rng.standard_normal((num_scenarios, n))
+    if correlation is not None:
+        try:
+            z = z @ np.linalg.cholesky(np.asarray(correlation, dtype=float)).T
+        except np.linalg.LinAlgError:
+            raise Exception("Invalid Correlation: Must be positive definite")
+
+    sqrt_h = np.sqrt(horizon)
+    spot_return = np.expm1(volatility * sqrt_h * z - 0.5 * volatility**2 * horizon)
+
+    vol_shift = 0.0
+    if vol_of_vol:
+        vol_shift = vol_of_vol * sqrt_h * rng.standard_normal((num_scenarios, n))
+    rate_shift = 0.0
+    if rate_volatility:
+        rate_shift = rate_volatility * sqrt_h * rng.standard_normal(num_scenarios)
+
+    return make_scenarios(spot_return, vol_shift, rate_shift)
+
+
+def make_scenarios(spot_return, vol_shift=0.0, rate_shift=0.0):
+    """
+    :param spot_return: (scenarios, underlyings) relative spot moves
+    :param vol_shift: absolute implied vol shifts, (scenarios, underlyings) or
+        anything broadcasting to it
+    :param rate_shift: absolute parallel rate shift per scenario
+    """
+    spot_return = np.asarray(spot_return, dtype=float)
+    if spot_return.ndim == 1:
+        spot_return = spot_return[:, None]
+
+    return {
+        "spot_return": spot_return,
+        "vol_shift": np.broadcast_to(
+            np.asarray(vol_shift, dtype=float), spot_return.shape
+        ),
+        "rate_shift": np.broadcast_to(
+            np.asarray(rate_shift, dtype=float), spot_return.shape[:1]
+        ),
+    }
+
+
+def value_positions(positions, spot, rate, sigma, expiry):
+    """
+    Per-contract value, falling back to intrinsic value for options that have
+    expired by the horizon.
+    """
+    live = expiry > 0
+    price = BlackScholes.price_option_batch(
+        spot,
+        positions["strike"],
+        np.where(live, expiry, 1.0),
+        rate,
+        positions["dividend_yield"],
+        np.maximum(sigma, 1e-8),
+        0,
+        positions["type"],
+    )["Price"]
+    if live.all():
+        return price
+
+    sign = np.where(positions["type"] == 0, 1.0, -1.0)
+    intrinsic = np.maximum(sign * (spot - positions["strike"]), 0.0)
+    return np.where(live, price, intrinsic)
+
+
+def chunk_size(num_positions, max_memory=DEFAULT_MAX_MEMORY):
+    return max(1, int(max_memory // (BYTES_PER_CELL * max(num_positions, 1))))
+
+
+def full_revaluation(
+    positions,
+    spots,
+    rate,
+    scenarios,
+    horizon=0.0,
+    max_memory=DEFAULT_MAX_MEMORY,
+    by_position=False,
+):
+    """
+    Reprice the whole book under every scenario.
+
+    :param spots: spot of each underlying today
+    :param rate: flat continuously compounded rate today
+    :param horizon: years the book ages before the shock is applied
+    :param max_memory: bytes of temporaries allowed per scenario chunk
+    :param by_position: also return the (scenarios, positions) P&L matrix;
+        only sensible for books small enough to hold it
+    :return: dict with the base book value, the P&L of every scenario and,
+        with by_position, the per-position P&L
+    """
+    spots = np.atleast_1d(np.asarray(spots, dtype=float))
+    underlying = positions["underlying"]
+    quantity = positions["quantity"]
+    if underlying.size and underlying.max() >= len(spots):
+        raise Exception("Invalid Underlying: No spot for underlying index")
+
+    base = value_positions(
+        positions, spots[underlying], rate, positions["sigma"], positions["expiry"]
+    )
+    expiry = positions["expiry"] - horizon
+
+    num_scenarios = len(scenarios["spot_return"])
+    pnl = np.empty(num_scenarios)
+    position_pnl = np.empty((num_scenarios, len(quantity))) if by_position else None
+    step = chunk_size(len(quantity), max_memory)
+
+    with metrics.timer("risk_revaluation_seconds"):
+        for start in range(0, num_scenarios, step):
+            chunk = slice(start, start + step)
+            values = value_positions(
+                positions,
+                spots[underlying] * (1 + scenarios["spot_return"][chunk, underlying]),
+                rate + scenarios["rate_shift"][chunk, None],
+                positions["sigma"] + scenarios["vol_shift"][chunk, underlying],
+                expiry,
+            )
+            values -= base
+            if by_position:
+                position_pnl[chunk] = values * quantity
+            pnl[chunk] = values @ quantity
+
+    metrics.increment("risk_revaluations_total", num_scenarios * len(quantity))
+
+    result = {"BaseValue": float(base @ quantity), "PnL": pnl}
+    if by_position:
+        result["PositionPnL"] = position_pnl
+    return result
+
+
+def sensitivities(positions, spots, rate):
+    """
+    Quantity-weighted Greeks aggregated per underlying: dollar delta and gamma
+    (per unit spot move), vega per unit vol, plus the book's rho and theta.
+    """
+    spots = np.atleast_1d(np.asarray(spots, dtype=float))
+    underlying = positions["underlying"]
+    quantity = positions["quantity"]
+
+    greeks = BlackScholes.price_option_batch(
+        spots[underlying],
+        positions["strike"],
+        positions["expiry"],
+        rate,
+        positions["dividend_yield"],
+        positions["sigma"],
+        1,
+        positions["type"],
+    )
+
+    def per_underlying(values):
+        return np.bincount(underlying, values * quantity, minlength=len(spots))
+
+    return {
+        "Delta": per_underlying(greeks["Delta"]),
+        "Gamma": per_underlying(greeks["Gamma"]),
+        "Vega": per_underlying(greeks["Vega"]),
+        "Rho": float(greeks["Rho"] @ quantity),
+        "Theta": float(greeks["Theta"] @ quantity),
+    }
+
+
+def delta_gamma_pnl(sensitivities, spots, scenarios, horizon=0.0):
+    """
+    Second-order Taylor P&L of every scenario from the book's Greeks. Each
+    position depends on a single underlying, so there are no cross-gamma
+    terms and the cost is one pass over (scenarios, underlyings).
+    """
+    spots = np.atleast_1d(np.asarray(spots, dtype=float))
+    ds = scenarios["spot_return"] * spots
+
+    return (
+        ds @ sensitivities["Delta"]
+        + 0.5 * (ds * ds) @ sensitivities["Gamma"]
+        + scenarios["vol_shift"] @ sensitivities["Vega"]
+        + scenarios["rate_shift"] * sensitivities["Rho"]
+        + sensitivities["Theta"] * horizon
+    )
+
+
+def value_at_risk(pnl, confidence=0.99):
+    """
+    Loss not exceeded with the given confidence, as a positive number.
+    """
+    if not 0 < confidence < 1:
+        raise Exception("Invalid Confidence: Must be between 0 and 1")
+    return float(-np.quantile(pnl, 1 - confidence))
+
+
+def expected_shortfall(pnl, confidence=0.99):
+    """
+    Average loss in the worst 1 - confidence fraction of scenarios.
+    """
+    if not 0 < confidence < 1:
+        raise Exception("Invalid Confidence: Must be between 0 and 1")
+    pnl = np.asarray(pnl)
+    tail = max(1, int(np.ceil(len(pnl) * (1 - confidence))))
+    return float(-np.partition(pnl, tail - 1)[:tail].mean())
+
+
+def risk_report(
+    positions,
+    spots,
+    rate,
+    scenarios,
+    confidence=0.99,
+    horizon=0.0,
+    max_memory=DEFAULT_MAX_MEMORY,
+):
+    """
+    Full-revaluation and delta-gamma VaR and expected shortfall of a book.
+
+    :return: dict with the base value, both P&L vectors and their risk
+        measures at the given confidence
+    """
+    revaluation = full_revaluation(
+        positions, spots, rate, scenarios, horizon, max_memory
+    )
+    greeks = sensitivities(positions, spots, rate)
+    approximate = delta_gamma_pnl(greeks, spots, scenarios, horizon)
+    pnl = revaluation["PnL"]
+
+    return {
+        "BaseValue": revaluation["BaseValue"],
+        "Scenarios": len(pnl),
+        "Positions": len(positions["quantity"]),
+        "Confidence": confidence,
+        "PnL": pnl,
+        "VaR": value_at_risk(pnl, confidence),
+        "ExpectedShortfall": expected_shortfall(pnl, confidence),
+        "DeltaGammaPnL": approximate,
+        "DeltaGammaVaR": value_at_risk(approximate, confidence),
+        "DeltaGammaExpectedShortfall": expected_shortfall(approximate, confidence),
+        "Sensitivities": greeks,
+    }
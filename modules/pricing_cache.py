@@ -0,0 +1,136 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def estimate_size(value):
+    """
+    Approximate memory footprint of a cached pricing result in bytes.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes + sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class PricingCache:
+    def __init__(
+        self, max_entries=1024, ttl=None, max_bytes=None, clock=time.monotonic
+    ):
+        """
+        :param max_entries: least recently used entries are evicted beyond this
+        :param ttl: seconds an entry stays valid, None to never expire
+        :param max_bytes: memory budget for cached results, None for no limit
+        :param clock: time source, injectable for tests
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result for key, computing it with compute() on a
+        miss. Callers asking for a key that is already being computed wait for
+        that computation instead of starting their own.
+        """
+        with self.lock:
+            entry = self.lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            self.store(key, value)
+            del self.in_flight[key]
+        future.set_result(value)
+
+        return value
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at is not None and self.clock() >= expires_at:
+            self.remove(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    def store(self, key, value):
+        size = estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        if key in self.entries:
+            self.remove(key)
+
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        self.entries[key] = (value, expires_at, size)
+        self.bytes += size
+
+        while len(self.entries) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "Entries": len(self.entries),
+                "Bytes": self.bytes,
+                "Hits": self.hits,
+                "Misses": self.misses,
+                "Coalesced": self.coalesced,
+                "Evictions": self.evictions,
+            }
@@ -0,0 +1,148 @@
+import math
+import threading
+import time
+
+from modules.finnhub_accessor import normalize_symbols
+
+
+class QuoteStore:
+    def __init__(
+        self,
+        feed,
+        refresh_interval=5.0,
+        idle_timeout=300.0,
+        stale_after=None,
+        clock=time.time,
+        refresh_feed=None,
+    ):
+        """
+        In-memory store of live quotes for subscribed symbols.
+
+        :param feed: polling transport, a callable taking a list of symbols and
+            returning quote dicts with a "symbol" key and optionally the
+            "fetched" time of the quote. Push transports instead call publish()
+            for every quote they receive.
+        :param refresh_interval: seconds between background refreshes
+        :param idle_timeout: symbols not read for this many seconds are
+            unsubscribed
+        :param stale_after: age in seconds after which a quote is flagged
+            stale, defaults to twice the refresh interval
+        :param clock: time source, injectable for tests
+        :param refresh_feed: feed used by background refreshes, defaults to
+            feed. It receives symbols most stale first and may return quotes
+            for only the leading ones, e.g. to stay within a rate limit.
+        """
+        self.feed = feed
+        self.refresh_feed = feed if refresh_feed is None else refresh_feed
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        self.stale_after = 2 * refresh_interval if stale_after is None else stale_after
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.quotes = {}
+        self.subscriptions = {}
+        self.refresh_errors = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def subscribe(self, symbols):
+        now = self.clock()
+        with self.lock:
+            for symbol in symbols:
+                self.subscriptions[symbol] = now
+
+    def unsubscribe(self, symbols):
+        with self.lock:
+            for symbol in symbols:
+                self.subscriptions.pop(symbol, None)
+                self.quotes.pop(symbol, None)
+
+    def publish(self, quote):
+        """
+        Store quote as of its "fetched" time, or now when it has none. A quote
+        older than the one held is ignored.
+        """
+        quote = dict(quote)
+        updated = quote.pop("fetched", None)
+        symbol = quote["symbol"]
+        with self.lock:
+            if updated is None:
+                updated = self.clock()
+            current = self.quotes.get(symbol)
+            if symbol in self.subscriptions and (
+                current is None or updated >= current[1]
+            ):
+                self.quotes[symbol] = (quote, updated)
+
+    def get(self, tickers):
+        """
+        Quotes for tickers from memory, with "updated", "age" and "stale"
+        metadata. Reading a symbol subscribes it; symbols seen for the first
+        time are fetched from the feed before returning.
+        """
+        symbols = normalize_symbols(tickers)
+        self.subscribe(symbols)
+
+        with self.lock:
+            missing = [symbol for symbol in symbols if symbol not in self.quotes]
+        if missing:
+            for quote in self.feed(missing):
+                self.publish(quote)
+
+        with self.lock:
+            return [
+                self.snapshot(symbol) for symbol in symbols if symbol in self.quotes
+            ]
+
+    def snapshot(self, symbol):
+        """
+        Called with the lock held.
+        """
+        quote, updated = self.quotes[symbol]
+        age = self.clock() - updated
+
+        return dict(quote, updated=updated, age=age, stale=age > self.stale_after)
+
+    def expire_idle(self):
+        cutoff = self.clock() - self.idle_timeout
+        with self.lock:
+            idle = [
+                s for s, accessed in self.subscriptions.items() if accessed < cutoff
+            ]
+
+        self.unsubscribe(idle)
+        return idle
+
+    def refresh(self):
+        self.expire_idle()
+        with self.lock:
+            # Symbols without a quote, then the oldest quotes, go first.
+            symbols = sorted(
+                self.subscriptions,
+                key=lambda s: self.quotes[s][1] if s in self.quotes else -math.inf,
+            )
+
+        if symbols:
+            for quote in self.refresh_feed(symbols):
+                self.publish(quote)
+
+    def run(self):
+        while not self.stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the last quotes; their age shows they are stale.
+                self.refresh_errors += 1
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.stop_event.clear()
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
@@ -1,8 +1,48 @@
-from modules import finnhub_accessor, option_pricer
+import os
+
+import numpy as np
+
+from modules import finnhub_accessor, metrics, option_pricer, xva
+from modules.monte_carlo_jobs import JobQueueFull, MonteCarloJobs
+from modules.pricing_cache import PricingCache
+from modules.quote_store import QuoteStore
+
+# What each group of routes needs loaded before it can serve a request.
+WARM_UP_FEATURES = {
+    "pricing": lambda: option_pricer.BlackScholes.price_option_batch(
+        100.0, 100.0, 1.0, 0.05, 0.0, 0.2, include_greeks=1
+    ),
+    "equity_data": lambda: finnhub_accessor.quote_fetcher.client,
+}
+
+BATCH_FIELDS = (
+    "stock_price",
+    "strike_price",
+    "time_to_expiration",
+    "risk_free_rate",
+    "dividend_yield",
+    "volatility",
+)
+XVA_MAX_PATHS = int(os.environ.get("XVA_MAX_PATHS", 20000))
+MONTE_CARLO_MAX_SIMULATIONS = int(os.environ.get("MONTE_CARLO_MAX_SIMULATIONS", 10**8))
 
 
 class RequestHandler:
+    pricing_cache = PricingCache(
+        max_entries=int(os.environ.get("PRICING_CACHE_SIZE", 1024)),
+        ttl=float(os.environ.get("PRICING_CACHE_TTL", 300)),
+        max_bytes=int(os.environ.get("PRICING_CACHE_MAX_BYTES", 16 * 2**20)),
+    )
+    monte_carlo_jobs = MonteCarloJobs()
+    quote_store = QuoteStore(
+        finnhub_accessor.fetch_stock_data_bulk,
+        refresh_interval=float(os.environ.get("QUOTE_REFRESH_INTERVAL", 5)),
+        idle_timeout=float(os.environ.get("QUOTE_IDLE_TIMEOUT", 300)),
+        refresh_feed=finnhub_accessor.refresh_stock_data_bulk,
+    )
+
     @staticmethod
+    @metrics.timed("request_stage_seconds", stage="parse_arguments")
     def parse_arguments(request):
         try:
             S = float(request.get("stock_price"))
@@ -28,28 +68,216 @@ class RequestHandler:
 
         return S, K, T, r, q, sigma, include_greeks, option_type
 
+    @staticmethod
+    @metrics.timed("request_stage_seconds", stage="parse_batch_arguments")
+    def parse_batch_arguments(request):
+        try:
+            contracts = request.get("contracts")
+            if not contracts:
+                raise Exception("At least one contract must be provided")
+
+            columns = [
+                np.array([float(contract.get(field)) for contract in contracts])
+                for field in BATCH_FIELDS
+            ]
+            option_type = np.array(
+                [int(contract.get("option_type")) for contract in contracts]
+            )
+            include_greeks = int(request.get("include_greeks", 0))
+        except (TypeError, ValueError, AttributeError) as e:
+            raise Exception(f"Invalid Input: [{e}]")
+
+        return (*columns, include_greeks, option_type)
+
+    @staticmethod
+    @metrics.timed("request_stage_seconds", stage="parse_cva_arguments")
+    def parse_cva_arguments(request):
+        try:
+            swaps = request.get("swaps")
+            if not swaps:
+                raise Exception("At least one swap must be provided")
+
+            columns = {}
+            for field in xva.SWAP_FIELDS:
+                if field not in xva.SWAP_DEFAULTS and any(
+                    field not in swap for swap in swaps
+                ):
+                    raise Exception(f"Every swap must have a {field}")
+                columns[field] = [
+                    swap.get(field, xva.SWAP_DEFAULTS.get(field)) for swap in swaps
+                ]
+
+            if not all(type(k) is int and k >= 0 for k in columns["netting_set"]):
+                raise Exception("Invalid Netting Set: Must be a non-negative integer")
+            swaps = xva.make_swaps(**columns)
+            model = xva.HullWhite(
+                float(request.get("mean_reversion", 0.03)),
+                float(request.get("rate_volatility", 0.01)),
+                float(request.get("risk_free_rate")),
+            )
+
+            lgd = float(request.get("loss_given_default", 0.6))
+            if "hazard_rate" in request:
+                hazard_rate = float(request.get("hazard_rate"))
+            else:
+                hazard_rate = float(request.get("credit_spread")) / lgd
+
+            num_paths = int(request.get("num_paths", 5000))
+            if not 0 < num_paths <= XVA_MAX_PATHS:
+                raise Exception(f"num_paths must be between 1 and {XVA_MAX_PATHS}")
+            seed = request.get("seed")
+        except (TypeError, ValueError, AttributeError) as e:
+            raise Exception(f"Invalid Input: [{e}]")
+
+        return {
+            "swaps": swaps,
+            "model": model,
+            "default_curves": xva.survival_curve(hazard_rate),
+            "lgd": lgd,
+            "num_paths": num_paths,
+            "rng": None if seed is None else int(seed),
+        }
+
+    @staticmethod
+    def cached_pricing(engine, price_option, arguments, **settings):
+        key = (engine, arguments, tuple(sorted(settings.items())))
+        result = RequestHandler.pricing_cache.get_or_compute(
+            key, lambda: price_option(*arguments, **settings)
+        )
+        return dict(result)
+
     @staticmethod
     def handle_black_scholes_calc_request(request):
         try:
-            return option_pricer.BlackScholes.price_option(
-                *RequestHandler.parse_arguments(request)
+            return RequestHandler.cached_pricing(
+                "black_scholes",
+                option_pricer.BlackScholes.price_option,
+                RequestHandler.parse_arguments(request),
             )
         except Exception as e:
             return f"Failed to price option with error: {e}"
 
+    @staticmethod
+    def handle_black_scholes_batch_request(request):
+        try:
+            result = option_pricer.BlackScholes.price_option_batch(
+                *RequestHandler.parse_batch_arguments(request)
+            )
+            return {key: column.tolist() for key, column in result.items()}
+        except Exception as e:
+            return f"Failed to price options with error: {e}"
+
     @staticmethod
     def handle_monte_carlo_calc_request(request):
         try:
-            return option_pricer.MonteCarlo.price_option(
-                *RequestHandler.parse_arguments(request)
+            # Simulate in memory-bounded batches rather than holding the full
+            # paths x steps matrix on the request thread.
+            return RequestHandler.cached_pricing(
+                "monte_carlo",
+                option_pricer.MonteCarlo.price_option,
+                RequestHandler.parse_arguments(request),
+                low_memory=True,
             )
         except Exception as e:
             return f"Failed to price option with error: {e}"
 
+    @staticmethod
+    def handle_monte_carlo_job_submit_request(request):
+        try:
+            arguments = RequestHandler.parse_arguments(request)
+            num_simulations = int(request.get("num_simulations", 100000))
+            if not 0 < num_simulations <= MONTE_CARLO_MAX_SIMULATIONS:
+                raise Exception(
+                    "num_simulations must be between 1 and "
+                    f"{MONTE_CARLO_MAX_SIMULATIONS}"
+                )
+            seed = request.get("seed")
+            job_id = RequestHandler.monte_carlo_jobs.submit(
+                *arguments,
+                num_simulations=num_simulations,
+                seed=None if seed is None else int(seed),
+            )
+            return {"JobId": job_id}
+        except JobQueueFull as e:
+            return f"Failed to submit job with error: {e}", 429
+        except Exception as e:
+            return f"Failed to submit job with error: {e}"
+
+    @staticmethod
+    def handle_monte_carlo_job_status_request(job_id):
+        status = RequestHandler.monte_carlo_jobs.status(job_id)
+        if status is None:
+            return f"Unknown job: {job_id}", 404
+        return status
+
+    @staticmethod
+    def handle_monte_carlo_job_cancel_request(job_id):
+        if not RequestHandler.monte_carlo_jobs.cancel(job_id):
+            return f"No running job: {job_id}", 404
+        return RequestHandler.monte_carlo_jobs.status(job_id)
+
+    @staticmethod
+    def handle_cva_request(request):
+        try:
+            result = xva.cva_report(**RequestHandler.parse_cva_arguments(request))
+            return {
+                "CVA": result["CVA"],
+                "Paths": result["Paths"],
+                "Times": result["Times"].tolist(),
+                "NettingSets": {
+                    str(k): {
+                        key: value.tolist() if isinstance(value, np.ndarray) else value
+                        for key, value in profile.items()
+                    }
+                    for k, profile in result["NettingSets"].items()
+                },
+            }
+        except Exception as e:
+            return f"Failed to calculate CVA with error: {e}"
+
     @staticmethod
     def handle_equity_data_request(request):
         try:
             ticker = request.get("ticker").split(",")
-            return finnhub_accessor.fetch_stock_data_bulk(ticker)
+            RequestHandler.quote_store.start()
+            return RequestHandler.quote_store.get(ticker)
         except Exception as e:
             return f"Failed to fetch data with error: {e}"
+
+    @staticmethod
+    def handle_pricing_cache_stats_request():
+        return RequestHandler.pricing_cache.stats()
+
+    @staticmethod
+    def cache_gauges():
+        pricing = RequestHandler.pricing_cache.stats()
+        quotes = finnhub_accessor.quote_fetcher.cache.stats()
+        return {
+            (("cache", cache), ("stat", stat.lower())): value
+            for cache, stats in (("pricing", pricing), ("quote", quotes))
+            for stat, value in stats.items()
+        }
+
+    @staticmethod
+    def warm_up(features=WARM_UP_FEATURES):
+        """
+        Preload the lazily imported dependencies of the given route groups so
+        the first request does not pay for them.
+        """
+        for feature in features:
+            if feature not in WARM_UP_FEATURES:
+                raise Exception(
+                    f"Invalid Feature: Must be one of {list(WARM_UP_FEATURES)}"
+                )
+            WARM_UP_FEATURES[feature]()
+
+    @staticmethod
+    def handle_metrics_request():
+        return (
+            metrics.registry.render(),
+            200,
+            {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+
+metrics.registry.gauge("cache_stats", RequestHandler.cache_gauges)
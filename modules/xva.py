@@ -0,0 +1,468 @@
+"""
+Counterparty exposure and CVA of interest rate swap books under a one-factor
+Hull-White short-rate model.
+
+Swaps are flattened once into a table of cashflows and floating resets, and
+every cashflow is weighted into the value of its netting set. Paths are
+simulated in chunks and stepped through time, so the state held at any point
+is the netting-set values of one chunk plus the fixing of each trade's current
+floating coupon; no trade x path x time cube is ever built. Between chunks only
+the exposure sums and the largest exposures the PFE quantile depends on are
+kept.
+"""
+
+import numpy as np
+
+from modules import metrics
+from modules.discount_curve import DiscountCurve
+
+SWAP_FIELDS = (
+    "notional",
+    "fixed_rate",
+    "start",
+    "maturity",
+    "frequency",
+    "payer",
+    "netting_set",
+)
+# Optional swap fields, as defaulted by make_swaps.
+SWAP_DEFAULTS = {"frequency": 4, "payer": 1, "netting_set": 0}
+# Memory per path and merged cashflow across the temporaries of one step.
+BYTES_PER_CASHFLOW = 8 * 4
+# Memory per path, netting set and exposure date: the chunk's exposures and
+# their copy while merging into the PFE tail.
+BYTES_PER_EXPOSURE = 8 * 2
+DEFAULT_MAX_MEMORY = 128 * 1024**2
+
+
+class HullWhite:
+    def __init__(self, mean_reversion, volatility, curve):
+        """
+        dr = (theta(t) - a r) dt + sigma dW, fitted exactly to curve. Paths are
+        simulated through x(t) = r(t) - phi(t), an Ornstein-Uhlenbeck process
+        started at 0, sampled exactly on any grid jointly with its integral.
+
+        :param mean_reversion: a, must be positive
+        :param volatility: sigma of the short rate
+        :param curve: DiscountCurve or flat continuously compounded rate
+        """
+        if mean_reversion <= 0:
+            raise Exception("Invalid Mean Reversion: Must be positive")
+
+        self.a = float(mean_reversion)
+        self.sigma = float(volatility)
+        self.curve = (
+            curve if isinstance(curve, DiscountCurve) else DiscountCurve.flat(curve)
+        )
+
+    def B(self, tau):
+        return -np.expm1(-self.a * np.asarray(tau, dtype=float)) / self.a
+
+    def integral_variance(self, t):
+        """
+        Variance of the integral of x over [0, t].
+        """
+        t = np.asarray(t, dtype=float)
+        return (self.sigma / self.a) ** 2 * (
+            t - 2 * self.B(t) - np.expm1(-2 * self.a * t) / (2 * self.a)
+        )
+
+    def bond_coefficients(self, t, maturities):
+        """
+        (A, B) such that the zero coupon bond P(t, T) = A exp(-B x(t)).
+        """
+        maturities = np.asarray(maturities, dtype=float)
+        V = self.integral_variance
+        A = (
+            self.curve.discount_factor(maturities)
+            / self.curve.discount_factor(t)
+            * np.exp(0.5 * (V(maturities - t) - V(maturities) + V(t)))
+        )
+        return A, self.B(maturities - t)
+
+    def bond_prices(self, t, maturities, x):
+        """
+        :return: (paths, maturities) array of P(t, T) given x(t) on each path
+        """
+        A, B = self.bond_coefficients(t, maturities)
+        prices = np.exp(np.multiply.outer(-x, B))
+        prices *= A
+        return prices
+
+    def steps(self, grid, num_paths, rng):
+        """
+        Yield (t, x, discount) at each grid time, discount being the
+        stochastic discount factor from 0 to t of every path.
+        """
+        grid = np.asarray(grid, dtype=float)
+        x = np.zeros(num_paths)
+        integral = np.zeros(num_paths)
+        previous = 0.0
+
+        for t in grid:
+            dt = t - previous
+            if dt > 0:
+                decay = np.exp(-self.a * dt)
+                b = self.B(dt)
+                x_std = self.sigma * np.sqrt(-np.expm1(-2 * self.a * dt) / (2 * self.a))
+                i_var = self.integral_variance(dt)
+                covariance = 0.5 * (self.sigma * b) ** 2
+
+                z1, z2 = rng.standard_normal((2, num_paths))
+                # Conditional on x(t_prev), (x(t), integral increment) is
+                # bivariate normal; draw both from one Cholesky factor.
+                i_noise = (
+                    covariance / x_std * z1
+                    + np.sqrt(max(i_var - (covariance / x_std) ** 2, 0.0)) * z2
+                )
+                integral += b * x + i_noise
+                x = decay * x + x_std * z1
+                previous = t
+
+            discount = self.curve.discount_factor(t) * np.exp(
+                -0.5 * self.integral_variance(t) - integral
+            )
+            yield t, x, discount
+
+    def short_rate_shift(self, t):
+        """
+        phi(t), the deterministic part of r(t) = x(t) + phi(t).
+        """
+        t = np.asarray(t, dtype=float)
+        forward = self.curve.forward_rate(t, t + 1e-6)
+        return forward + 0.5 * (self.sigma * self.B(t)) ** 2
+
+    def simulate(self, grid, num_paths=10000, rng=None):
+        """
+        :return: dict of (paths, grid) arrays of short rates and discount
+            factors
+        """
+        rng = np.random.default_rng(rng)
+        grid = np.asarray(grid, dtype=float)
+        rates = np.empty((num_paths, len(grid)))
+        discounts = np.empty((num_paths, len(grid)))
+
+        for i, (t, x, discount) in enumerate(self.steps(grid, num_paths, rng)):
+            rates[:, i] = x + self.short_rate_shift(t)
+            discounts[:, i] = discount
+
+        return {"ShortRate": rates, "Discount": discounts}
+
+
+def make_swaps(
+    notional, fixed_rate, start, maturity, frequency=4, payer=1, netting_set=0
+):
+    """
+    :param notional: notional of each swap
+    :param fixed_rate: fixed coupon rate
+    :param start: years to the first reset, not in the past
+    :param maturity: years to the final payment
+    :param frequency: payments per year on both legs
+    :param payer: 1 to pay fixed and receive floating, 0 for the reverse
+    :param netting_set: index of the netting set each swap belongs to
+    :return: dict of swap arrays
+    """
+    swaps = dict(
+        zip(
+            SWAP_FIELDS,
+            np.broadcast_arrays(
+                *(
+                    np.atleast_1d(np.asarray(x, dtype=float))
+                    for x in (notional, fixed_rate, start, maturity, frequency)
+                ),
+                np.asarray(payer),
+                np.asarray(netting_set),
+            ),
+        )
+    )
+    swaps["netting_set"] = swaps["netting_set"].astype(int)
+
+    if not np.isin(swaps["payer"], (0, 1)).all():
+        raise Exception("Invalid Payer: Must be 0 (receiver) or 1 (payer)")
+    if (swaps["start"] < 0).any():
+        raise Exception("Invalid Start: Must not be in the past")
+    if (swaps["maturity"] <= swaps["start"]).any():
+        raise Exception("Invalid Maturity: Must be after start")
+    if (swaps["frequency"] <= 0).any() or (swaps["netting_set"] < 0).any():
+        raise Exception("Invalid Swap: Frequency and netting set must be positive")
+
+    return swaps
+
+
+def swap_cashflows(swaps):
+    """
+    Flatten swaps into known cashflows and floating resets. Before a period
+    starts its floating coupon is worth N (P(t, start) - P(t, end)), so the
+    floating leg telescopes to +N at the first reset and -N at maturity; a
+    coupon in progress is worth N P(t, end) / P(reset, end) and is tracked
+    through its reset.
+
+    :return: dict of cashflow arrays and dict of reset arrays, amounts signed
+        from the point of view of the book
+    """
+    times, trades, amounts = [], [], []
+    resets = {"Trade": [], "Reset": [], "Payment": [], "Weight": []}
+
+    for i in range(len(swaps["notional"])):
+        start, maturity = swaps["start"][i], swaps["maturity"][i]
+        periods = max(1, round((maturity - start) * swaps["frequency"][i]))
+        # Rounded so that dates shared by several swaps compare equal.
+        dates = np.round(np.linspace(start, maturity, periods + 1), 8)
+        direction = 1.0 if swaps["payer"][i] == 1 else -1.0
+        notional = direction * swaps["notional"][i]
+
+        times += [dates[1:], dates[[0, -1]]]
+        trades += [np.full(periods + 2, i)]
+        amounts += [
+            -notional * swaps["fixed_rate"][i] * np.diff(dates),
+            [notional, -notional],
+        ]
+
+        resets["Trade"].append(np.full(periods, i))
+        resets["Reset"].append(dates[:-1])
+        resets["Payment"].append(dates[1:])
+        resets["Weight"].append(np.full(periods, notional))
+
+    cashflows = {
+        "Time": np.concatenate(times),
+        "Trade": np.concatenate(trades),
+        "Amount": np.concatenate(amounts),
+    }
+    resets = {key: np.concatenate(value) for key, value in resets.items()}
+    resets["Trade"] = resets["Trade"].astype(int)
+    return cashflows, resets
+
+
+def netting_set_cashflows(swaps):
+    """
+    Only netting-set values are needed, so cashflows falling on the same date,
+    and resets sharing a reset and payment date, are merged within each
+    netting set. A book on standard schedules collapses to a few hundred rows
+    whatever its number of trades. Netting sets are numbered by their rank, so
+    sparse ids do not add empty columns.
+
+    :return: dict of the netting set ids, cashflow times and (times, netting
+        sets) amounts, and dict of reset and payment dates and (periods,
+        netting sets) notionals
+    """
+    cashflows, resets = swap_cashflows(swaps)
+    netting_sets, netting_set = np.unique(swaps["netting_set"], return_inverse=True)
+    num_sets = len(netting_sets)
+
+    times, inverse = np.unique(cashflows["Time"], return_inverse=True)
+    weights = np.zeros((len(times), num_sets))
+    np.add.at(
+        weights,
+        (inverse.ravel(), netting_set[cashflows["Trade"]]),
+        cashflows["Amount"],
+    )
+
+    periods, inverse = np.unique(
+        np.column_stack((resets["Reset"], resets["Payment"])),
+        axis=0,
+        return_inverse=True,
+    )
+    reset_weights = np.zeros((len(periods), num_sets))
+    np.add.at(
+        reset_weights,
+        (inverse.ravel(), netting_set[resets["Trade"]]),
+        resets["Weight"],
+    )
+
+    return (
+        {"NettingSets": netting_sets, "Time": times, "Weights": weights},
+        {"Reset": periods[:, 0], "Payment": periods[:, 1], "Weights": reset_weights},
+    )
+
+
+def chunk_size(bytes_per_path, max_memory=DEFAULT_MAX_MEMORY):
+    return max(1, int(max_memory // max(bytes_per_path, 1)))
+
+
+def keep_largest(largest, values, count):
+    """
+    Merge values into largest along the path axis, keeping the count largest
+    of each row.
+    """
+    largest = np.concatenate((largest, values), axis=1)
+    if largest.shape[1] > count:
+        largest = np.partition(largest, -count, axis=1)[:, -count:]
+    return largest
+
+
+def quantile_from_largest(largest, num_paths, quantile):
+    """
+    np.quantile of the full sample along the path axis (linear method), given
+    its num_paths - floor((num_paths - 1) * quantile) largest values.
+    """
+    position = (num_paths - 1) * quantile
+    fraction = position - np.floor(position)
+    largest = np.sort(largest, axis=1)
+    if largest.shape[1] == 1:
+        return largest[:, 0]
+    return largest[:, 0] + fraction * (largest[:, 1] - largest[:, 0])
+
+
+@metrics.timed("pricing_seconds", engine="xva_exposure")
+def exposure_profiles(
+    swaps,
+    model,
+    exposure_times=None,
+    num_paths=5000,
+    pfe_quantile=0.95,
+    max_memory=DEFAULT_MAX_MEMORY,
+    rng=None,
+):
+    """
+    Simulate every netting set's value on exposure_times.
+
+    :param model: HullWhite model
+    :param exposure_times: dates to measure exposure on, quarterly to the last
+        maturity by default
+    :return: dict with the exposure times and, per netting set, the expected
+        exposure, discounted expected exposure, PFE and EPE profiles
+    """
+    if not 0 <= pfe_quantile <= 1:
+        raise Exception("Invalid PFE Quantile: Must be between 0 and 1")
+
+    rng = np.random.default_rng(rng)
+    if exposure_times is None:
+        horizon = swaps["maturity"].max()
+        exposure_times = np.arange(0, horizon + 0.25, 0.25)
+    exposure_times = np.asarray(exposure_times, dtype=float)
+
+    cashflows, resets = netting_set_cashflows(swaps)
+    num_sets = len(cashflows["NettingSets"])
+    num_times = len(exposure_times)
+
+    # Resets are simulation dates too, so floating coupons fix exactly.
+    grid = np.union1d(exposure_times, resets["Reset"])
+    is_exposure_time = np.isin(grid, exposure_times)
+    fixing_step = np.searchsorted(grid, resets["Reset"])
+
+    # The PFE only depends on the exposures at and above its quantile.
+    tail = num_paths - int(np.floor((num_paths - 1) * pfe_quantile))
+    largest = np.empty((num_sets, 0, num_times))
+    expected = np.zeros((num_sets, num_times))
+    discounted = np.zeros((num_sets, num_times))
+
+    exposure_bytes = BYTES_PER_EXPOSURE * num_sets * num_times
+    step = chunk_size(
+        BYTES_PER_CASHFLOW * (len(cashflows["Time"]) + len(resets["Reset"]))
+        + exposure_bytes,
+        max_memory - exposure_bytes * tail,
+    )
+
+    for start in range(0, num_paths, step):
+        paths = min(step, num_paths - start)
+        exposures = np.empty((num_sets, paths, num_times))
+        # 1 / P(reset, payment) of every period once it has reset.
+        fixings = np.zeros((paths, len(resets["Reset"])))
+        column = 0
+
+        for i, (t, x, discount) in enumerate(model.steps(grid, paths, rng)):
+            fixing = fixing_step == i
+            if fixing.any():
+                fixings[:, fixing] = 1 / model.bond_prices(
+                    t, resets["Payment"][fixing], x
+                )
+
+            if not is_exposure_time[i]:
+                continue
+
+            alive = cashflows["Time"] > t
+            values = (
+                model.bond_prices(t, cashflows["Time"][alive], x)
+                @ cashflows["Weights"][alive]
+            )
+
+            running = (resets["Reset"] <= t) & (resets["Payment"] > t)
+            if running.any():
+                coupons = model.bond_prices(t, resets["Payment"][running], x)
+                coupons *= fixings[:, running]
+                values += coupons @ resets["Weights"][running]
+
+            exposure = np.maximum(values, 0.0).T
+            exposures[:, :, column] = exposure
+            expected[:, column] += exposure.sum(axis=1)
+            discounted[:, column] += exposure @ discount
+            column += 1
+
+        largest = keep_largest(largest, exposures, tail)
+
+    metrics.increment("xva_paths_total", num_paths)
+
+    expected /= num_paths
+    pfe = quantile_from_largest(largest, num_paths, pfe_quantile)
+    horizon = exposure_times[-1] - exposure_times[0]
+    profiles = {}
+    for j, k in enumerate(cashflows["NettingSets"]):
+        ee = expected[j]
+        if horizon > 0:
+            epe = float(0.5 * (ee[1:] + ee[:-1]) @ np.diff(exposure_times) / horizon)
+        else:
+            epe = float(ee[0])
+        profiles[int(k)] = {
+            "EE": ee,
+            "DiscountedEE": discounted[j] / num_paths,
+            "PFE": pfe[j],
+            "EPE": epe,
+        }
+
+    return {"Times": exposure_times, "Paths": num_paths, "NettingSets": profiles}
+
+
+def survival_curve(hazard_rates, times=None):
+    """
+    Survival probabilities as a DiscountCurve whose forward rates are the
+    hazard rates: flat for a scalar, piecewise constant up to times otherwise.
+    """
+    if times is None:
+        return DiscountCurve.flat(hazard_rates)
+    return DiscountCurve.piecewise(times, hazard_rates)
+
+
+def calc_cva(times, discounted_ee, default_curve, lgd=0.6):
+    """
+    CVA = -LGD * sum(EE*(t_i) * PD(t_i-1, t_i)) over the exposure dates, with
+    EE* the discounted expected exposure.
+
+    :param default_curve: survival curve (see survival_curve)
+    """
+    survival = default_curve.discount_factor(np.asarray(times, dtype=float))
+    default_probabilities = -np.diff(survival)
+    return float(-lgd * (np.asarray(discounted_ee)[1:] @ default_probabilities))
+
+
+def cva_report(
+    swaps,
+    model,
+    default_curves,
+    lgd=0.6,
+    exposure_times=None,
+    num_paths=5000,
+    pfe_quantile=0.95,
+    max_memory=DEFAULT_MAX_MEMORY,
+    rng=None,
+):
+    """
+    Exposure profiles and CVA of every netting set.
+
+    :param default_curves: survival curve of the counterparty, or dict of
+        netting set to survival curve
+    :return: exposure_profiles result with a CVA per netting set and in total
+    """
+    result = exposure_profiles(
+        swaps, model, exposure_times, num_paths, pfe_quantile, max_memory, rng
+    )
+
+    total = 0.0
+    for k, profile in result["NettingSets"].items():
+        curve = (
+            default_curves[k] if isinstance(default_curves, dict) else default_curves
+        )
+        profile["CVA"] = calc_cva(result["Times"], profile["DiscountedEE"], curve, lgd)
+        total += profile["CVA"]
+
+    result["CVA"] = total
+    return result
@@ -0,0 +1,87 @@
+from modules import benchmark
+
+
+def test_measure_records_latency_and_memory():
+    result = benchmark.measure(lambda: bytearray(2**20), items=10, repeats=5)
+
+    assert result["Calls"] == 5
+    assert 0 < result["P50"] <= result["P99"]
+    assert result["Throughput"] > 0
+    assert result["PeakMemory"] >= 2**20
+
+
+def test_compare_flags_regressions_beyond_threshold(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    benchmark.save_baseline(
+        {
+            "fast": {"P50": 1.0, "PeakMemory": 100},
+            "slow": {"P50": 1.0, "PeakMemory": 100},
+        },
+        path,
+    )
+    results = {
+        "fast": {"P50": 1.2, "PeakMemory": 100},
+        "slow": {"P50": 1.5, "PeakMemory": 200},
+        "new": {"P50": 9.0, "PeakMemory": 900},
+    }
+
+    regressions = benchmark.compare(results, benchmark.load_baseline(path), 0.25)
+
+    assert regressions == [
+        ("slow", "P50", 1.0, 1.5),
+        ("slow", "PeakMemory", 100, 200),
+    ]
+
+
+def test_run_workloads():
+    results = benchmark.run(
+        ["black_scholes_chain", "monte_carlo[paths=10000,steps=1]"], repeats=2
+    )
+
+    assert set(results) == {"black_scholes_chain", "monte_carlo[paths=10000,steps=1]"}
+    assert results["black_scholes_chain"]["Throughput"] > 0
+
+
+def test_http_load_against_test_client():
+    result = benchmark.run_http(count=20, concurrency=2)
+
+    assert result["Calls"] == 20
+    assert result["Errors"] == 0
+
+
+def test_http_load_counts_error_messages():
+    from winfin import app, limiter
+
+    requests = benchmark.pricing_requests(4)
+    requests.append(("GET", "/blackScholesPricing", {"query_string": {}}))
+    limiter.enabled = False
+    try:
+        result = benchmark.http_load(app.test_client(), requests, concurrency=2)
+    finally:
+        limiter.enabled = True
+
+    assert result["Calls"] == 5
+    assert result["Errors"] == 1
+
+
+def test_missing_baseline_fails_the_gate(tmp_path, capsys):
+    status = benchmark.main(
+        [
+            "black_scholes_single",
+            "--repeats",
+            "1",
+            "--baseline",
+            str(tmp_path / "missing.json"),
+        ]
+    )
+
+    assert status == 1
+    assert "NO BASELINE" in capsys.readouterr().err
+
+
+def test_service_import_defers_heavy_modules():
+    result = benchmark.measure_import("winfin", repeats=1)
+
+    assert result["DeferredLoaded"] == []
+    assert benchmark.check_startup(dict(result, P50=0.0)) == []
+    assert benchmark.check_startup(dict(result, P50=9.0), budget=1.0)
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from modules import option_pricer
+
+STOCK_PRICE = 10.24
+STRIKE_PRICE = 10.27
+TIME_TO_EXPIRATION = 0.34
+RISK_FREE_RATE = 0.01
+VOLATILITY = 0.45
+
+
+def test_european_matches_black_scholes():
+    for option_type, bs_type in (
+        (option_pricer.OptionType.CALL, 0),
+        (option_pricer.OptionType.PUT, 1),
+    ):
+        price = option_pricer.BinomialLROption(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            T=TIME_TO_EXPIRATION,
+            N=2000,
+            r=RISK_FREE_RATE,
+            sigma=VOLATILITY,
+            option_type=option_type,
+            is_european=True,
+        ).price()
+        expected = option_pricer.BlackScholes.price_option(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            0,
+            VOLATILITY,
+            0,
+            bs_type,
+        )["Price"]
+
+        assert price == pytest.approx(expected, 1e-3)
+
+
+def test_american_put_converges_with_many_steps():
+    prices = [
+        option_pricer.BinomialLROption(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            T=TIME_TO_EXPIRATION,
+            N=N,
+            r=0.1,
+            sigma=VOLATILITY,
+            option_type=option_pricer.OptionType.PUT,
+        ).price()
+        for N in (1000, 20000)
+    ]
+
+    assert prices[0] == pytest.approx(prices[1], 1e-3)
+    assert prices[1] == pytest.approx(0.93738, 1e-4)
+
+
+def test_batch_matches_single_contract_trees():
+    strikes = np.linspace(8.0, 12.5, 10)
+    sigmas = np.linspace(0.2, 0.6, 10)
+    option_types = [option_pricer.OptionType.CALL, option_pricer.OptionType.PUT] * 5
+    is_european = np.arange(10) % 3 == 0
+
+    prices = option_pricer.BinomialTreeBatch.price_lr(
+        STOCK_PRICE,
+        strikes,
+        T=TIME_TO_EXPIRATION,
+        N=200,
+        r=RISK_FREE_RATE,
+        q=0.03,
+        sigma=sigmas,
+        option_type=option_types,
+        is_european=is_european,
+    )
+
+    for i in range(10):
+        expected = option_pricer.BinomialLROption(
+            STOCK_PRICE,
+            strikes[i],
+            T=TIME_TO_EXPIRATION,
+            N=200,
+            r=RISK_FREE_RATE,
+            q=0.03,
+            sigma=sigmas[i],
+            option_type=option_types[i],
+            is_european=is_european[i],
+        ).price()
+        assert prices[i] == pytest.approx(expected, 1e-10)
+
+
+def test_european_with_dividends_matches_black_scholes():
+    strikes = np.array([90.0, 105.0, 120.0])
+
+    for option_type, bs_type in (
+        (option_pricer.OptionType.CALL, 0),
+        (option_pricer.OptionType.PUT, 1),
+    ):
+        prices = option_pricer.BinomialTreeBatch.price_lr(
+            100,
+            strikes,
+            T=0.5,
+            N=2000,
+            r=0.03,
+            q=0.01,
+            sigma=0.25,
+            option_type=option_type,
+            is_european=True,
+        )
+        expected = option_pricer.BlackScholes.price_option_batch(
+            100, strikes, 0.5, 0.03, 0.01, 0.25, 0, bs_type
+        )["Price"]
+        single = option_pricer.BinomialLROption(
+            100,
+            105,
+            T=0.5,
+            N=2000,
+            r=0.03,
+            q=0.01,
+            sigma=0.25,
+            option_type=option_type,
+            is_european=True,
+        ).price()
+
+        np.testing.assert_allclose(prices, expected, atol=2e-3)
+        assert single == pytest.approx(expected[1], abs=2e-3)
+
+
+def test_batch_rejects_bare_int_option_types():
+    # type=0 is a call in option_pricer.BlackScholes but option_pricer.OptionType.PUT has value 0.
+    with pytest.raises(Exception, match="Invalid Option Type"):
+        option_pricer.BinomialTreeBatch.price_lr(
+            100, 105, T=0.5, N=10, sigma=0.25, option_type=0
+        )
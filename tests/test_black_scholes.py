@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from modules.option_pricer import BlackScholes
@@ -88,3 +89,47 @@ def test_put_greeks():
     assert pricing_response.get("Theta") == pytest.approx(-1.63608, 0.001)
     assert pricing_response.get("Vega") == pytest.approx(2.34744, 0.001)
     assert pricing_response.get("Rho") == pytest.approx(-1.97247, 0.001)
+
+
+def test_batch_matches_scalar_pricing():
+    strikes = np.array([8.0, STRIKE_PRICE, 12.5])
+    types = np.array([0, 1, 0])
+
+    batch_response = BlackScholes.price_option_batch(
+        STOCK_PRICE,
+        strikes,
+        TIME_TO_EXPIRATION,
+        RISK_FREE_RATE,
+        DIVIDEND_YIELD,
+        VOLATILITY,
+        1,
+        types,
+    )
+
+    for i, (strike, option_type) in enumerate(zip(strikes, types)):
+        pricing_response = BlackScholes.price_option(
+            STOCK_PRICE,
+            strike,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            1,
+            option_type,
+        )
+        for key, value in pricing_response.items():
+            assert batch_response[key][i] == pytest.approx(value, 1e-12)
+
+
+def test_batch_rejects_invalid_type():
+    with pytest.raises(Exception):
+        BlackScholes.price_option_batch(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            0,
+            [0, 2],
+        )
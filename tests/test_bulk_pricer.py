@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from modules.bulk_pricer import OUTPUT_COLUMNS, price_file
+from modules.option_pricer import BlackScholes
+
+CONTRACTS = """39, 40, 0.5, 0.1, 0.2, 1, 0
+39, 40, 0.5, 0.1, 0.2, 0, 1
+41, 40, 0.5, 0.1, 0.2, 1, 139, 40, 0.5, 0.1, 0.2, 1, 0
+41, 40, 0.5, 0.1, 0.2, 1, 1
+"""
+
+
+@pytest.fixture
+def contracts_file(tmp_path):
+    path = tmp_path / "contracts.csv"
+    path.write_text(CONTRACTS)
+    return path
+
+
+def test_csv_output_matches_scalar_pricing(contracts_file, tmp_path):
+    output_path = tmp_path / "priced.csv"
+
+    stats = price_file(contracts_file, output_path, chunk_size=2)
+    priced = np.genfromtxt(output_path, delimiter=",", names=True)
+
+    assert stats["Rows"] == 3
+    assert stats["Skipped"] == 1
+    assert priced.dtype.names == OUTPUT_COLUMNS
+    for row in priced:
+        pricing_response = BlackScholes.price_option(
+            row["S"],
+            row["K"],
+            row["T"],
+            row["r"],
+            0.0,
+            row["sigma"],
+            1,
+            int(row["type"]),
+        )
+        assert row["Price"] == pytest.approx(pricing_response["Price"], 1e-9)
+        if row["include_greeks"]:
+            assert row["Delta"] == pytest.approx(pricing_response["Delta"], 1e-9)
+        else:
+            assert np.isnan(row["Delta"])
+
+
+def test_npy_output_with_process_pool(contracts_file, tmp_path):
+    serial_path = tmp_path / "serial.npy"
+    pooled_path = tmp_path / "pooled.npy"
+
+    price_file(contracts_file, serial_path, chunk_size=1)
+    stats = price_file(contracts_file, pooled_path, chunk_size=1, workers=2)
+
+    assert stats["Rows"] == 3
+    np.testing.assert_array_equal(np.load(serial_path), np.load(pooled_path))
+
+
+def test_header_and_non_numeric_rows_are_skipped(contracts_file, tmp_path):
+    path = tmp_path / "with_header.csv"
+    path.write_text(
+        "S,K,T,r,sigma,include_greeks,type\n"
+        + CONTRACTS
+        + "39, 40, 0.5, 0.1, n/a, 1, 0\n"
+    )
+
+    stats = price_file(path, tmp_path / "priced.npy", chunk_size=2)
+    priced = np.load(tmp_path / "priced.npy")
+
+    assert stats["Rows"] == 3
+    assert stats["Skipped"] == 3
+    assert priced.shape == (3, len(OUTPUT_COLUMNS))
+    price_file(contracts_file, tmp_path / "plain.npy")
+    np.testing.assert_array_equal(priced, np.load(tmp_path / "plain.npy"))
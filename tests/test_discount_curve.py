@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from modules.discount_curve import DiscountCurve
+from modules.equity_calculations import netPresentVal
+from modules.option_pricer import BlackScholes
+
+
+def test_piecewise_forward_rates():
+    curve = DiscountCurve.piecewise([1.0, 2.0, 5.0], [0.01, 0.02, 0.03])
+
+    assert curve.discount_factor(1.5) == pytest.approx(np.exp(-0.01 - 0.5 * 0.02))
+    assert curve.forward_rate(2.5, 4.0) == pytest.approx(0.03)
+    assert curve.forward_rate(6.0, 7.0) == pytest.approx(0.03)
+    assert curve.zero_rate(2.0) == pytest.approx(0.015)
+
+
+def test_linear_zero_interpolation():
+    curve = DiscountCurve([1.0, 2.0], [0.01, 0.03], interpolation="linear_zero")
+
+    np.testing.assert_allclose(curve.zero_rate([0.5, 1.5, 3.0]), [0.01, 0.02, 0.03])
+
+
+def test_grid_factors_are_memoized():
+    curve = DiscountCurve.flat(0.05)
+
+    grid = curve.discount_factors_on_grid(0.25, 8)
+
+    assert curve.discount_factors_on_grid(0.25, 8) is grid
+    np.testing.assert_allclose(grid, np.exp(-0.05 * 0.25 * np.arange(9)))
+
+
+def test_engines_accept_curves_in_place_of_rates():
+    curve = DiscountCurve.flat(0.01)
+
+    assert BlackScholes.price_option(10.24, 10.27, 0.34, curve, 0.03, 0.45) == (
+        BlackScholes.price_option(10.24, 10.27, 0.34, 0.01, 0.03, 0.45)
+    )
+    assert netPresentVal(DiscountCurve.flat(np.log1p(0.1)), [-100, 30, 40, 50]) == (
+        pytest.approx(netPresentVal(0.1, [-100, 30, 40, 50]))
+    )
@@ -0,0 +1,184 @@
+import numpy as np
+import pytest
+
+from modules import equity_calculations
+from modules.discount_curve import DiscountCurve
+
+CASHFLOWS = [-100.0, 30.0, 40.0, 50.0]
+
+
+def test_net_present_value():
+    assert equity_calculations.netPresentVal(0.1, CASHFLOWS) == pytest.approx(
+        -2.10368144
+    )
+
+
+def test_batch_net_present_value_matches_scalar():
+    cashflows = np.array([CASHFLOWS, [-50.0, 0.0, 0.0, 80.0]])
+    rates = np.array([0.1, 0.2])
+
+    npvs = equity_calculations.netPresentValBatch(rates, cashflows)
+
+    assert npvs[0] == pytest.approx(
+        equity_calculations.netPresentVal(0.1, cashflows[0])
+    )
+    assert npvs[1] == pytest.approx(
+        equity_calculations.netPresentVal(0.2, cashflows[1])
+    )
+    np.testing.assert_allclose(
+        equity_calculations.netPresentValBatch(0.1, cashflows),
+        [equity_calculations.netPresentVal(0.1, row) for row in cashflows],
+    )
+
+
+def test_internal_rate_of_return_solves_schedules_at_once():
+    cashflows = np.array([CASHFLOWS, [-50.0, 0.0, 0.0, 80.0], [10.0, 10.0, 10.0, 10.0]])
+
+    rates = equity_calculations.internalRateOfReturn(cashflows)
+
+    assert rates[0] == pytest.approx(0.0889633947, 1e-8)
+    assert rates[1] == pytest.approx(1.6 ** (1 / 3) - 1, 1e-8)
+    assert np.isnan(rates[2])
+
+
+def test_internal_rate_of_return_of_long_schedules():
+    payment = 1e5 * 0.005 / (1 - 1.005**-360)
+    loan = [-1e5] + [payment] * 360
+    flat = [1.0] * 200
+
+    rates = equity_calculations.internalRateOfReturn([loan, [*flat, *[0.0] * 161]])
+
+    assert rates[0] == pytest.approx(0.005, 1e-8)
+    assert np.isnan(rates[1])
+    assert np.isnan(equity_calculations.internalRateOfReturn(loan, maxIter=1))
+
+
+def test_yield_to_maturity():
+    yields = equity_calculations.yieldToMaturity([100.0, 95.0], 5.0, 100.0, [10, 10])
+
+    assert yields[0] == pytest.approx(0.05, 1e-8)
+    price = equity_calculations.netPresentVal(yields[1], [0.0] + [5.0] * 9 + [105.0])
+    assert price == pytest.approx(95.0, 1e-8)
+
+
+def test_dividend_models_match_period_sums():
+    ddm = sum((2.0 * 1.05) ** p / 1.1**p for p in range(1, 11)) + 50 / 1.1**10
+    multistage = sum(2.0 * 1.15**p / 1.1**p for p in range(1, 8)) + (
+        2.0 * 1.15**8 / (0.1 - 0.03) / 1.1**7
+    )
+
+    assert equity_calculations.dividendDiscountModel(
+        0.1, 2.0, 0.05, 50, 10
+    ) == pytest.approx(ddm)
+    assert equity_calculations.multistageGrowthModel(
+        2.0, 0.1, 0.15, 0.03, 8
+    ) == pytest.approx(multistage)
+    assert equity_calculations.multistageGrowthModel(
+        2.0, 0.1, 0.1, 0.03, 8
+    ) == pytest.approx(7 * 2.0 + 2.0 * 1.1 / 0.07)
+
+
+def test_dividend_models_accept_a_discount_curve():
+    flat = DiscountCurve.flat(np.log1p(0.1))
+    dividends = [1.0, 1.1, 1.2, 1.3]
+
+    for model, arguments in (
+        (equity_calculations.stockEvaluation, (0.03, dividends)),
+        (equity_calculations.dividendDiscountModel, (2.0, 0.05, 50, 10)),
+    ):
+        assert model(flat, *arguments) == pytest.approx(model(0.1, *arguments))
+    assert equity_calculations.multistageGrowthModel(
+        2.0, flat, 0.15, 0.03, 8
+    ) == pytest.approx(
+        equity_calculations.multistageGrowthModel(2.0, 0.1, 0.15, 0.03, 8)
+    )
+
+    # On a sloped curve each dividend is discounted on its own date.
+    curve = DiscountCurve([1, 3], [0.05, 0.08])
+    P = curve.discount_factor(np.arange(4))
+    expected = (1.0 * P[0] + 1.1 * P[1] + 1.2 * P[2]) / P[1] + 1.3 / (
+        P[3] ** (-1 / 3) - 1 - 0.03
+    ) * P[3]
+    assert equity_calculations.stockEvaluation(curve, 0.03, dividends) == pytest.approx(
+        expected
+    )
+    np.testing.assert_allclose(
+        equity_calculations.valueSecurities(
+            "dividendDiscount",
+            discountRate=curve,
+            dividends=2.0,
+            growthRate=0.05,
+            stockPrice=50,
+            periods=[3, 10],
+        ),
+        [
+            equity_calculations.dividendDiscountModel(curve, 2.0, 0.05, 50, n)
+            for n in (3, 10)
+        ],
+    )
+
+
+def test_annuities_accept_a_discount_curve():
+    flat = DiscountCurve.flat(np.log1p(0.06))
+
+    for function, arguments in (
+        (equity_calculations.presentValAnnuity, (100.0, 12)),
+        (equity_calculations.presentValAnnuityDue, (100.0, 12)),
+        (equity_calculations.futureValAnnuity, (100.0, 12)),
+        (equity_calculations.futureValAnnuityDue, (100.0, 12)),
+    ):
+        rate_value = function(arguments[0], 0.06, arguments[1])
+        assert function(arguments[0], flat, arguments[1]) == pytest.approx(rate_value)
+    assert equity_calculations.presentValGrowingAnnuity(
+        100.0, flat, 12, 0.02
+    ) == pytest.approx(
+        equity_calculations.presentValGrowingAnnuity(100.0, 0.06, 12, 0.02)
+    )
+
+    assert equity_calculations.presentValGrowingAnnuity(
+        100.0, 0.06, 12, 0.02
+    ) == pytest.approx(sum(100.0 * 1.02 ** (t - 1) / 1.06**t for t in range(1, 13)))
+
+    curve = DiscountCurve([1, 5], [0.02, 0.05])
+    P = curve.discount_factor(np.arange(6))
+    assert equity_calculations.presentValAnnuity(100.0, curve, 5) == pytest.approx(
+        100.0 * P[1:].sum()
+    )
+    assert equity_calculations.futureValAnnuityDue(100.0, curve, 5) == pytest.approx(
+        100.0 * P[:-1].sum() / P[-1]
+    )
+
+
+def test_flat_rate_models_reject_a_discount_curve():
+    flat = DiscountCurve.flat(0.06)
+
+    for function, arguments in (
+        (equity_calculations.presentValPerpetuity, (100.0, flat)),
+        (equity_calculations.presentValPerpetuityDue, (100.0, flat)),
+        (equity_calculations.gordonGrowthModel, (2.0, 0.03, flat)),
+        (equity_calculations.preferredStockValuation, (2.0, flat)),
+    ):
+        with pytest.raises(Exception, match="Invalid Discount Rate"):
+            function(*arguments)
+
+
+def test_value_securities_in_one_call():
+    dividends = np.array([1.0, 2.0, 3.0])
+    growthRates = np.array([0.02, 0.03, 0.04])
+
+    values = equity_calculations.valueSecurities(
+        "gordonGrowth",
+        dividend=dividends,
+        dividendGrowthRate=growthRates,
+        requiredRateOfReturn=0.09,
+    )
+
+    np.testing.assert_allclose(
+        values,
+        [
+            equity_calculations.gordonGrowthModel(d, g, 0.09)
+            for d, g in zip(dividends, growthRates)
+        ],
+    )
+    with pytest.raises(Exception):
+        equity_calculations.valueSecurities("unknown", dividend=dividends)
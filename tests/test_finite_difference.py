@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from modules import option_pricer
+
+STOCK_PRICE = 100
+STRIKE_PRICE = 105
+TIME_TO_EXPIRATION = 0.5
+RISK_FREE_RATE = 0.03
+DIVIDEND_YIELD = 0.01
+VOLATILITY = 0.25
+
+
+def test_european_grid_matches_black_scholes_at_every_spot():
+    for option_type, bs_type in (
+        (option_pricer.OptionType.CALL, 0),
+        (option_pricer.OptionType.PUT, 1),
+    ):
+        grid = option_pricer.FiniteDifference.price_grid(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            option_type,
+            is_european=True,
+        )
+        ladder = (grid["Spot"] >= 70) & (grid["Spot"] <= 140)
+        expected = option_pricer.BlackScholes.price_option_batch(
+            grid["Spot"][ladder],
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            1,
+            bs_type,
+        )
+
+        for key, tolerance in (
+            ("Price", 2e-3),
+            ("Delta", 1e-4),
+            ("Gamma", 1e-5),
+            ("Theta", 2e-3),
+        ):
+            np.testing.assert_allclose(
+                grid[key][ladder], expected[key], atol=tolerance, err_msg=key
+            )
+
+
+@pytest.mark.parametrize(
+    "option_type, strike, dividend_yield",
+    [
+        (option_pricer.OptionType.PUT, STRIKE_PRICE, 0),
+        (option_pricer.OptionType.PUT, STRIKE_PRICE, DIVIDEND_YIELD),
+        # A high yield makes early exercise of the call worthwhile.
+        (option_pricer.OptionType.CALL, 95, 0.05),
+    ],
+)
+def test_american_matches_binomial_tree(option_type, strike, dividend_yield):
+    price = option_pricer.FiniteDifference.price(
+        STOCK_PRICE,
+        strike,
+        TIME_TO_EXPIRATION,
+        RISK_FREE_RATE,
+        dividend_yield,
+        VOLATILITY,
+        option_type,
+        num_spots=800,
+        num_steps=800,
+    )
+    tree_price = option_pricer.BinomialLROption(
+        STOCK_PRICE,
+        strike,
+        T=TIME_TO_EXPIRATION,
+        N=2001,
+        r=RISK_FREE_RATE,
+        q=dividend_yield,
+        sigma=VOLATILITY,
+        option_type=option_type,
+    ).price()
+
+    assert price["Price"] == pytest.approx(tree_price, abs=2e-3)
+    assert (price["Delta"] < 0) == (option_type is option_pricer.OptionType.PUT)
+    assert price["Gamma"] > 0
+
+
+def test_american_put_exercise_region():
+    grid = option_pricer.FiniteDifference.price_grid(
+        STOCK_PRICE,
+        STRIKE_PRICE,
+        TIME_TO_EXPIRATION,
+        RISK_FREE_RATE,
+        DIVIDEND_YIELD,
+        VOLATILITY,
+        option_pricer.OptionType.PUT,
+    )
+    intrinsic = np.maximum(STRIKE_PRICE - grid["Spot"], 0)
+
+    assert (grid["Price"] >= intrinsic - 1e-6).all()
+    deep = grid["Spot"] < 60
+    np.testing.assert_allclose(grid["Price"][deep], intrinsic[deep], atol=1e-6)
+    np.testing.assert_allclose(grid["Delta"][deep][1:], -1, atol=1e-6)
+    assert (grid["Theta"][deep] == 0).all()
+
+
+def test_american_call_without_dividends_is_european():
+    prices = [
+        option_pricer.FiniteDifference.price(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            0,
+            VOLATILITY,
+            option_pricer.OptionType.CALL,
+            is_european,
+        )["Price"]
+        for is_european in (True, False)
+    ]
+
+    assert prices[0] == pytest.approx(prices[1], abs=1e-6)
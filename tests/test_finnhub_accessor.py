@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+from urllib.parse import parse_qs, urlparse
+
+import finnhub
+import pytest
+
+from modules.finnhub_accessor import QuoteFetcher, RateLimiter
+
+
+class StubQuoteHandler(BaseHTTPRequestHandler):
+    # Shared across the per-request handler instances the server creates.
+    requests: ClassVar[list] = []
+
+    def do_GET(self):
+        symbol = parse_qs(urlparse(self.path).query)["symbol"][0]
+        StubQuoteHandler.requests.append(symbol)
+        time.sleep(0.1)
+
+        body = json.dumps({"c": 100.0 + len(symbol), "pc": 99.0}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_client():
+    StubQuoteHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubQuoteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = finnhub.Client(api_key="test")
+    client.API_URL = f"http://127.0.0.1:{server.server_port}"
+    yield client
+
+    server.shutdown()
+    client.close()
+
+
+def test_fetches_unique_symbols_concurrently(stub_client):
+    fetcher = QuoteFetcher(stub_client, max_workers=4, calls_per_minute=6000, burst=10)
+
+    start = time.perf_counter()
+    quotes = fetcher.fetch_quotes(["AAPL", "msft", "AAPL", " GOOG", "TSLA"])
+    elapsed = time.perf_counter() - start
+
+    assert [quote["symbol"] for quote in quotes] == ["AAPL", "MSFT", "GOOG", "TSLA"]
+    assert quotes[0]["c"] == 104.0
+    assert sorted(StubQuoteHandler.requests) == ["AAPL", "GOOG", "MSFT", "TSLA"]
+    assert elapsed < 0.3
+
+
+def test_quotes_are_cached_and_coalesced(stub_client):
+    fetcher = QuoteFetcher(stub_client, calls_per_minute=6000, burst=10, ttl=60)
+    before = time.time()
+
+    threads = [
+        threading.Thread(target=fetcher.fetch_quotes, args=(["AAPL"],))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    fetched = time.time()
+    time.sleep(0.05)
+    quote = fetcher.fetch_quotes(["AAPL"])[0]
+
+    assert StubQuoteHandler.requests == ["AAPL"]
+    # The cached quote keeps the time it was fetched upstream.
+    assert before <= quote["fetched"] <= fetched
+
+
+def test_rate_limiter_waits_for_tokens():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(60, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        limiter.acquire()
+
+    assert sum(sleeps) == pytest.approx(2.0)
+
+
+def test_refresh_bypasses_cache_and_keeps_reserve(stub_client):
+    fetcher = QuoteFetcher(stub_client, calls_per_minute=0.01, burst=4, ttl=60)
+    first = fetcher.fetch_quotes(["AAPL"])[0]
+
+    refreshed = fetcher.refresh_quotes(["AAPL", "MSFT", "GOOG"], reserve=1)
+
+    # Three tokens were left: two go to the refresh, one stays in reserve.
+    assert [quote["symbol"] for quote in refreshed] == ["AAPL", "MSFT"]
+    assert refreshed[0]["fetched"] > first["fetched"]
+    assert fetcher.fetch_quotes(["AAPL"])[0]["fetched"] == refreshed[0]["fetched"]
+    assert not fetcher.rate_limiter.try_acquire(reserve=1)
+
+    start = time.perf_counter()
+    fetcher.fetch_quotes(["TSLA"])
+    assert time.perf_counter() - start < 1
+    assert sorted(StubQuoteHandler.requests) == ["AAPL", "AAPL", "MSFT", "TSLA"]
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from modules import option_pricer
+
+STOCK_PRICE = 10.24
+TIME_TO_EXPIRATION = 0.34
+RISK_FREE_RATE = 0.01
+DIVIDEND_YIELD = 0.03
+STRIKES = np.linspace(7.0, 14.0, 50)
+VOLATILITIES = np.linspace(0.15, 0.8, 50)
+
+
+def test_black_scholes_round_trip():
+    for option_type in (0, 1):
+        prices = option_pricer.BlackScholes.price_option_batch(
+            STOCK_PRICE,
+            STRIKES,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITIES,
+            0,
+            option_type,
+        )["Price"]
+
+        implied_vols = (
+            option_pricer.ImpliedVolatilityModel.black_scholes_implied_volatility(
+                prices,
+                STOCK_PRICE,
+                STRIKES,
+                TIME_TO_EXPIRATION,
+                RISK_FREE_RATE,
+                DIVIDEND_YIELD,
+                option_type,
+            )
+        )
+
+        np.testing.assert_allclose(implied_vols, VOLATILITIES, atol=1e-6)
+
+
+def test_american_round_trip():
+    model = option_pricer.ImpliedVolatilityModel(
+        STOCK_PRICE,
+        r=0.05,
+        T=TIME_TO_EXPIRATION,
+        N=100,
+        option_type=option_pricer.OptionType.PUT,
+    )
+    prices = model.option_valuation_batch(STRIKES, VOLATILITIES)
+
+    implied_vols = model.get_implied_volatilities(STRIKES, prices)
+
+    assert implied_vols == pytest.approx(VOLATILITIES.tolist(), abs=1e-6)
+
+
+def test_american_with_dividends_recovers_volatility_of_independent_prices():
+    strikes = np.array([9.0, 10.27, 11.5])
+    # Priced on the finite difference grid, not the tree being inverted.
+    prices = [
+        option_pricer.FiniteDifference.price(
+            STOCK_PRICE,
+            K,
+            TIME_TO_EXPIRATION,
+            0.05,
+            0.02,
+            0.25,
+            option_pricer.OptionType.PUT,
+            num_spots=800,
+            num_steps=800,
+        )["Price"]
+        for K in strikes
+    ]
+    model = option_pricer.ImpliedVolatilityModel(
+        STOCK_PRICE,
+        r=0.05,
+        T=TIME_TO_EXPIRATION,
+        q=0.02,
+        N=1000,
+        option_type=option_pricer.OptionType.PUT,
+    )
+
+    implied_vols = model.implied_volatilities(strikes, prices)
+
+    np.testing.assert_allclose(implied_vols, 0.25, atol=5e-4)
+
+
+def test_price_outside_arbitrage_bounds_is_nan():
+    implied_vols = (
+        option_pricer.ImpliedVolatilityModel.black_scholes_implied_volatility(
+            [0.0, STOCK_PRICE + 1],
+            STOCK_PRICE,
+            10.0,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+        )
+    )
+
+    assert np.isnan(implied_vols).all()
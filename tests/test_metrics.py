@@ -0,0 +1,97 @@
+import time
+
+from modules.metrics import NULL_TIMER, Metrics, RequestMonitor, registry
+
+
+def test_render_prometheus_text():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.increment("simulations_total", 500, engine="batched")
+    metrics.increment("simulations_total", 250, engine="batched")
+    metrics.observe("stage_seconds", 0.05, stage="rng")
+    metrics.observe("stage_seconds", 0.5, stage="rng")
+    metrics.observe("stage_seconds", 5.0, stage="rng")
+    metrics.gauge("cache_entries", lambda: 3)
+
+    lines = metrics.render().splitlines()
+
+    assert 'simulations_total{engine="batched"} 750' in lines
+    assert 'stage_seconds_bucket{stage="rng",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="rng",le="1.0"} 2' in lines
+    assert 'stage_seconds_bucket{stage="rng",le="+Inf"} 3' in lines
+    assert 'stage_seconds_count{stage="rng"} 3' in lines
+    assert "cache_entries 3" in lines
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+
+    @metrics.timed("call_seconds")
+    def call(x):
+        return 2 * x
+
+    metrics.increment("calls_total")
+    assert call(2) == 4
+    assert metrics.timer("block_seconds") is NULL_TIMER
+    assert metrics.counters == {} and metrics.histograms == {}
+
+
+def test_slow_requests_are_profiled():
+    metrics = Metrics()
+    monitor = RequestMonitor(metrics, 0.02)
+    monitor.profiler.interval = 0.001
+
+    started = monitor.start()
+    time.sleep(0.05)
+    monitor.finish(started, "slow_route", "GET", 200)
+
+    started = monitor.start()
+    monitor.finish(started, "fast_route", "GET", 200)
+
+    assert [p["Endpoint"] for p in monitor.slow_profiles] == ["slow_route"]
+    stacks = dict(monitor.slow_profiles[0]["Stacks"])
+    assert any("test_slow_requests_are_profiled" in stack for stack in stacks)
+    assert 'http_requests_total{endpoint="fast_route",method="GET",status="200"} 1' in (
+        metrics.render()
+    )
+
+
+def test_metrics_endpoint():
+    from winfin import app
+
+    client = app.test_client()
+    client.get("/pricingCacheStats")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert "http_request_duration_seconds_count" in response.get_data(as_text=True)
+
+
+def test_monte_carlo_route_reports_stage_metrics():
+    from modules.request_handler import RequestHandler
+
+    request = {
+        "stock_price": 97.25,
+        "strike_price": 100,
+        "time_to_expiration": 0.75,
+        "risk_free_rate": 0.02,
+        "dividend_yield": 0,
+        "volatility": 0.3,
+        "option_type": 0,
+    }
+    for include_greeks in (0, 1):
+        RequestHandler.handle_monte_carlo_calc_request(
+            {**request, "include_greeks": include_greeks}
+        )
+
+    text = registry.render()
+    for engine, stages in (
+        ("batched", ("rng", "paths", "payoff")),
+        ("greeks", ("rng", "payoff")),
+    ):
+        for stage in stages:
+            assert (
+                f'monte_carlo_stage_seconds_count{{engine="{engine}",stage="{stage}"}}'
+                in text
+            )
+        assert f'monte_carlo_bytes_allocated_total{{engine="{engine}"}}' in text
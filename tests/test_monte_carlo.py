@@ -1,8 +1,13 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import numpy as np
+import pytest
 
-from modules.option_pricer import MonteCarlo
+from modules import normal_distribution as norm
+from modules import option_pricer
+from modules.option_pricer import BlackScholes, MonteCarlo
 
 STOCK_PRICE = 10.24
 STRIKE_PRICE = 10.27
@@ -106,3 +111,380 @@ def test_put_greeks(mock_normal):
     assert pricing_response.get("Theta") == -1.6380401997228766
     assert pricing_response.get("Vega") == 2.3448934636999486
     assert pricing_response.get("Rho") == -1.9620552276178094
+
+
+def test_batched_matches_black_scholes():
+    for option_type in (0, 1):
+        price = MonteCarlo.monte_carlo_batched(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            option_type,
+            num_simulations=400000,
+            max_memory=2**20,
+            rng=np.random.default_rng(seed=42),
+        )
+        expected = BlackScholes.price_option(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            0,
+            option_type,
+        )["Price"]
+
+        assert price == pytest.approx(expected, 0.01)
+
+
+def test_batched_does_not_depend_on_memory_budget():
+    prices = [
+        MonteCarlo.monte_carlo_batched(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            num_simulations=1000,
+            max_memory=max_memory,
+            rng=np.random.default_rng(seed=7),
+        )
+        for max_memory in (240, 24000)
+    ]
+
+    assert prices[0] == pytest.approx(prices[1], 1e-12)
+
+
+def test_single_simulation_greeks_match_black_scholes():
+    for option_type in (0, 1):
+        pricing_response = MonteCarlo.monte_carlo_greeks(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            option_type,
+            num_simulations=1000000,
+            rng=np.random.default_rng(seed=42),
+        )
+        expected = BlackScholes.price_option(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            1,
+            option_type,
+        )
+
+        for key, value in expected.items():
+            assert pricing_response[key] == pytest.approx(value, 0.02)
+
+
+def test_variance_reduced_estimates_cover_black_scholes():
+    expected = BlackScholes.price_option(
+        STOCK_PRICE,
+        STRIKE_PRICE,
+        TIME_TO_EXPIRATION,
+        RISK_FREE_RATE,
+        DIVIDEND_YIELD,
+        VOLATILITY,
+        0,
+        0,
+    )["Price"]
+
+    for variance_reduction in MonteCarlo.VARIANCE_REDUCTIONS:
+        pricing_response = MonteCarlo.monte_carlo_estimate(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            variance_reduction=variance_reduction,
+            rng=np.random.default_rng(seed=42),
+        )
+        lower, upper = pricing_response["ConfidenceInterval"]
+
+        assert lower <= pricing_response["Price"] <= upper
+        assert lower - pricing_response["StdError"] <= expected
+        assert expected <= upper + pricing_response["StdError"]
+
+
+def test_target_stderr_stops_early():
+    pricing_response = MonteCarlo.monte_carlo_estimate(
+        STOCK_PRICE,
+        STRIKE_PRICE,
+        TIME_TO_EXPIRATION,
+        RISK_FREE_RATE,
+        DIVIDEND_YIELD,
+        VOLATILITY,
+        num_simulations=10000000,
+        variance_reduction="control_variate",
+        target_stderr=0.005,
+        max_memory=2**16,
+        rng=np.random.default_rng(seed=42),
+    )
+
+    assert pricing_response["StdError"] <= 0.005
+    assert pricing_response["Simulations"] < 10000000
+
+
+def test_target_stderr_stops_early_with_default_memory_budget():
+    for variance_reduction in MonteCarlo.VARIANCE_REDUCTIONS:
+        pricing_response = MonteCarlo.monte_carlo_estimate(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            num_simulations=1000000,
+            variance_reduction=variance_reduction,
+            target_stderr=0.01,
+            rng=np.random.default_rng(seed=42),
+        )
+
+        assert pricing_response["StdError"] <= 0.01
+        assert pricing_response["Simulations"] < 100000
+
+
+def test_parallel_is_reproducible_across_worker_counts():
+    results = [
+        MonteCarlo.monte_carlo_parallel(
+            STOCK_PRICE,
+            STRIKE_PRICE,
+            TIME_TO_EXPIRATION,
+            RISK_FREE_RATE,
+            DIVIDEND_YIELD,
+            VOLATILITY,
+            num_simulations=200001,
+            seed=42,
+            workers=workers,
+        )
+        for workers in (1, 2, 4)
+    ]
+
+    assert results[0] == results[1] == results[2]
+    assert results[0]["Price"] == pytest.approx(1.01437, 0.01)
+
+
+def test_concurrent_requests_share_one_pool():
+    barrier = threading.Barrier(8)
+
+    def get_pool():
+        barrier.wait()
+        return MonteCarlo.executor(3)
+
+    with ThreadPoolExecutor(max_workers=8) as requests:
+        pools = list(requests.map(lambda _: get_pool(), range(8)))
+
+    assert all(pool is pools[0] for pool in pools)
+
+
+def test_geometric_asian_matches_closed_form():
+    n = 52
+    pricing_response = MonteCarlo.monte_carlo_path_dependent(
+        100,
+        100,
+        1,
+        0.05,
+        0.02,
+        0.3,
+        0,
+        "asian_geometric",
+        num_simulations=200000,
+        num_steps=n,
+        max_memory=2**20,
+        rng=np.random.default_rng(seed=42),
+    )
+
+    # log G is normal with this mean and variance for n equally spaced dates.
+    mean = np.log(100) + (0.05 - 0.02 - 0.045) * (n + 1) / (2 * n)
+    variance = 0.09 * (n + 1) * (2 * n + 1) / (6 * n**2)
+    forward = np.exp(mean + 0.5 * variance)
+    expected = BlackScholes.price_option(forward, 100, 1, 0, 0, np.sqrt(variance))
+
+    assert pricing_response["Price"] == pytest.approx(
+        np.exp(-0.05) * expected["Price"], abs=4 * pricing_response["StdError"]
+    )
+
+
+def test_barrier_with_bridge_correction_matches_continuous_barrier():
+    S, K, H, T, r, q, sigma = 100, 100, 85, 1, 0.05, 0.02, 0.3
+    responses = {
+        barrier_type: MonteCarlo.monte_carlo_path_dependent(
+            S,
+            K,
+            T,
+            r,
+            q,
+            sigma,
+            0,
+            "barrier",
+            H,
+            barrier_type,
+            num_simulations=200000,
+            num_steps=12,
+            rng=np.random.default_rng(seed=42),
+        )
+        for barrier_type in ("down_and_in", "down_and_out")
+    }
+
+    # Continuous down-and-in call for H < K (Reiner and Rubinstein).
+    lam = (r - q + 0.5 * sigma**2) / sigma**2
+    y = np.log(H**2 / (S * K)) / (sigma * np.sqrt(T)) + lam * sigma * np.sqrt(T)
+    down_and_in = S * np.exp(-q * T) * (H / S) ** (2 * lam) * norm.cdf(y) - K * np.exp(
+        -r * T
+    ) * (H / S) ** (2 * lam - 2) * norm.cdf(y - sigma * np.sqrt(T))
+    vanilla = BlackScholes.price_option(S, K, T, r, q, sigma)["Price"]
+
+    knock_in = responses["down_and_in"]
+    knock_out = responses["down_and_out"]
+    assert knock_in["Price"] == pytest.approx(down_and_in, abs=4 * knock_in["StdError"])
+    assert knock_out["Price"] == pytest.approx(
+        vanilla - down_and_in, abs=4 * knock_out["StdError"]
+    )
+    # Same draws, so in + out is exactly the vanilla Monte Carlo price.
+    assert knock_in["Price"] + knock_out["Price"] == pytest.approx(
+        vanilla, abs=4 * knock_out["StdError"]
+    )
+
+
+def test_lookbacks_dominate_vanilla_options():
+    for type in (0, 1):
+        vanilla = BlackScholes.price_option(100, 100, 1, 0.05, 0.02, 0.3, type=type)
+        for payoff in ("lookback_fixed", "lookback_floating"):
+            pricing_response = MonteCarlo.monte_carlo_path_dependent(
+                100,
+                100,
+                1,
+                0.05,
+                0.02,
+                0.3,
+                type,
+                payoff,
+                num_simulations=20000,
+                num_steps=52,
+                max_memory=2**16,
+                rng=np.random.default_rng(seed=42),
+            )
+
+            assert pricing_response["Price"] > vanilla["Price"]
+
+
+def test_invalid_path_payoffs_raise():
+    with pytest.raises(Exception, match="Invalid Payoff"):
+        MonteCarlo.monte_carlo_path_dependent(100, 100, 1, 0.05, 0, 0.3, payoff="x")
+    with pytest.raises(Exception, match="barrier level"):
+        MonteCarlo.monte_carlo_path_dependent(
+            100, 100, 1, 0.05, 0, 0.3, payoff="barrier"
+        )
+
+
+def test_longstaff_schwartz_american_put_is_a_tight_lower_bound():
+    # Longstaff and Schwartz (2001), Table 1: S = 36, K = 40, sigma = 0.2.
+    pricing_response = MonteCarlo.longstaff_schwartz(
+        36,
+        40,
+        1,
+        0.06,
+        0,
+        0.2,
+        1,
+        num_simulations=100000,
+        num_steps=50,
+        max_memory=2**22,
+        rng=np.random.default_rng(seed=42),
+    )
+    american = option_pricer.BinomialLROption(
+        S=36,
+        K=40,
+        T=1,
+        N=1001,
+        r=0.06,
+        sigma=0.2,
+        option_type=option_pricer.OptionType.PUT,
+    ).price()
+    european = BlackScholes.price_option(36, 40, 1, 0.06, 0, 0.2, type=1)["Price"]
+
+    stderr = pricing_response["StdError"]
+    assert european < pricing_response["Price"] < american + 3 * stderr
+    assert pricing_response["Price"] == pytest.approx(american, abs=0.03)
+
+    boundary = pricing_response["ExerciseBoundary"]
+    exercised = boundary[~np.isnan(boundary)]
+    assert boundary[-1] == 40
+    assert (exercised < 40 + 1e-12).all() and exercised[-5] > exercised[5]
+
+
+def test_longstaff_schwartz_max_call_on_two_assets():
+    # Glasserman (2004), Table 8.1: call on the max of two assets, 9 dates.
+    pricing_response = MonteCarlo.longstaff_schwartz(
+        [100, 100],
+        100,
+        3,
+        0.05,
+        0.1,
+        0.2,
+        0,
+        basket="max",
+        num_simulations=100000,
+        num_steps=9,
+        rng=np.random.default_rng(seed=42),
+    )
+
+    assert pricing_response["Price"] == pytest.approx(13.90, abs=0.15)
+    assert pricing_response["ExerciseBoundary"] is None
+
+
+def test_longstaff_schwartz_respects_memory_ceiling():
+    pricing_response = MonteCarlo.longstaff_schwartz(
+        36,
+        40,
+        1,
+        0.06,
+        0,
+        0.2,
+        1,
+        num_simulations=20000,
+        num_steps=20,
+        basis="polynomial",
+        max_memory=2**18,
+        rng=np.random.default_rng(seed=42),
+    )
+
+    assert pricing_response["TrainingPaths"] < 20000
+    assert pricing_response["Price"] == pytest.approx(4.47, abs=0.1)
+
+
+def test_pricing_request_uses_batched_simulation():
+    from modules.request_handler import RequestHandler
+
+    with patch.object(
+        option_pricer.MonteCarlo,
+        "monte_carlo",
+        side_effect=AssertionError("full path matrix used"),
+    ):
+        pricing_response = RequestHandler.handle_monte_carlo_calc_request(
+            {
+                "stock_price": 101.5,
+                "strike_price": 100,
+                "time_to_expiration": 0.5,
+                "risk_free_rate": 0.03,
+                "dividend_yield": 0,
+                "volatility": 0.2,
+                "include_greeks": 0,
+                "option_type": 0,
+            }
+        )
+
+    expected = BlackScholes.price_option(101.5, 100, 0.5, 0.03, 0, 0.2)
+    assert pricing_response["Price"] == pytest.approx(expected["Price"], 0.02)
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from modules import request_handler
+from modules.monte_carlo_jobs import JobQueueFull, MonteCarloJobs
+from modules.option_pricer import MonteCarlo
+
+CONTRACT = (10.24, 10.27, 0.34, 0.01, 0.03, 0.45)
+
+
+def wait_for(jobs, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while jobs.status(job_id)["Status"] == "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return jobs.status(job_id)
+
+
+def test_job_matches_parallel_engine():
+    jobs = MonteCarloJobs(max_workers=2, chunk_size=10000, use_processes=False)
+
+    job_id = jobs.submit(*CONTRACT, 1, 0, num_simulations=100000, seed=42)
+    status = wait_for(jobs, job_id)
+    expected = MonteCarlo.monte_carlo_parallel(
+        *CONTRACT, 0, num_simulations=100000, seed=42, workers=1, chunk_size=10000
+    )
+
+    assert status["Status"] == "completed"
+    assert status["Progress"] == 1.0
+    assert status["Price"] == pytest.approx(expected["Price"], 1e-12)
+    assert status["StdError"] == pytest.approx(expected["StdError"], 1e-9)
+    assert status["Delta"] == pytest.approx(0.532, 0.05)
+
+
+def test_backpressure_and_cancellation():
+    jobs = MonteCarloJobs(
+        max_workers=1, max_active_jobs=1, chunk_size=10000, use_processes=False
+    )
+
+    job_id = jobs.submit(*CONTRACT, num_simulations=10**9)
+    with pytest.raises(JobQueueFull):
+        jobs.submit(*CONTRACT)
+
+    assert jobs.cancel(job_id)
+    time.sleep(0.05)
+    status = jobs.status(job_id)
+
+    assert status["Status"] == "cancelled"
+    assert status["Progress"] < 1.0
+    assert not jobs.cancel(job_id)
+    jobs.submit(*CONTRACT, num_simulations=1000)
+
+
+def test_huge_job_only_keeps_a_chunk_counter():
+    jobs = MonteCarloJobs(max_workers=1, chunk_size=10000, use_processes=False)
+
+    start = time.perf_counter()
+    job_id = jobs.submit(*CONTRACT, num_simulations=10**15)
+    elapsed = time.perf_counter() - start
+    jobs.cancel(job_id)
+
+    assert elapsed < 1.0
+    assert jobs.jobs[job_id]["Chunks"] == 10**11
+    assert jobs.jobs[job_id]["NextChunk"] <= 2
+
+
+def test_submit_request_caps_num_simulations(monkeypatch):
+    monkeypatch.setattr(request_handler, "MONTE_CARLO_MAX_SIMULATIONS", 1000)
+    request = {
+        "stock_price": 10.24,
+        "strike_price": 10.27,
+        "time_to_expiration": 0.34,
+        "risk_free_rate": 0.01,
+        "dividend_yield": 0.03,
+        "volatility": 0.45,
+        "include_greeks": 0,
+        "option_type": 0,
+        "num_simulations": 1001,
+    }
+
+    response = request_handler.RequestHandler.handle_monte_carlo_job_submit_request(
+        request
+    )
+
+    assert response.startswith("Failed to submit job")
+    assert "between 1 and 1000" in response
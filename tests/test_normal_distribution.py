@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+import pytest
+from scipy.special import ndtr, ndtri
+
+from modules import normal_distribution as norm
+
+
+def test_cdf_matches_reference_to_double_precision():
+    x = np.linspace(-37, 9, 200001)
+    expected = ndtr(x)
+
+    assert norm.cdf(x) == pytest.approx(expected, rel=1e-12)
+    # Away from the far tail, where ndtr itself loses digits, agreement is
+    # to a few ulps.
+    central = np.abs(x) < 5
+    assert norm.cdf(x[central]) == pytest.approx(expected[central], rel=2e-15)
+
+
+def test_scalar_and_array_paths_agree():
+    x = np.linspace(-10, 10, 1001)
+
+    scalar = np.array([norm.cdf(float(v)) for v in x])
+
+    assert norm.cdf(x) == pytest.approx(scalar, rel=1e-13)
+    assert norm.cdf(x[:10]) == pytest.approx(scalar[:10], rel=1e-15)
+    assert norm.pdf(x) == pytest.approx([norm.pdf(float(v)) for v in x], rel=1e-15)
+    assert norm.pdf(1.5) == pytest.approx(math.exp(-1.125) / math.sqrt(2 * math.pi))
+
+
+def test_special_values():
+    x = np.array([-np.inf, -1e300, -0.0, 0.0, 1e300, np.inf, np.nan] * 100)
+
+    result = norm.cdf(x)[:7]
+
+    assert result[:6].tolist() == [0.0, 0.0, 0.5, 0.5, 1.0, 1.0]
+    assert np.isnan(result[6])
+    assert np.shape(norm.cdf(np.zeros((3, 200)))) == (3, 200)
+
+
+def test_ppf_inverts_cdf():
+    p = np.concatenate((np.logspace(-300, -1, 500), np.linspace(0.1, 0.9, 500)))
+
+    assert norm.ppf(p) == pytest.approx(ndtri(p), rel=1e-13)
+    assert norm.ppf(0.975) == pytest.approx(1.959963984540054, rel=1e-15)
+    assert norm.ppf([0.0, 1.0]).tolist() == [-np.inf, np.inf]
+    assert np.isnan(norm.ppf([-0.1, 1.1])).all()
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from modules import portfolio_risk
+from modules.option_pricer import BlackScholes
+
+SPOTS = [100.0, 50.0]
+
+
+@pytest.fixture
+def positions():
+    return portfolio_risk.make_positions(
+        quantity=[10, -5, 3, 7],
+        underlying=[0, 0, 1, 1],
+        strike=[105, 95, 50, 45],
+        expiry=[0.5, 0.25, 1.0, 0.1],
+        sigma=[0.2, 0.25, 0.3, 0.35],
+        type=[0, 1, 0, 1],
+    )
+
+
+def book_value(positions, spots, rate, vol_shift=(0.0, 0.0)):
+    value = 0.0
+    for i in range(len(positions["quantity"])):
+        u = positions["underlying"][i]
+        price = BlackScholes.price_option(
+            spots[u],
+            positions["strike"][i],
+            positions["expiry"][i],
+            rate,
+            0.0,
+            positions["sigma"][i] + vol_shift[u],
+            0,
+            int(positions["type"][i]),
+        )["Price"]
+        value += positions["quantity"][i] * price
+    return value
+
+
+def test_full_revaluation_matches_scalar_pricing(positions):
+    scenarios = portfolio_risk.make_scenarios(
+        [[0.05, -0.1], [-0.2, 0.0], [0.0, 0.0]],
+        vol_shift=[[0.05, 0.0], [0.0, -0.05], [0.0, 0.0]],
+        rate_shift=[0.0, 0.01, 0.0],
+    )
+
+    # A tiny memory budget forces one scenario per chunk.
+    result = portfolio_risk.full_revaluation(
+        positions, SPOTS, 0.03, scenarios, max_memory=1, by_position=True
+    )
+
+    base = book_value(positions, SPOTS, 0.03)
+    assert result["BaseValue"] == pytest.approx(base, 1e-9)
+    assert result["PnL"][0] == pytest.approx(
+        book_value(positions, [105.0, 45.0], 0.03, (0.05, 0.0)) - base, 1e-9
+    )
+    assert result["PnL"][1] == pytest.approx(
+        book_value(positions, [80.0, 50.0], 0.04, (0.0, -0.05)) - base, 1e-9
+    )
+    assert result["PnL"][2] == pytest.approx(0.0, abs=1e-9)
+    np.testing.assert_allclose(result["PositionPnL"].sum(axis=1), result["PnL"])
+
+
+def test_single_position_from_scalars():
+    position = portfolio_risk.make_positions(10, 0, 105, 0.5, 0.2)
+    scenarios = portfolio_risk.make_scenarios([[0.05]])
+
+    result = portfolio_risk.full_revaluation(position, [100.0], 0.03, scenarios)
+
+    assert position["quantity"].shape == (1,)
+    assert result["PnL"][0] == pytest.approx(
+        10
+        * (
+            BlackScholes.price_option(105, 105, 0.5, 0.03, 0, 0.2, 0, 0)["Price"]
+            - BlackScholes.price_option(100, 105, 0.5, 0.03, 0, 0.2, 0, 0)["Price"]
+        ),
+        1e-9,
+    )
+
+
+def test_expired_positions_revalue_at_intrinsic(positions):
+    scenarios = portfolio_risk.make_scenarios([[0.0, -0.2]])
+
+    result = portfolio_risk.full_revaluation(
+        positions, SPOTS, 0.03, scenarios, horizon=0.2, by_position=True
+    )
+
+    # The 45 put expires inside the horizon and finishes 5 in the money.
+    expired_value = 7 * 5.0
+    base_value = (
+        7 * BlackScholes.price_option(50, 45, 0.1, 0.03, 0, 0.35, 0, 1)["Price"]
+    )
+    assert result["PositionPnL"][0, 3] == pytest.approx(expired_value - base_value)
+
+
+def test_delta_gamma_tracks_full_revaluation_for_small_moves(positions):
+    scenarios = portfolio_risk.simulated_scenarios(
+        [0.2, 0.3], 2000, horizon=1 / 252, correlation=[[1, 0.5], [0.5, 1]], rng=0
+    )
+
+    report = portfolio_risk.risk_report(positions, SPOTS, 0.03, scenarios, 0.95)
+
+    assert report["Scenarios"] == 2000
+    assert report["Positions"] == 4
+    assert report["ExpectedShortfall"] >= report["VaR"] > 0
+    assert report["DeltaGammaVaR"] == pytest.approx(report["VaR"], rel=0.02)
+    np.testing.assert_allclose(
+        report["DeltaGammaPnL"], report["PnL"], atol=0.05 * report["VaR"]
+    )
+
+
+def test_historical_scenarios_and_risk_measures():
+    prices = np.array([[100.0, 50.0], [110.0, 45.0], [99.0, 45.0]])
+
+    scenarios = portfolio_risk.historical_scenarios(prices)
+
+    np.testing.assert_allclose(scenarios["spot_return"], [[0.1, -0.1], [-0.1, 0.0]])
+    assert portfolio_risk.value_at_risk(np.arange(-50, 50), 0.9) == pytest.approx(40.1)
+    assert portfolio_risk.expected_shortfall(np.arange(-50, 50), 0.9) == 45.5
+    with pytest.raises(Exception, match="Invalid Confidence"):
+        portfolio_risk.value_at_risk([1.0], 1.0)
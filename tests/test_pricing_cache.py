@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from modules.pricing_cache import PricingCache
+
+
+def test_lru_eviction():
+    cache = PricingCache(max_entries=2)
+
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: -1)
+    cache.get_or_compute("c", lambda: 3)
+
+    assert cache.get_or_compute("a", lambda: -1) == 1
+    assert cache.get_or_compute("b", lambda: 20) == 20
+    assert cache.stats()["Evictions"] == 2
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache = PricingCache(ttl=10, clock=lambda: now[0])
+
+    cache.get_or_compute("a", lambda: 1)
+    now[0] = 5.0
+    assert cache.get_or_compute("a", lambda: 2) == 1
+    now[0] = 10.0
+    assert cache.get_or_compute("a", lambda: 2) == 2
+
+    stats = cache.stats()
+    assert (stats["Hits"], stats["Misses"]) == (1, 2)
+
+
+def test_memory_budget():
+    cache = PricingCache(max_bytes=200)
+
+    cache.get_or_compute("small", lambda: 1.0)
+    cache.get_or_compute("large", lambda: list(range(100)))
+
+    assert cache.stats()["Entries"] == 1
+    assert cache.stats()["Bytes"] <= 200
+
+
+def test_concurrent_requests_are_coalesced():
+    cache = PricingCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"Price": 1.0}
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("a", compute))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"Price": 1.0}] * 5
+    assert cache.stats()["Coalesced"] + cache.stats()["Hits"] == 4
+
+
+def test_failures_are_not_cached():
+    cache = PricingCache()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("a", fail)
+
+    assert cache.get_or_compute("a", lambda: 1) == 1
@@ -0,0 +1,160 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from modules.quote_store import QuoteStore
+
+
+class FakeFeed:
+    def __init__(self):
+        self.calls = []
+        self.price = 100.0
+
+    def __call__(self, symbols):
+        self.calls.append(list(symbols))
+        return [{"symbol": symbol, "c": self.price} for symbol in symbols]
+
+
+@pytest.fixture
+def clock():
+    now = [1000.0]
+    clock = lambda: now[0]
+    clock.advance = lambda seconds: now.__setitem__(0, now[0] + seconds)
+    return clock
+
+
+def test_reads_are_served_from_memory(clock):
+    feed = FakeFeed()
+    store = QuoteStore(feed, refresh_interval=5, clock=clock)
+
+    first = store.get(["aapl", "MSFT"])
+    clock.advance(3)
+    second = store.get(["AAPL"])
+
+    assert feed.calls == [["AAPL", "MSFT"]]
+    assert [quote["symbol"] for quote in first] == ["AAPL", "MSFT"]
+    assert second[0]["age"] == 3
+    assert not second[0]["stale"]
+
+
+def test_refresh_updates_and_flags_staleness(clock):
+    feed = FakeFeed()
+    store = QuoteStore(feed, refresh_interval=5, clock=clock)
+    store.get(["AAPL"])
+
+    clock.advance(11)
+    assert store.get(["AAPL"])[0]["stale"]
+
+    feed.price = 101.0
+    store.refresh()
+    quote = store.get(["AAPL"])[0]
+
+    assert quote["c"] == 101.0
+    assert quote["age"] == 0
+    assert not quote["stale"]
+
+
+def test_idle_symbols_are_unsubscribed(clock):
+    feed = FakeFeed()
+    store = QuoteStore(feed, idle_timeout=60, clock=clock)
+    store.get(["AAPL", "MSFT"])
+
+    clock.advance(30)
+    store.get(["AAPL"])
+    clock.advance(45)
+    store.refresh()
+
+    assert feed.calls[-1] == ["AAPL"]
+    assert set(store.subscriptions) == {"AAPL"}
+
+
+def test_push_transport_and_background_refresh():
+    feed = FakeFeed()
+    store = QuoteStore(feed, refresh_interval=0.01)
+    store.get(["AAPL"])
+
+    store.publish({"symbol": "AAPL", "c": 150.0})
+    store.publish({"symbol": "TSLA", "c": 200.0})
+    assert store.get(["AAPL"])[0]["c"] == 150.0
+    assert "TSLA" not in store.quotes
+
+    store.start()
+    time.sleep(0.1)
+    store.stop()
+
+    assert len(feed.calls) > 1
+    assert store.get(["AAPL"])[0]["c"] == 100.0
+
+
+def test_age_counts_from_fetch_time(clock):
+    # A feed serving quotes from its own cache reports when they were fetched.
+    fetched = clock() - 4
+    store = QuoteStore(
+        lambda symbols: [
+            {"symbol": s, "c": 100.0, "fetched": fetched} for s in symbols
+        ],
+        refresh_interval=5,
+        clock=clock,
+    )
+
+    quote = store.get(["AAPL"])[0]
+
+    assert quote["updated"] == fetched
+    assert quote["age"] == 4
+    assert "fetched" not in quote
+
+    # Re-publishing an older cached quote does not reset its age.
+    store.publish({"symbol": "AAPL", "c": 101.0})
+    store.publish({"symbol": "AAPL", "c": 99.0, "fetched": fetched})
+    assert store.get(["AAPL"])[0]["c"] == 101.0
+
+
+def test_reads_survive_concurrent_unsubscribes():
+    store = QuoteStore(FakeFeed())
+    errors = []
+
+    def read():
+        try:
+            for _ in range(2000):
+                store.get(["AAPL", "MSFT"])
+        except Exception as e:
+            errors.append(e)
+
+    # Switch threads as often as possible to interleave reads and removals.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        thread = threading.Thread(target=read)
+        thread.start()
+        while thread.is_alive():
+            store.unsubscribe(["AAPL", "MSFT"])
+        thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+
+
+def test_refresh_serves_stalest_symbols_first(clock):
+    feed = FakeFeed()
+    refreshed = []
+
+    def refresh_feed(symbols):
+        # A rate-limited feed that can only afford one quote per refresh.
+        refreshed.append(list(symbols))
+        return feed(symbols[:1])
+
+    store = QuoteStore(feed, clock=clock, refresh_feed=refresh_feed)
+    store.get(["AAPL"])
+    clock.advance(1)
+    store.get(["MSFT"])
+
+    clock.advance(1)
+    store.refresh()
+    clock.advance(1)
+    store.refresh()
+
+    assert refreshed == [["AAPL", "MSFT"], ["MSFT", "AAPL"]]
+    assert [quote["age"] for quote in store.get(["AAPL", "MSFT"])] == [1, 0]
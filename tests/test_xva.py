@@ -0,0 +1,162 @@
+import numpy as np
+import pytest
+
+from modules import xva
+from modules.discount_curve import DiscountCurve
+from modules.request_handler import RequestHandler
+
+CURVE = DiscountCurve([1, 5, 10], [0.03, 0.035, 0.04])
+
+
+@pytest.fixture
+def model():
+    return xva.HullWhite(0.05, 0.01, CURVE)
+
+
+def swap_value(t_index, fixed_rate=0.035, notional=1e6):
+    # Forward value of a 5y quarterly payer swap on a reset date t_index.
+    P = CURVE.discount_factor(np.linspace(0, 5, 21))
+    return notional * (P[t_index] - P[-1] - fixed_rate * 0.25 * P[t_index + 1 :].sum())
+
+
+def test_simulation_reprices_the_curve(model):
+    simulation = model.simulate([0, 1, 5], num_paths=50000, rng=0)
+
+    np.testing.assert_allclose(
+        simulation["Discount"].mean(axis=0), CURVE.discount_factor([0, 1, 5]), 2e-3
+    )
+    assert simulation["ShortRate"][:, 0] == pytest.approx(0.03, 1e-3)
+
+
+def test_payer_minus_receiver_exposure_is_the_forward_value(model):
+    swaps = xva.make_swaps([1e6, 1e6], 0.035, 0, 5, 4, [1, 0], [0, 1])
+
+    result = xva.exposure_profiles(swaps, model, [0, 1, 2, 2.1], num_paths=20000, rng=1)
+
+    payer, receiver = result["NettingSets"][0], result["NettingSets"][1]
+    # max(V, 0) - max(-V, 0) = V, whose discounted expectation is exact.
+    forward = payer["DiscountedEE"] - receiver["DiscountedEE"]
+    assert forward[0] == pytest.approx(swap_value(0), 1e-9)
+    assert forward[1] == pytest.approx(swap_value(4), abs=500)
+    assert forward[2] == pytest.approx(swap_value(8), abs=500)
+    # Nothing is paid between 2 and 2.1, so the value carries over.
+    assert forward[3] == pytest.approx(swap_value(8), abs=500)
+    assert (payer["PFE"][1:] > payer["EE"][1:]).all()
+    assert payer["EPE"] > 0
+
+
+def test_netting_offsets_exposure_and_cva(model):
+    hedged = xva.make_swaps([1e6, 1e6], 0.035, 0, 5, 4, [1, 0], 0)
+    unhedged = xva.make_swaps(1e6, 0.035, 0, 5, 4, 1, 0)
+    default_curve = xva.survival_curve(0.02)
+
+    hedged_result = xva.cva_report(hedged, model, default_curve, num_paths=2000, rng=2)
+    unhedged_result = xva.cva_report(
+        unhedged, model, default_curve, num_paths=2000, rng=2
+    )
+
+    assert hedged_result["CVA"] == pytest.approx(0.0, abs=1e-6)
+    assert unhedged_result["CVA"] < 0
+    profile = unhedged_result["NettingSets"][0]
+    assert unhedged_result["CVA"] == pytest.approx(
+        xva.calc_cva(unhedged_result["Times"], profile["DiscountedEE"], default_curve)
+    )
+
+
+def test_chunked_paths_value_every_chunk(model):
+    swaps = xva.make_swaps([1e6, 5e5], [0.03, 0.04], [0, 1], [5, 3], 4, [1, 0], [0, 1])
+
+    # A one-byte budget simulates one path per chunk.
+    result = xva.exposure_profiles(swaps, model, num_paths=50, max_memory=1, rng=3)
+
+    assert result["NettingSets"][0]["EE"][0] == pytest.approx(
+        swap_value(0, fixed_rate=0.03)
+    )
+    assert (result["NettingSets"][0]["EE"][1:-1] > 0).all()
+    assert result["NettingSets"][0]["EE"][-1] == 0
+
+
+def test_pfe_tail_matches_full_quantile():
+    rng = np.random.default_rng(4)
+    exposures = np.maximum(rng.standard_normal((2, 1001, 3)), 0)
+
+    for quantile in (0.0, 0.5, 0.95, 0.999, 1.0):
+        tail = 1001 - int(np.floor(1000 * quantile))
+        largest = np.empty((2, 0, 3))
+        for start in range(0, 1001, 64):
+            largest = xva.keep_largest(largest, exposures[:, start : start + 64], tail)
+
+        np.testing.assert_allclose(
+            xva.quantile_from_largest(largest, 1001, quantile),
+            np.quantile(exposures, quantile, axis=1),
+            rtol=1e-12,
+        )
+
+
+def test_sparse_netting_sets_are_compacted(model):
+    swaps = xva.make_swaps([1e6, 1e6], 0.035, 0, 5, 4, [1, 0], [7, 10**9])
+
+    cashflows, resets = xva.netting_set_cashflows(swaps)
+    result = xva.exposure_profiles(swaps, model, [0, 1], num_paths=100, rng=5)
+
+    assert cashflows["NettingSets"].tolist() == [7, 10**9]
+    assert cashflows["Weights"].shape[1] == resets["Weights"].shape[1] == 2
+    assert set(result["NettingSets"]) == {7, 10**9}
+    assert result["NettingSets"][7]["EE"][0] == pytest.approx(swap_value(0))
+
+
+def test_cva_request():
+    swap = {
+        "notional": 1e6,
+        "fixed_rate": 0.03,
+        "start": 0,
+        "maturity": 2,
+        "frequency": 4,
+        "payer": 1,
+        "netting_set": 0,
+    }
+
+    response = RequestHandler.handle_cva_request(
+        {
+            "swaps": [swap, {**swap, "netting_set": 1, "payer": 0}],
+            "risk_free_rate": 0.03,
+            "credit_spread": 0.012,
+            "num_paths": 500,
+            "seed": 0,
+        }
+    )
+
+    assert response["CVA"] < 0
+    assert set(response["NettingSets"]) == {"0", "1"}
+    assert len(response["NettingSets"]["0"]["EE"]) == len(response["Times"]) == 9
+
+    response = RequestHandler.handle_cva_request(
+        {"swaps": [swap], "risk_free_rate": 0.03, "hazard_rate": 0.02, "num_paths": 0}
+    )
+    assert response.startswith("Failed to calculate CVA")
+
+
+def test_cva_request_defaults_each_swap():
+    swap = {"notional": 1e6, "fixed_rate": 0.03, "start": 0, "maturity": 2}
+    request = {"risk_free_rate": 0.03, "hazard_rate": 0.02, "num_paths": 100}
+
+    # Only the second swap names its netting set and direction; the first
+    # keeps the defaults (payer, netting set 0).
+    response = RequestHandler.handle_cva_request(
+        {**request, "swaps": [swap, {**swap, "payer": 0, "netting_set": 3}]}
+    )
+
+    assert set(response["NettingSets"]) == {"0", "3"}
+    assert response["NettingSets"]["0"]["EE"][0] > 0
+    assert response["NettingSets"]["3"]["EE"][0] == 0
+
+    response = RequestHandler.handle_cva_request(
+        {**request, "swaps": [swap, {"notional": 1e6, "start": 0, "maturity": 2}]}
+    )
+    assert "Every swap must have a fixed_rate" in response
+
+    for netting_set in (-1, 1.5, "1", True):
+        response = RequestHandler.handle_cva_request(
+            {**request, "swaps": [{**swap, "netting_set": netting_set}]}
+        )
+        assert "Invalid Netting Set" in response
@@ -1,10 +1,11 @@
 import os
 
-from flask import Flask, request
+from flask import Flask, g, request
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
+from modules import metrics
 from modules.request_handler import RequestHandler
 
 FRONTEND_ORIGIN = "https://winstonriggs.com"
@@ -14,6 +15,22 @@ limiter = Limiter(get_remote_address, app=app, default_limits=["100 per minute"]
 CORS(app, resources={r"/*": {"origins": FRONTEND_ORIGIN}})
 
 
+@app.before_request
+def start_request_timer():
+    g.request_started = metrics.request_monitor.start()
+
+
+@app.after_request
+def record_request(response):
+    metrics.request_monitor.finish(
+        g.pop("request_started", None),
+        request.endpoint or "unmatched",
+        request.method,
+        response.status_code,
+    )
+    return response
+
+
 @app.route("/blackScholesPricing", methods=["GET"])
 @limiter.limit("10 per minute")
 def handle_black_scholes_request():
@@ -21,6 +38,13 @@ def handle_black_scholes_request():
     return RequestHandler.handle_black_scholes_calc_request(params)
 
 
+@app.route("/blackScholesPricing/batch", methods=["POST"])
+@limiter.limit("10 per minute")
+def handle_black_scholes_batch_request():
+    params = request.get_json(silent=True) or {}
+    return RequestHandler.handle_black_scholes_batch_request(params)
+
+
 @app.route("/monteCarloPricing", methods=["GET"])
 @limiter.limit("5 per minute")
 def handle_monte_carlo_request():
@@ -28,6 +52,30 @@ def handle_monte_carlo_request():
     return RequestHandler.handle_monte_carlo_calc_request(params)
 
 
+@app.route("/monteCarloPricing/jobs", methods=["POST"])
+@limiter.limit("20 per minute")
+def handle_monte_carlo_job_submit_request():
+    params = request.get_json(silent=True) or request.args.to_dict()
+    return RequestHandler.handle_monte_carlo_job_submit_request(params)
+
+
+@app.route("/monteCarloPricing/jobs/<job_id>", methods=["GET"])
+def handle_monte_carlo_job_status_request(job_id):
+    return RequestHandler.handle_monte_carlo_job_status_request(job_id)
+
+
+@app.route("/monteCarloPricing/jobs/<job_id>", methods=["DELETE"])
+def handle_monte_carlo_job_cancel_request(job_id):
+    return RequestHandler.handle_monte_carlo_job_cancel_request(job_id)
+
+
+@app.route("/counterpartyRisk", methods=["POST"])
+@limiter.limit("5 per minute")
+def handle_cva_request():
+    params = request.get_json(silent=True) or {}
+    return RequestHandler.handle_cva_request(params)
+
+
 @app.route("/fetchEquityData", methods=["GET"])
 @limiter.limit("20 per minute")
 def handle_equity_data_request():
@@ -35,6 +83,21 @@ def handle_equity_data_request():
     return RequestHandler.handle_equity_data_request(params)
 
 
+@app.route("/metrics", methods=["GET"])
+@limiter.exempt
+def handle_metrics_request():
+    return RequestHandler.handle_metrics_request()
+
+
+@app.route("/pricingCacheStats", methods=["GET"])
+def handle_pricing_cache_stats_request():
+    return RequestHandler.handle_pricing_cache_stats_request()
+
+
 if __name__ == "__main__":
+    # Comma separated route groups to preload before serving, "" for none.
+    warm_up = os.environ.get("WARM_UP", "pricing,equity_data")
+    RequestHandler.warm_up([f for f in warm_up.split(",") if f])
+
     port = int(os.environ.get("PORT", 3000))
     app.run(host="0.0.0.0", port=port)